@@ -0,0 +1,2 @@
+from .pcm import *
+from .backend import *
@@ -0,0 +1,84 @@
+from typing import List
+from perf import perf_timer
+from .pcm import PCMClip, UnsupportedAudioError, read_wav_header
+
+
+class AudioBackend(object):
+    """
+    Loads audio files into clip objects supporting the AudioSegment subset used by Hermes (see PCMClip).
+    """
+    name = None
+
+    def can_load(self, path: str) -> bool:
+        raise NotImplementedError
+
+    def load(self, path: str, mmap: bool = False):
+        raise NotImplementedError
+
+
+class NumpyBackend(AudioBackend):
+    """
+    Fast path for uncompressed WAV files, which are read (or memory-mapped) into PCMClips.
+    """
+    name = 'numpy'
+
+    def can_load(self, path: str) -> bool:
+        try:
+            with open(path, 'rb') as file:
+                read_wav_header(file)
+            return True
+        except (UnsupportedAudioError, OSError, ValueError):
+            return False
+
+    def load(self, path: str, mmap: bool = False) -> PCMClip:
+        return PCMClip.from_wav(path, mmap=mmap)
+
+
+class PydubBackend(AudioBackend):
+    """
+    Fallback for anything else pydub can open (other formats need the FFMPEG plugin).
+    """
+    name = 'pydub'
+
+    def can_load(self, path: str) -> bool:
+        return True
+
+    def load(self, path: str, mmap: bool = False):
+        from pydub import AudioSegment
+        return AudioSegment.from_file(path)
+
+
+# Backends in order of preference.
+AUDIO_BACKENDS = [NumpyBackend(), PydubBackend()]
+
+
+def get_audio_backend(name: str) -> AudioBackend:
+    for backend in AUDIO_BACKENDS:
+        if backend.name == name:
+            return backend
+    raise KeyError(f'No audio backend named {name}')
+
+
+def get_audio_backends() -> List[str]:
+    return [backend.name for backend in AUDIO_BACKENDS]
+
+
+def load_audio(path: str, backend: str = None, mmap: bool = False):
+    """
+    Loads an audio file with the named backend, or the first backend able to read it.
+    :param path: path to the audio file.
+    :param backend: optional name of the backend to use (see get_audio_backends).
+    :param mmap: memory-map the file where the backend supports it. Only use this for files that will not be
+                 overwritten while loaded, such as source media.
+    :return: a PCMClip or AudioSegment.
+    """
+    with perf_timer('Audio decode'):
+        if backend:
+            return get_audio_backend(backend).load(path, mmap=mmap)
+        for audio_backend in AUDIO_BACKENDS:
+            if audio_backend.can_load(path):
+                try:
+                    return audio_backend.load(path, mmap=mmap)
+                except UnsupportedAudioError:
+                    continue
+    raise UnsupportedAudioError(f'Unable to load audio file {path}')
@@ -0,0 +1,148 @@
+import io
+import shutil
+import subprocess
+
+
+# Mapping of codec names (as shown in the settings window) to file extensions.
+AUDIO_CODECS = {
+    'WAV': 'wav',
+    'FLAC': 'flac',
+    'Opus': 'opus',
+}
+
+# Codecs that are encoded by piping PCM through ffmpeg: extension -> (ffmpeg encoder, ffmpeg container).
+FFMPEG_CODECS = {
+    'flac': ('flac', 'flac'),
+    'opus': ('libopus', 'ogg'),
+}
+
+# Raw PCM formats for ffmpeg, keyed by sample width in bytes.
+FFMPEG_PCM_FORMATS = {
+    1: 'u8',
+    2: 's16le',
+    4: 's32le',
+}
+
+# Sample rates, channel counts and bit depths offered in the settings window (None keeps the source's).
+PROFILE_FRAME_RATES = [None, 8000, 16000, 22050, 24000, 44100, 48000]
+PROFILE_CHANNELS = [None, 1, 2]
+PROFILE_BIT_DEPTHS = [None, 8, 16, 32]
+
+
+class EncoderUnavailableError(RuntimeError):
+    """
+    Raised when a codec needs ffmpeg and it cannot be found.
+    """
+    pass
+
+
+class AudioProfile(object):
+    """
+    The audio format clips are converted to on export. Fields left as None keep the format of the source clip.
+    """
+    def __init__(self,
+                 codec: str = 'wav',
+                 frame_rate: int = None,
+                 channels: int = None,
+                 bit_depth: int = None,
+                 bitrate: str = '32k') -> None:
+        """
+        :param codec: file extension of the codec, one of AUDIO_CODECS' values.
+        :param frame_rate: sample rate in Hz.
+        :param channels: channel count.
+        :param bit_depth: bits per sample (8, 16 or 32) for WAV and FLAC.
+        :param bitrate: target bitrate for Opus, in ffmpeg notation.
+        """
+        self.codec = codec
+        self.frame_rate = frame_rate
+        self.channels = channels
+        self.bit_depth = bit_depth
+        self.bitrate = bitrate
+
+    @property
+    def extension(self) -> str:
+        return self.codec
+
+    @property
+    def needs_ffmpeg(self) -> bool:
+        return self.codec in FFMPEG_CODECS
+
+    def __str__(self):
+        return ', '.join([f'{key}: {value}' for key, value in self.__dict__.items()])
+
+
+class EncodedAudio(object):
+    """
+    A clip encoded in memory, ready to be written out.
+    """
+    def __init__(self, data: bytes, extension: str) -> None:
+        self.data = data
+        self.extension = extension
+
+    def save(self, path: str) -> str:
+        with open(path, 'wb') as file:
+            file.write(self.data)
+        return path
+
+
+def get_ffmpeg() -> str:
+    """:return: the ffmpeg executable pydub has been configured with (see set_ffmpeg)."""
+    from pydub import AudioSegment
+    return AudioSegment.converter
+
+
+def set_ffmpeg(path: str) -> None:
+    """Points pydub at the ffmpeg executable, importing pydub only when it is needed."""
+    from pydub import AudioSegment
+    AudioSegment.converter = path
+
+
+def encoder_available(profile: AudioProfile) -> bool:
+    if not profile.needs_ffmpeg:
+        return True
+    return shutil.which(get_ffmpeg()) is not None
+
+
+def convert_clip(clip, profile: AudioProfile):
+    """
+    Converts a clip (PCMClip or AudioSegment) to the sample rate, channel count and bit depth of the profile.
+    """
+    if profile.channels and profile.channels != clip.channels:
+        clip = clip.set_channels(profile.channels)
+    if profile.frame_rate and profile.frame_rate != clip.frame_rate:
+        clip = clip.set_frame_rate(profile.frame_rate)
+    if profile.bit_depth and profile.bit_depth // 8 != clip.sample_width:
+        clip = clip.set_sample_width(profile.bit_depth // 8)
+    return clip
+
+
+def encode_clip(clip, profile: AudioProfile) -> EncodedAudio:
+    """
+    Converts and encodes a clip in memory. WAV is written directly, other codecs stream the raw PCM through an
+    ffmpeg process.
+    :param clip: a PCMClip or AudioSegment.
+    :param profile: the target format.
+    :return: the encoded audio.
+    """
+    clip = convert_clip(clip, profile)
+    if not profile.needs_ffmpeg:
+        buffer = io.BytesIO()
+        clip.export(buffer, format='wav')
+        return EncodedAudio(buffer.getvalue(), profile.extension)
+    encoder, container = FFMPEG_CODECS[profile.codec]
+    command = [get_ffmpeg(), '-hide_banner', '-loglevel', 'error',
+               '-f', FFMPEG_PCM_FORMATS[clip.sample_width],
+               '-ar', str(clip.frame_rate),
+               '-ac', str(clip.channels),
+               '-i', 'pipe:0',
+               '-c:a', encoder]
+    if profile.codec == 'opus':
+        command += ['-b:a', profile.bitrate]
+    command += ['-f', container, 'pipe:1']
+    try:
+        result = subprocess.run(command, input=clip.raw_data, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        raise EncoderUnavailableError(f'{profile.codec} export needs ffmpeg, which could not be found')
+    if result.returncode != 0:
+        raise RuntimeError(f'ffmpeg failed to encode {profile.codec}: {result.stderr.decode(errors="replace")}')
+    return EncodedAudio(result.stdout, profile.extension)
@@ -0,0 +1,151 @@
+import re
+from typing import List, Sequence, Tuple, Union
+import numpy as np
+
+
+TIME_PATTERN = re.compile(r'^(?:(?:(\d+):)?(\d+):)?(\d+(?:\.\d*)?)$')
+
+
+# Spans below which a node of the tree is scanned rather than split further.
+INTERVAL_LEAF_SIZE = 32
+
+
+class IntervalNode(object):
+    """
+    A node of a centred interval tree: the spans containing its centre, held sorted by start and by end, with the
+    spans wholly before and after it in its children. Leaves (centre None) hold a few spans to be scanned.
+    """
+    __slots__ = ('centre', 'before', 'after', 'by_start', 'starts', 'by_end', 'ends')
+
+    def __init__(self, centre, before, after, by_start, starts, by_end, ends) -> None:
+        self.centre = centre
+        self.before = before
+        self.after = after
+        self.by_start = by_start
+        self.starts = starts
+        self.by_end = by_end
+        self.ends = ends
+
+
+class IntervalIndex(object):
+    """
+    A static index of time spans in milliseconds (e.g. each row's clip of the source media), finding the spans that
+    overlap a range, or the span nearest a time, without scanning them all.
+
+    Spans are held in a centred interval tree: each node's centre is the median of its spans' starts and ends, so the
+    tree is balanced, and the spans containing it are kept sorted both ways, so those overlapping a range are found
+    by binary search. Queries take O(log n + k) for k results, however the spans nest.
+    """
+    def __init__(self, spans: Sequence[Tuple[float, float]], keys: Sequence[int] = None) -> None:
+        """
+        :param spans: (start, end) of each span.
+        :param keys: what to return for each span (e.g. its row), defaults to the position of the span.
+        """
+        starts = np.array([start for start, _ in spans], dtype=np.float64)
+        ends = np.array([end for _, end in spans], dtype=np.float64)
+        keys = np.arange(len(spans)) if keys is None else np.asarray(keys)
+        order = np.argsort(starts, kind='stable')
+        self.starts = starts[order]
+        self.ends = ends[order]
+        self.keys = keys[order]
+        self.end_order = np.argsort(self.ends, kind='stable')
+        self.sorted_ends = self.ends[self.end_order]
+        self.root = self.build(np.arange(len(spans)))
+
+    def build(self, positions: np.ndarray) -> Union[None, IntervalNode]:
+        """:param positions: of the spans in the node, in order of start."""
+        if not len(positions):
+            return None
+        starts, ends = self.starts[positions], self.ends[positions]
+        if len(positions) <= INTERVAL_LEAF_SIZE:
+            return IntervalNode(None, None, None, positions, starts, None, ends)
+        centre = np.median(np.concatenate((starts, ends)))
+        before, after = ends < centre, starts > centre
+        # At most half the starts and ends lie on either side of the median, so neither child has over half the spans.
+        containing = positions[~(before | after)]
+        by_end = containing[np.argsort(self.ends[containing], kind='stable')]
+        return IntervalNode(centre, self.build(positions[before]), self.build(positions[after]),
+                            containing, self.starts[containing], by_end, self.ends[by_end])
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def overlapping(self, start: float, end: float) -> List[int]:
+        """:return: the keys of the spans overlapping start to end (inclusive), in order of their start."""
+        found = []
+        nodes = [self.root]
+        while nodes:
+            node = nodes.pop()
+            if node is None:
+                continue
+            if node.centre is None:
+                found.append(node.by_start[(node.starts <= end) & (node.ends >= start)])
+            elif end < node.centre:
+                found.append(node.by_start[:np.searchsorted(node.starts, end, side='right')])
+                nodes.append(node.before)
+            elif start > node.centre:
+                found.append(node.by_end[np.searchsorted(node.ends, start, side='left'):])
+                nodes.append(node.after)
+            else:
+                found.append(node.by_start)
+                nodes.extend((node.before, node.after))
+        if not found:
+            return []
+        return self.keys[np.sort(np.concatenate(found))].tolist()
+
+    def at(self, time: float) -> List[int]:
+        """:return: the keys of the spans containing time, in order of their start."""
+        return self.overlapping(time, time)
+
+    def nearest(self, time: float) -> Union[None, int]:
+        """
+        :return: the key of the span containing time (the latest to start, if several do), otherwise of the span
+                 ending or starting closest to it. None if there are no spans.
+        """
+        containing = self.at(time)
+        if containing:
+            return containing[-1]
+        candidates = []
+        before = np.searchsorted(self.sorted_ends, time, side='left') - 1
+        if before >= 0:
+            candidates.append((time - self.sorted_ends[before], int(self.keys[self.end_order[before]])))
+        after = np.searchsorted(self.starts, time, side='right')
+        if after < len(self):
+            candidates.append((self.starts[after] - time, int(self.keys[after])))
+        return min(candidates)[1] if candidates else None
+
+
+def parse_time(text: str) -> float:
+    """
+    :param text: a time as [[hours:]minutes:]seconds, e.g. 12:30 or 1:02:03.5.
+    :return: the time in milliseconds.
+    :raises ValueError: if the time cannot be read.
+    """
+    match = TIME_PATTERN.match(text.strip())
+    if not match:
+        raise ValueError(f'Unable to read the time {text!r}, use minutes:seconds (e.g. 12:30)')
+    hours, minutes, seconds = match.groups()
+    return ((int(hours or 0) * 60 + int(minutes or 0)) * 60 + float(seconds)) * 1000
+
+
+def parse_time_range(text: str) -> Tuple[float, float]:
+    """
+    :param text: a time (see parse_time), or a range of times separated by a dash, e.g. 12:30-13:10.
+    :return: the start and end in milliseconds, the same for a single time.
+    :raises ValueError: if the times cannot be read or the range ends before it starts.
+    """
+    start, _, end = text.partition('-')
+    start = parse_time(start)
+    end = parse_time(end) if end.strip() else start
+    if end < start:
+        raise ValueError(f'The range {text!r} ends before it starts')
+    return start, end
+
+
+def format_time(milliseconds: float) -> str:
+    """:return: the time as [hours:]minutes:seconds to a tenth of a second."""
+    minutes, tenths = divmod(int(round(milliseconds / 100)), 600)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f'{hours}:{minutes:02d}:{tenths / 10:04.1f}'
+    return f'{minutes}:{tenths / 10:04.1f}'
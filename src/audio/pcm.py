@@ -0,0 +1,219 @@
+import struct
+import wave
+import numpy as np
+from typing import BinaryIO, Tuple, Union
+
+
+# Little-endian integer sample types, keyed by sample width in bytes (8-bit WAV is unsigned).
+SAMPLE_TYPES = {
+    1: np.dtype('u1'),
+    2: np.dtype('<i2'),
+    4: np.dtype('<i4'),
+}
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class UnsupportedAudioError(ValueError):
+    """
+    Raised when a file is not an uncompressed WAV file that the NumPy backend can read.
+    """
+    pass
+
+
+def read_wav_header(file: BinaryIO) -> Tuple[int, int, int, int, int, int]:
+    """
+    Walks the RIFF chunks of a WAV file to find its format and the location of its sample data.
+    :param file: a binary file object positioned at the start of the WAV file.
+    :return: format tag, channel count, frame rate, bits per sample, data offset and data size (in bytes).
+    """
+    riff, _, wave_id = struct.unpack('<4sI4s', file.read(12))
+    if riff != b'RIFF' or wave_id != b'WAVE':
+        raise UnsupportedAudioError('Not a RIFF WAVE file')
+    audio_format = None
+    while True:
+        header = file.read(8)
+        if len(header) < 8:
+            raise UnsupportedAudioError('No data chunk found')
+        chunk_id, chunk_size = struct.unpack('<4sI', header)
+        if chunk_id == b'fmt ':
+            chunk = file.read(chunk_size + chunk_size % 2)
+            format_tag, channels, frame_rate, _, _, bits = struct.unpack('<HHIIHH', chunk[:16])
+            if format_tag == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 26:
+                format_tag = struct.unpack('<H', chunk[24:26])[0]
+            audio_format = (format_tag, channels, frame_rate, bits)
+        elif chunk_id == b'data':
+            if audio_format is None:
+                raise UnsupportedAudioError('Data chunk found before format chunk')
+            return (*audio_format, file.tell(), chunk_size)
+        else:
+            file.seek(chunk_size + chunk_size % 2, 1)
+
+
+class PCMClip(object):
+    """
+    Uncompressed audio held as a NumPy array of shape (frames, channels).
+
+    Implements the subset of the pydub AudioSegment interface used by Hermes (millisecond slicing, len, export,
+    apply_gain, set_frame_rate, set_channels, set_sample_width) so the two can be used interchangeably. Slicing
+    returns views of the same samples rather than copies, so cutting clips from a (memory-mapped) media file is
+    free until the clip is exported.
+    """
+    def __init__(self,
+                 samples: np.ndarray,
+                 frame_rate: int,
+                 sample_width: int) -> None:
+        self.samples = samples if samples.ndim == 2 else samples.reshape(-1, 1)
+        self.frame_rate = frame_rate
+        self.sample_width = sample_width
+
+    @property
+    def channels(self) -> int:
+        return self.samples.shape[1]
+
+    @property
+    def frame_count(self) -> int:
+        return self.samples.shape[0]
+
+    @property
+    def duration_seconds(self) -> float:
+        return self.frame_count / self.frame_rate
+
+    @property
+    def raw_data(self) -> bytes:
+        return self.samples.tobytes()
+
+    def __len__(self) -> int:
+        """Length in milliseconds, as for AudioSegment."""
+        return round(self.duration_seconds * 1000)
+
+    def __getitem__(self, millisecond: Union[slice, int, float]) -> 'PCMClip':
+        if isinstance(millisecond, slice):
+            if millisecond.step:
+                raise ValueError('Stepped slices are not supported')
+            start = self.millisecond_to_frame(millisecond.start or 0)
+            end = self.frame_count if millisecond.stop is None else self.millisecond_to_frame(millisecond.stop)
+        else:
+            start = self.millisecond_to_frame(millisecond)
+            end = self.millisecond_to_frame(millisecond + 1)
+        return PCMClip(self.samples[start:max(start, end)], self.frame_rate, self.sample_width)
+
+    def millisecond_to_frame(self, millisecond: Union[int, float]) -> int:
+        return min(max(int(round(millisecond * self.frame_rate / 1000)), 0), self.frame_count)
+
+    def export(self, out_f: Union[str, BinaryIO], format: str = 'wav', **kwargs) -> Union[str, BinaryIO]:
+        """
+        Writes the clip to a path or file object. WAV is written directly from the sample buffer, other formats are
+        handed to pydub (and so need ffmpeg).
+        """
+        if format != 'wav':
+            return self.to_audio_segment().export(out_f, format=format, **kwargs)
+        samples = np.ascontiguousarray(self.samples)
+        with wave.open(out_f, 'wb') as wav_file:
+            wav_file.setnchannels(self.channels)
+            wav_file.setsampwidth(self.sample_width)
+            wav_file.setframerate(self.frame_rate)
+            wav_file.writeframes(memoryview(samples).cast('B'))
+        return out_f
+
+    def to_float(self) -> np.ndarray:
+        """
+        :return: a float32 copy of the samples scaled to [-1, 1).
+        """
+        if self.sample_width == 1:
+            return (self.samples.astype(np.float32) - 128) / 128
+        return self.samples.astype(np.float32) / float(2 ** (8 * self.sample_width - 1))
+
+    @classmethod
+    def from_float(cls,
+                   samples: np.ndarray,
+                   frame_rate: int,
+                   sample_width: int = 2) -> 'PCMClip':
+        """
+        Quantises float samples in [-1, 1] to integer PCM of the given width, clipping anything out of range.
+        """
+        scale = float(2 ** (8 * sample_width - 1))
+        scaled = np.clip(np.rint(samples * scale), -scale, scale - 1)
+        if sample_width == 1:
+            scaled += 128
+        return cls(scaled.astype(SAMPLE_TYPES[sample_width]), frame_rate, sample_width)
+
+    def apply_gain(self, volume_change_db: float) -> 'PCMClip':
+        factor = np.float32(10 ** (volume_change_db / 20))
+        return PCMClip.from_float(self.to_float() * factor, self.frame_rate, self.sample_width)
+
+    def set_frame_rate(self, frame_rate: int) -> 'PCMClip':
+        """
+        Band-limited resampling in the frequency domain (all channels at once).
+        """
+        if frame_rate == self.frame_rate or self.frame_count == 0:
+            return PCMClip(self.samples, frame_rate, self.sample_width)
+        new_count = max(int(round(self.frame_count * frame_rate / self.frame_rate)), 1)
+        spectrum = np.fft.rfft(self.to_float(), axis=0)
+        resampled = np.fft.irfft(spectrum, n=new_count, axis=0) * (new_count / self.frame_count)
+        return PCMClip.from_float(resampled, frame_rate, self.sample_width)
+
+    def set_channels(self, channels: int) -> 'PCMClip':
+        if channels == self.channels:
+            return self
+        if channels == 1:
+            mixed = self.to_float().mean(axis=1, keepdims=True)
+            return PCMClip.from_float(mixed, self.frame_rate, self.sample_width)
+        if self.channels == 1:
+            return PCMClip(np.repeat(self.samples, channels, axis=1), self.frame_rate, self.sample_width)
+        raise ValueError(f'Cannot convert {self.channels} channels to {channels}')
+
+    def set_sample_width(self, sample_width: int) -> 'PCMClip':
+        if sample_width == self.sample_width:
+            return self
+        return PCMClip.from_float(self.to_float(), self.frame_rate, sample_width)
+
+    def to_audio_segment(self):
+        from pydub import AudioSegment
+        return AudioSegment(data=self.raw_data,
+                            sample_width=self.sample_width,
+                            frame_rate=self.frame_rate,
+                            channels=self.channels)
+
+    @classmethod
+    def from_audio_segment(cls, segment) -> 'PCMClip':
+        samples = np.frombuffer(segment.raw_data, dtype=SAMPLE_TYPES[segment.sample_width])
+        return cls(samples.reshape(-1, segment.channels), segment.frame_rate, segment.sample_width)
+
+    @classmethod
+    def from_wav(cls, path: str, mmap: bool = True) -> 'PCMClip':
+        """
+        Reads an uncompressed WAV file. 8, 16 and 32-bit integer data is memory-mapped (unless mmap is False),
+        24-bit and floating point data is converted to 32-bit integers in memory.
+        """
+        with open(path, 'rb') as file:
+            format_tag, channels, frame_rate, bits, offset, size = read_wav_header(file)
+            file.seek(0, 2)
+            # Recorders that are interrupted may leave the data size unset, so trust the file size instead.
+            size = min(size, file.tell() - offset)
+            if format_tag == WAVE_FORMAT_PCM and bits // 8 in SAMPLE_TYPES:
+                dtype = SAMPLE_TYPES[bits // 8]
+                frames = size // (dtype.itemsize * channels)
+                if frames == 0:
+                    return cls(np.zeros((0, channels), dtype=dtype), frame_rate, bits // 8)
+                if mmap:
+                    samples = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(frames, channels))
+                else:
+                    file.seek(offset)
+                    samples = np.frombuffer(file.read(frames * dtype.itemsize * channels), dtype=dtype)
+                return cls(samples.reshape(frames, channels), frame_rate, bits // 8)
+            file.seek(offset)
+            if format_tag == WAVE_FORMAT_PCM and bits == 24:
+                frames = size // (3 * channels)
+                packed = np.frombuffer(file.read(frames * 3 * channels), dtype=np.uint8).reshape(-1, 3)
+                widened = np.zeros((packed.shape[0], 4), dtype=np.uint8)
+                widened[:, 1:] = packed
+                return cls(widened.view('<i4').reshape(frames, channels), frame_rate, 4)
+            if format_tag == WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+                dtype = np.dtype('<f4') if bits == 32 else np.dtype('<f8')
+                frames = size // (dtype.itemsize * channels)
+                samples = np.frombuffer(file.read(frames * dtype.itemsize * channels), dtype=dtype)
+                return cls.from_float(samples.reshape(frames, channels), frame_rate, 4)
+        raise UnsupportedAudioError(f'Unsupported WAV encoding (format {format_tag}, {bits} bits)')
@@ -0,0 +1,153 @@
+import hashlib
+import os
+import weakref
+import numpy as np
+from collections import OrderedDict
+from typing import List, Union
+from .backend import load_audio
+from .pcm import PCMClip
+
+
+# Frames summarised by each entry of the finest pyramid level, each coarser level halves the entries.
+PEAK_BLOCK = 256
+# Frames read at a time when building a pyramid, keeps memory-mapped media from being decoded all at once.
+BUILD_BLOCK = PEAK_BLOCK * 4096
+# Pyramids of audio files kept in memory (see load_peaks).
+PEAK_CACHE_SIZE = 32
+
+_file_cache = OrderedDict()
+# Keyed by id() as AudioSegment defines __eq__ and so is unhashable, entries are dropped with their clip.
+_clip_cache = dict()
+
+
+class PeakPyramid(object):
+    """
+    Min/max summaries of a clip at successively halved resolutions, so drawing any span of it at any zoom only
+    touches about as many values as there are pixels.
+
+    Each level is a float32 array of shape (entries, 2) holding the minimum and maximum sample (over all channels,
+    scaled to [-1, 1]) of each run of PEAK_BLOCK * 2 ** level frames.
+    """
+    def __init__(self,
+                 levels: List[np.ndarray],
+                 frame_rate: int,
+                 frame_count: int) -> None:
+        self.levels = levels
+        self.frame_rate = frame_rate
+        self.frame_count = frame_count
+
+    @classmethod
+    def from_clip(cls, clip) -> 'PeakPyramid':
+        """
+        :param clip: a PCMClip or AudioSegment.
+        """
+        if not isinstance(clip, PCMClip):
+            clip = PCMClip.from_audio_segment(clip)
+        entry_count = -(-clip.frame_count // PEAK_BLOCK)
+        minima = np.zeros(entry_count, dtype=clip.samples.dtype)
+        maxima = np.zeros(entry_count, dtype=clip.samples.dtype)
+        for block_start in range(0, clip.frame_count, BUILD_BLOCK):
+            block = clip.samples[block_start:block_start + BUILD_BLOCK]
+            first = block_start // PEAK_BLOCK
+            # Reduce the integer samples directly, only the (much smaller) summaries are scaled to floats.
+            whole = block.shape[0] // PEAK_BLOCK
+            runs = np.ascontiguousarray(block[:whole * PEAK_BLOCK]).reshape(whole, -1)
+            minima[first:first + whole] = runs.min(axis=1)
+            maxima[first:first + whole] = runs.max(axis=1)
+            if whole * PEAK_BLOCK < block.shape[0]:
+                minima[first + whole] = block[whole * PEAK_BLOCK:].min()
+                maxima[first + whole] = block[whole * PEAK_BLOCK:].max()
+        base = np.stack([PCMClip(minima, clip.frame_rate, clip.sample_width).to_float()[:, 0],
+                         PCMClip(maxima, clip.frame_rate, clip.sample_width).to_float()[:, 0]], axis=1)
+        levels = [base]
+        while levels[-1].shape[0] > 1:
+            previous = levels[-1]
+            if previous.shape[0] % 2:
+                previous = np.concatenate([previous, previous[-1:]])
+            pairs = previous.reshape(-1, 2, 2)
+            levels.append(np.stack([pairs[:, :, 0].min(axis=1), pairs[:, :, 1].max(axis=1)], axis=1))
+        return cls(levels, clip.frame_rate, clip.frame_count)
+
+    def save(self, path: str) -> None:
+        with open(path, 'wb') as file:
+            np.savez(file,
+                     info=np.array([self.frame_rate, self.frame_count]),
+                     **{f'level{index}': level for index, level in enumerate(self.levels)})
+
+    @classmethod
+    def load(cls, path: str) -> 'PeakPyramid':
+        with np.load(path) as archive:
+            frame_rate, frame_count = archive['info'].tolist()
+            levels = [archive[f'level{index}'] for index in range(len(archive.files) - 1)]
+        return cls(levels, frame_rate, frame_count)
+
+    def peaks(self, start: int, end: int, pixels: int, clip: PCMClip = None) -> np.ndarray:
+        """
+        Min/max of each of pixels equal spans of the frames [start, end).
+        :param clip: the clip the pyramid was built from. When given, spans narrower than PEAK_BLOCK frames are read
+                     from the samples themselves (still at most PEAK_BLOCK frames per pixel) rather than repeating
+                     the finest level.
+        :return: a float32 array of shape (pixels, 2).
+        """
+        start = min(max(int(start), 0), self.frame_count)
+        end = min(max(int(end), start + 1), self.frame_count)
+        if pixels <= 0 or end <= start:
+            return np.zeros((max(pixels, 0), 2), dtype=np.float32)
+        edges = np.linspace(start, end, pixels + 1)[:-1].astype(np.int64)
+        frames_per_pixel = (end - start) / pixels
+        if frames_per_pixel < PEAK_BLOCK and clip is not None:
+            samples = PCMClip(clip.samples[start:end], clip.frame_rate, clip.sample_width).to_float()
+            values, block_size, first = np.stack([samples.min(axis=1), samples.max(axis=1)], axis=1), 1, start
+        else:
+            level = max(min(int(np.log2(max(frames_per_pixel / PEAK_BLOCK, 1))), len(self.levels) - 1), 0)
+            block_size = PEAK_BLOCK * 2 ** level
+            first = start // block_size
+            values = self.levels[level][first:-(-end // block_size)]
+        # reduceat takes the single entry at an index when the next index is not greater, which upsamples cleanly.
+        indices = np.minimum(edges // block_size - first, values.shape[0] - 1)
+        return np.stack([np.minimum.reduceat(values[:, 0], indices),
+                         np.maximum.reduceat(values[:, 1], indices)], axis=1)
+
+
+def peak_cache_key(path: str) -> str:
+    """:return: a key identifying this version of an audio file."""
+    status = os.stat(path)
+    identity = f'{os.path.abspath(path)}:{status.st_size}:{status.st_mtime_ns}'
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+
+def load_peaks(path: str, cache_dir: str = None) -> PeakPyramid:
+    """
+    The peak pyramid of an audio file, built once per version of the file. Pyramids are kept in memory and, when
+    cache_dir is given, saved there so they survive restarts.
+    """
+    key = peak_cache_key(path)
+    if key in _file_cache:
+        _file_cache.move_to_end(key)
+        return _file_cache[key]
+    cache_path = os.path.join(cache_dir, f'{key}.npz') if cache_dir else None
+    pyramid = None
+    if cache_path and os.path.isfile(cache_path):
+        try:
+            pyramid = PeakPyramid.load(cache_path)
+        except (OSError, ValueError, KeyError):
+            pyramid = None
+    if pyramid is None:
+        pyramid = PeakPyramid.from_clip(load_audio(path, mmap=True))
+        if cache_path:
+            pyramid.save(cache_path)
+    _file_cache[key] = pyramid
+    if len(_file_cache) > PEAK_CACHE_SIZE:
+        _file_cache.popitem(last=False)
+    return pyramid
+
+
+def clip_peaks(clip) -> Union[None, PeakPyramid]:
+    """The peak pyramid of an in-memory clip (e.g. ELAN source media), built once for as long as the clip exists."""
+    if clip is None:
+        return None
+    key = id(clip)
+    if key not in _clip_cache:
+        _clip_cache[key] = PeakPyramid.from_clip(clip)
+        weakref.finalize(clip, _clip_cache.pop, key, None)
+    return _clip_cache[key]
@@ -0,0 +1,186 @@
+import numpy as np
+from .pcm import PCMClip
+
+
+# Loudness normalisation modes, as shown in the settings window.
+NORMALISATION_MODES = {
+    'None': None,
+    'Peak': 'peak',
+    'Loudness (LUFS)': 'loudness',
+}
+
+NORMALISATION_MODES_REV = {v: k for k, v in NORMALISATION_MODES.items()}
+
+ENVELOPE_WINDOW = 10  # Milliseconds
+LOUDNESS_BLOCK = 400  # Milliseconds (ITU-R BS.1770)
+ABSOLUTE_GATE = -70.0  # LUFS
+RELATIVE_GATE = -10.0  # LU
+SILENCE_FLOOR = -120.0  # dB, stands in for log(0)
+
+
+class ProcessingOptions(object):
+    """
+    Post-processing applied to each clip at export.
+    """
+    def __init__(self,
+                 trim_silence: bool = False,
+                 silence_threshold: float = -35.0,
+                 silence_padding: int = 50,
+                 normalisation: str = None,
+                 target_peak: float = -1.0,
+                 target_loudness: float = -23.0,
+                 fade_length: int = 0) -> None:
+        """
+        :param trim_silence: remove leading and trailing silence.
+        :param silence_threshold: windows quieter than this (dB, relative to the loudest window) count as silence.
+        :param silence_padding: milliseconds of silence kept either side of the trimmed clip.
+        :param normalisation: None, 'peak' or 'loudness'.
+        :param target_peak: peak level in dBFS for peak normalisation, and the ceiling for loudness normalisation.
+        :param target_loudness: integrated loudness in LUFS for loudness normalisation.
+        :param fade_length: milliseconds of fade in and out.
+        """
+        self.trim_silence = trim_silence
+        self.silence_threshold = silence_threshold
+        self.silence_padding = silence_padding
+        self.normalisation = normalisation
+        self.target_peak = target_peak
+        self.target_loudness = target_loudness
+        self.fade_length = fade_length
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.trim_silence or self.normalisation or self.fade_length)
+
+    def __str__(self):
+        return ', '.join([f'{key}: {value}' for key, value in self.__dict__.items()])
+
+
+def to_decibels(power: np.ndarray) -> np.ndarray:
+    return 10 * np.log10(np.maximum(power, 10 ** (SILENCE_FLOOR / 10)))
+
+
+def energy_envelope(samples: np.ndarray, frame_rate: int, window: int = ENVELOPE_WINDOW) -> np.ndarray:
+    """
+    :param samples: float samples of shape (frames, channels).
+    :param frame_rate: frames per second.
+    :param window: envelope resolution in milliseconds.
+    :return: mean power (dB) of each window, averaged across channels.
+    """
+    window_frames = max(int(frame_rate * window / 1000), 1)
+    window_count = -(-samples.shape[0] // window_frames)
+    power = np.zeros(window_count * window_frames, dtype=np.float32)
+    power[:samples.shape[0]] = np.square(samples).mean(axis=1)
+    return to_decibels(power.reshape(window_count, window_frames).mean(axis=1))
+
+
+def trim_silence(samples: np.ndarray,
+                 frame_rate: int,
+                 threshold: float = -35.0,
+                 padding: int = 50) -> np.ndarray:
+    """
+    :return: a view of samples without the leading and trailing windows quieter than threshold (dB relative to the
+             loudest window), keeping padding milliseconds either side.
+    """
+    if samples.shape[0] == 0:
+        return samples
+    envelope = energy_envelope(samples, frame_rate)
+    loud = np.flatnonzero(envelope > envelope.max() + threshold)
+    if loud.size == 0 or envelope.max() <= SILENCE_FLOOR:
+        return samples[:0]
+    window_frames = max(int(frame_rate * ENVELOPE_WINDOW / 1000), 1)
+    padding_frames = int(frame_rate * padding / 1000)
+    start = max(loud[0] * window_frames - padding_frames, 0)
+    end = min((loud[-1] + 1) * window_frames + padding_frames, samples.shape[0])
+    return samples[start:end]
+
+
+def k_weighting_response(frame_rate: int, bin_count: int, fft_length: int) -> np.ndarray:
+    """
+    Frequency response of the BS.1770 K-weighting filter (high shelf followed by high pass) at each rfft bin.
+    """
+    # High shelf
+    k = np.tan(np.pi * 1681.974450955533 / frame_rate)
+    q = 0.7071752369554196
+    vh = 10 ** (3.999843853973347 / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / q + k ** 2
+    shelf_b = np.array([(vh + vb * k / q + k ** 2), 2 * (k ** 2 - vh), (vh - vb * k / q + k ** 2)]) / a0
+    shelf_a = np.array([a0, 2 * (k ** 2 - 1), (1 - k / q + k ** 2)]) / a0
+    # High pass
+    k = np.tan(np.pi * 38.13547087602444 / frame_rate)
+    q = 0.5003270373238773
+    a0 = 1 + k / q + k ** 2
+    pass_b = np.array([1.0, -2.0, 1.0])
+    pass_a = np.array([a0, 2 * (k ** 2 - 1), (1 - k / q + k ** 2)]) / a0
+
+    z = np.exp(-2j * np.pi * np.arange(bin_count) / fft_length)
+    powers = np.stack([np.ones_like(z), z, z ** 2])
+    return (shelf_b @ powers) / (shelf_a @ powers) * (pass_b @ powers) / (pass_a @ powers)
+
+
+def integrated_loudness(samples: np.ndarray, frame_rate: int) -> float:
+    """
+    Gated integrated loudness (LUFS) following ITU-R BS.1770, with the K-weighting applied in the frequency
+    domain. Clips shorter than one block are measured as a single block.
+    """
+    frame_count = samples.shape[0]
+    if frame_count == 0:
+        return SILENCE_FLOOR
+    fft_length = 1 << int(np.ceil(np.log2(frame_count + frame_rate // 10)))
+    spectrum = np.fft.rfft(samples, n=fft_length, axis=0)
+    spectrum *= k_weighting_response(frame_rate, spectrum.shape[0], fft_length)[:, None]
+    weighted = np.fft.irfft(spectrum, n=fft_length, axis=0)[:frame_count]
+
+    energy = np.concatenate([np.zeros(1), np.cumsum(np.square(weighted).sum(axis=1))])
+    block = min(int(frame_rate * LOUDNESS_BLOCK / 1000), frame_count)
+    starts = np.arange(0, frame_count - block + 1, max(block // 4, 1))
+    block_power = (energy[starts + block] - energy[starts]) / block
+    block_loudness = -0.691 + to_decibels(block_power)
+
+    gated = block_power[block_loudness > ABSOLUTE_GATE]
+    if gated.size == 0:
+        return SILENCE_FLOOR
+    relative_gate = -0.691 + to_decibels(gated.mean()) + RELATIVE_GATE
+    gated = block_power[block_loudness > max(relative_gate, ABSOLUTE_GATE)]
+    return float(-0.691 + to_decibels(gated.mean()))
+
+
+def peak_level(samples: np.ndarray) -> float:
+    """:return: sample peak in dBFS."""
+    if samples.size == 0:
+        return SILENCE_FLOOR
+    return float(to_decibels(np.square(np.abs(samples).max())))
+
+
+def apply_fades(samples: np.ndarray, frame_rate: int, fade_length: int) -> np.ndarray:
+    """Applies linear fades in and out (in place) of up to fade_length milliseconds each."""
+    fade_frames = min(int(frame_rate * fade_length / 1000), samples.shape[0] // 2)
+    if fade_frames > 0:
+        ramp = np.linspace(0, 1, fade_frames, dtype=samples.dtype)[:, None]
+        samples[:fade_frames] *= ramp
+        samples[-fade_frames:] *= ramp[::-1]
+    return samples
+
+
+def process_clip(clip, options: ProcessingOptions) -> PCMClip:
+    """
+    Applies silence trimming, normalisation and fades to a clip.
+    :param clip: a PCMClip or AudioSegment.
+    :param options: the processing to apply.
+    :return: a new PCMClip (the original clip is not modified).
+    """
+    if not isinstance(clip, PCMClip):
+        clip = PCMClip.from_audio_segment(clip)
+    samples = clip.to_float()
+    if options.trim_silence:
+        samples = trim_silence(samples, clip.frame_rate, options.silence_threshold, options.silence_padding)
+    peak = peak_level(samples)
+    if options.normalisation == 'peak' and peak > SILENCE_FLOOR:
+        samples *= np.float32(10 ** ((options.target_peak - peak) / 20))
+    elif options.normalisation == 'loudness' and peak > SILENCE_FLOOR:
+        gain = options.target_loudness - integrated_loudness(samples, clip.frame_rate)
+        gain = min(gain, options.target_peak - peak)
+        samples *= np.float32(10 ** (gain / 20))
+    if options.fade_length:
+        apply_fades(samples, clip.frame_rate, options.fade_length)
+    return PCMClip.from_float(samples, clip.frame_rate, clip.sample_width)
@@ -0,0 +1,193 @@
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import numpy as np
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+from .pcm import PCMClip
+from .processing import ENVELOPE_WINDOW, energy_envelope, peak_level, to_decibels
+
+
+# Sample magnitude counted as clipped.
+CLIP_LEVEL = 0.999
+# Windows this far (dB) below the loudest window count as leading/trailing silence, as for trim_silence.
+SILENCE_THRESHOLD = -35.0
+# Percentiles of window energy taken as the noise floor and the speech level when estimating SNR.
+NOISE_PERCENTILE = 10
+SIGNAL_PERCENTILE = 95
+# Below this many clips to analyse, starting a process pool costs more than it saves.
+MIN_POOL_CLIPS = 16
+# Clips queued per process, enough to keep each busy without converting (and copying) every clip up front.
+CLIPS_PER_WORKER = 4
+
+# Checks applied to each report: (issue, test).
+QC_CHECKS = [
+    ('Clipped', lambda report: report.clipping > 0),
+    ('Silent', lambda report: report.peak < -40),
+    ('Quiet', lambda report: -40 <= report.peak < -20),
+    ('DC offset', lambda report: report.dc_offset > 0.02),
+    ('Noisy', lambda report: report.snr < 15),
+    ('Too short', lambda report: report.duration < 0.15),
+    ('Long silence', lambda report: max(report.leading_silence, report.trailing_silence) > 1000),
+]
+
+
+class ClipReport(object):
+    """
+    Quality measurements of a single clip. Levels are in dBFS, silences in milliseconds, duration in seconds, the
+    clipping ratio is the fraction of samples at full scale and the DC offset a fraction of full scale.
+    """
+    def __init__(self,
+                 duration: float,
+                 peak: float,
+                 rms: float,
+                 clipping: float,
+                 dc_offset: float,
+                 snr: float,
+                 leading_silence: float,
+                 trailing_silence: float) -> None:
+        self.duration = duration
+        self.peak = peak
+        self.rms = rms
+        self.clipping = clipping
+        self.dc_offset = dc_offset
+        self.snr = snr
+        self.leading_silence = leading_silence
+        self.trailing_silence = trailing_silence
+
+    @property
+    def issues(self) -> List[str]:
+        return [issue for issue, check in QC_CHECKS if check(self)]
+
+    def to_dict(self) -> Dict[str, float]:
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, float]) -> 'ClipReport':
+        return cls(**values)
+
+
+def analyse_samples(samples: np.ndarray, frame_rate: int, sample_width: int) -> ClipReport:
+    """
+    :param samples: integer PCM samples of shape (frames, channels), as PCMClip.samples.
+    :return: the quality measurements of the samples.
+    """
+    floats = PCMClip(samples, frame_rate, sample_width).to_float()
+    duration = floats.shape[0] / frame_rate
+    if floats.shape[0] == 0:
+        return ClipReport(duration, peak_level(floats), peak_level(floats), 0.0, 0.0, 0.0, 0.0, 0.0)
+    envelope = energy_envelope(floats, frame_rate)
+    loud = np.flatnonzero(envelope > envelope.max() + SILENCE_THRESHOLD)
+    if loud.size:
+        leading = float(loud[0] * ENVELOPE_WINDOW)
+        trailing = float((envelope.size - 1 - loud[-1]) * ENVELOPE_WINDOW)
+    else:
+        leading, trailing = duration * 1000, 0.0
+    noise, signal = np.percentile(envelope, [NOISE_PERCENTILE, SIGNAL_PERCENTILE])
+    return ClipReport(duration=duration,
+                      peak=peak_level(floats),
+                      rms=float(to_decibels(np.square(floats).mean())),
+                      clipping=float(np.count_nonzero(np.abs(floats) >= CLIP_LEVEL) / floats.size),
+                      dc_offset=float(np.abs(floats.mean(axis=0)).max()),
+                      snr=float(signal - noise),
+                      leading_silence=leading,
+                      trailing_silence=trailing)
+
+
+def clip_hash(clip: PCMClip) -> str:
+    """:return: a digest of a clip's format and samples, identifying it in the QC cache."""
+    digest = hashlib.sha1(f'{clip.frame_rate}:{clip.sample_width}:{clip.channels}:'.encode('utf-8'))
+    digest.update(memoryview(np.ascontiguousarray(clip.samples)).cast('B'))
+    return digest.hexdigest()
+
+
+def run_qc(clips: Sequence[Tuple[object, PCMClip]],
+           cache: Dict[str, Dict[str, float]],
+           workers: int = None,
+           progress: Callable[[float], None] = None,
+           cancelled: Callable[[], bool] = None) -> Dict[object, ClipReport]:
+    """
+    Analyses clips on a pool of processes, skipping any whose samples are already in the cache. Each clip is converted
+    and hashed as it is queued, with at most CLIPS_PER_WORKER clips per process queued at a time.
+    :param clips: (key, clip) pairs, the keys (e.g. table rows) identify the results.
+    :param cache: reports (as dicts) by clip_hash, updated with the clips analysed.
+    :param workers: number of processes (defaults to the CPU count).
+    :param progress: called with the fraction of clips done.
+    :param cancelled: polled between clips, stops early (returning the reports so far) when it returns True.
+    :return: a report for each key.
+    """
+    reports = dict()
+    total = len(clips)
+    done = 0
+
+    def store(key, report: ClipReport, digest: str = None) -> None:
+        nonlocal done
+        reports[key] = report
+        if digest is not None:
+            cache[digest] = report.to_dict()
+        done += 1
+        if progress:
+            progress(done / total)
+
+    def uncached_clips() -> Iterator[Tuple[object, str, PCMClip]]:
+        """Yields the (key, digest, clip) of each clip not in the cache, storing the cached reports of the rest."""
+        for key, clip in clips:
+            if cancelled and cancelled():
+                return
+            if not isinstance(clip, PCMClip):
+                clip = PCMClip.from_audio_segment(clip)
+            digest = clip_hash(clip)
+            if digest in cache:
+                store(key, ClipReport.from_dict(cache[digest]))
+            else:
+                yield key, digest, clip
+
+    pending = uncached_clips()
+    first = list(itertools.islice(pending, MIN_POOL_CLIPS))
+    if len(first) < MIN_POOL_CLIPS:
+        for key, digest, clip in first:
+            if cancelled and cancelled():
+                break
+            store(key, analyse_samples(clip.samples, clip.frame_rate, clip.sample_width), digest)
+        return reports
+    workers = workers or os.cpu_count() or 1
+    futures = dict()
+
+    def collect(return_when: str) -> None:
+        finished, _ = wait(futures, return_when=return_when)
+        for future in finished:
+            key, digest = futures.pop(future)
+            store(key, future.result(), digest)
+
+    # Spawned rather than forked, forking a process running Qt threads is unsafe.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        for key, digest, clip in itertools.chain(first, pending):
+            if len(futures) >= workers * CLIPS_PER_WORKER:
+                collect(FIRST_COMPLETED)
+            if cancelled and cancelled():
+                break
+            futures[executor.submit(analyse_samples, np.ascontiguousarray(clip.samples), clip.frame_rate,
+                                    clip.sample_width)] = (key, digest)
+        if cancelled and cancelled():
+            # Clips still queued are dropped, those already being analysed are kept.
+            for future in [future for future in futures if future.cancel()]:
+                del futures[future]
+        collect(ALL_COMPLETED)
+    return reports
+
+
+def load_qc_cache(path: str) -> Dict[str, Dict[str, float]]:
+    if not os.path.isfile(path):
+        return dict()
+    try:
+        with open(path, 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return dict()
+
+
+def save_qc_cache(path: str, cache: Dict[str, Dict[str, float]]) -> None:
+    with open(path, 'w') as file:
+        json.dump(cache, file)
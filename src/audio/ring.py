@@ -0,0 +1,41 @@
+import numpy as np
+
+
+class RingBuffer(object):
+    """
+    Fixed-capacity buffer holding the most recent frames of a live input, addressed by absolute frame position
+    (frames written since the buffer was created) so clips can be cut after the fact, including pre-roll.
+    """
+    def __init__(self, capacity: int, channels: int = 1, dtype: np.dtype = np.int16) -> None:
+        self.buffer = np.zeros((capacity, channels), dtype=dtype)
+        self.capacity = capacity
+        self.written = 0
+
+    @property
+    def oldest(self) -> int:
+        """:return: absolute position of the oldest frame still held."""
+        return max(self.written - self.capacity, 0)
+
+    def write(self, frames: np.ndarray) -> None:
+        frames = frames.reshape(-1, self.buffer.shape[1])
+        if frames.shape[0] > self.capacity:
+            self.written += frames.shape[0] - self.capacity
+            frames = frames[-self.capacity:]
+        start = self.written % self.capacity
+        first = min(frames.shape[0], self.capacity - start)
+        self.buffer[start:start + first] = frames[:first]
+        self.buffer[:frames.shape[0] - first] = frames[first:]
+        self.written += frames.shape[0]
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """
+        :param start: absolute position of the first frame, clamped to the oldest frame held.
+        :param end: absolute position after the last frame, clamped to the frames written.
+        :return: a copy of the frames in [start, end).
+        """
+        start = max(start, self.oldest)
+        end = min(end, self.written)
+        if end <= start:
+            return self.buffer[:0].copy()
+        indices = np.arange(start, end) % self.capacity
+        return self.buffer[indices]
@@ -0,0 +1,166 @@
+import numpy as np
+from typing import Callable, List, Tuple
+from .pcm import PCMClip
+from .processing import to_decibels
+
+
+class SegmentationOptions(object):
+    """
+    Parameters for finding spoken segments in a long recording.
+    """
+    def __init__(self,
+                 window: int = 10,
+                 threshold: float = 12.0,
+                 noise_percentile: float = 10.0,
+                 min_speech: int = 150,
+                 min_silence: int = 300,
+                 padding: int = 50,
+                 block_length: int = 60) -> None:
+        """
+        :param window: energy envelope resolution in milliseconds.
+        :param threshold: dB above the estimated noise floor for a window to count as speech.
+        :param noise_percentile: percentile of window energies taken as the noise floor.
+        :param min_speech: segments shorter than this (milliseconds) are discarded.
+        :param min_silence: pauses shorter than this (milliseconds) do not split a segment.
+        :param padding: milliseconds added either side of each segment.
+        :param block_length: seconds of audio read and processed at a time.
+        """
+        self.window = window
+        self.threshold = threshold
+        self.noise_percentile = noise_percentile
+        self.min_speech = min_speech
+        self.min_silence = min_silence
+        self.padding = padding
+        self.block_length = block_length
+
+
+def block_envelope(clip: PCMClip,
+                   window: int,
+                   block_length: int,
+                   progress: Callable[[float], None] = None,
+                   cancelled: Callable[[], bool] = None) -> np.ndarray:
+    """
+    Energy envelope (dB per window) of a clip, computed a block at a time so only one block of a memory-mapped file
+    is ever decoded.
+    """
+    window_frames = max(int(clip.frame_rate * window / 1000), 1)
+    block_frames = window_frames * max(int(block_length * 1000 / window), 1)
+    window_count = -(-clip.frame_count // window_frames)
+    envelope = np.empty(window_count, dtype=np.float32)
+    for block_start in range(0, clip.frame_count, block_frames):
+        if cancelled and cancelled():
+            break
+        block = PCMClip(clip.samples[block_start:block_start + block_frames], clip.frame_rate, clip.sample_width)
+        samples = block.to_float()
+        padded_count = -(-samples.shape[0] // window_frames) * window_frames
+        power = np.zeros(padded_count, dtype=np.float32)
+        power[:samples.shape[0]] = np.square(samples).mean(axis=1)
+        first_window = block_start // window_frames
+        envelope[first_window:first_window + padded_count // window_frames] = \
+            to_decibels(power.reshape(-1, window_frames).mean(axis=1))
+        if progress:
+            progress(min(block_start + block_frames, clip.frame_count) / clip.frame_count)
+    return envelope
+
+
+def find_segments(envelope: np.ndarray, options: SegmentationOptions) -> List[Tuple[int, int]]:
+    """
+    :param envelope: energy envelope in dB, one value per options.window milliseconds.
+    :param options: segmentation parameters.
+    :return: (start, end) spans in milliseconds of the speech found in the envelope.
+    """
+    if envelope.size == 0:
+        return []
+    noise_floor = np.percentile(envelope, options.noise_percentile)
+    voiced = np.concatenate([[0], (envelope > noise_floor + options.threshold).astype(np.int8), [0]])
+    changes = np.diff(voiced)
+    starts = np.flatnonzero(changes == 1)
+    ends = np.flatnonzero(changes == -1)
+    if starts.size == 0:
+        return []
+    # Bridge pauses shorter than min_silence.
+    keep = (starts[1:] - ends[:-1]) * options.window >= options.min_silence
+    starts = starts[np.concatenate([[True], keep])]
+    ends = ends[np.concatenate([keep, [True]])]
+    # Drop segments shorter than min_speech.
+    long_enough = (ends - starts) * options.window >= options.min_speech
+    starts = np.maximum(starts[long_enough] * options.window - options.padding, 0)
+    ends = np.minimum(ends[long_enough] * options.window + options.padding, envelope.size * options.window)
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def detect_segments(clip,
+                    options: SegmentationOptions = None,
+                    progress: Callable[[float], None] = None,
+                    cancelled: Callable[[], bool] = None) -> List[Tuple[int, int]]:
+    """
+    Energy-based voice activity detection over a (long) recording.
+    :param clip: a PCMClip (ideally memory-mapped, see load_audio) or AudioSegment.
+    :param options: segmentation parameters.
+    :param progress: called with the fraction of the recording processed.
+    :param cancelled: polled between blocks, stops processing when it returns True.
+    :return: (start, end) spans in milliseconds.
+    """
+    options = options or SegmentationOptions()
+    if not isinstance(clip, PCMClip):
+        clip = PCMClip.from_audio_segment(clip)
+    envelope = block_envelope(clip, options.window, options.block_length, progress, cancelled)
+    if cancelled and cancelled():
+        return []
+    return find_segments(envelope, options)
+
+
+class StreamingSegmenter(object):
+    """
+    Online counterpart of detect_segments for live input. Audio is fed in as it arrives and each span of speech is
+    returned once it has been followed by options.min_silence of silence. The noise floor is tracked as audio
+    arrives rather than estimated from the whole recording.
+    """
+    def __init__(self, frame_rate: int, options: SegmentationOptions = None) -> None:
+        self.options = options or SegmentationOptions()
+        self.window_frames = max(int(frame_rate * self.options.window / 1000), 1)
+        self.min_speech_frames = int(frame_rate * self.options.min_speech / 1000)
+        self.min_silence_frames = int(frame_rate * self.options.min_silence / 1000)
+        self.remainder = np.zeros(0, dtype=np.float32)
+        self.position = 0
+        self.noise_floor = None
+        self.speech_start = None
+        self.speech_end = None
+
+    @property
+    def in_speech(self) -> bool:
+        return self.speech_start is not None
+
+    def reset(self) -> None:
+        """Forgets any speech in progress (e.g. after a manual split), keeping the noise floor."""
+        self.speech_start = None
+        self.speech_end = None
+
+    def feed(self, samples: np.ndarray) -> List[Tuple[int, int]]:
+        """
+        :param samples: mono float samples following on from the previous call.
+        :return: (start, end) spans, in frames since the first call, of speech completed by these samples.
+        """
+        samples = np.concatenate([self.remainder, samples.astype(np.float32).ravel()])
+        window_count = samples.shape[0] // self.window_frames
+        self.remainder = samples[window_count * self.window_frames:]
+        windows = samples[:window_count * self.window_frames].reshape(window_count, self.window_frames)
+        energies = to_decibels(np.square(windows).mean(axis=1))
+        spans = []
+        for energy in energies:
+            window_start = self.position
+            self.position += self.window_frames
+            if self.noise_floor is None:
+                self.noise_floor = energy
+            if energy > self.noise_floor + self.options.threshold:
+                if self.speech_start is None:
+                    self.speech_start = window_start
+                self.speech_end = self.position
+                continue
+            # Track the noise floor down quickly and up slowly.
+            self.noise_floor = min(energy, 0.95 * self.noise_floor + 0.05 * energy)
+            if self.speech_start is not None and self.position - self.speech_end >= self.min_silence_frames:
+                if self.speech_end - self.speech_start >= self.min_speech_frames:
+                    spans.append((self.speech_start, self.speech_end))
+                self.reset()
+        return spans
@@ -0,0 +1,69 @@
+"""
+Clip cut and export throughput for each audio backend.
+
+Run from the src directory:
+    python -m benchmarks.audio_backends [--minutes 10] [--clips 500]
+"""
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+from audio import PCMClip, get_audio_backend, get_audio_backends
+
+
+def write_source_wav(path: str, minutes: float, frame_rate: int = 44100, channels: int = 2) -> None:
+    """Writes a noise-modulated tone long enough to cut clips from."""
+    frame_count = int(minutes * 60 * frame_rate)
+    rng = np.random.default_rng(0)
+    time_axis = np.arange(frame_count, dtype=np.float32) / frame_rate
+    tone = 0.3 * np.sin(2 * np.pi * 220 * time_axis) + 0.05 * rng.standard_normal(frame_count, dtype=np.float32)
+    PCMClip.from_float(np.repeat(tone[:, None], channels, axis=1), frame_rate).export(path)
+
+
+def get_clip_spans(duration_ms: int, clip_count: int, clip_ms: int = 800) -> list:
+    starts = np.linspace(0, duration_ms - clip_ms, clip_count).astype(int)
+    return [(int(start), int(start) + clip_ms) for start in starts]
+
+
+def run_backend(name: str, source_path: str, spans: list, export_dir: str) -> dict:
+    backend = get_audio_backend(name)
+    start_time = time.perf_counter()
+    media = backend.load(source_path, mmap=True)
+    load_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    clips = [media[start:end] for start, end in spans]
+    cut_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for index, clip in enumerate(clips):
+        clip.export(os.path.join(export_dir, f'{name}-{index}.wav'), format='wav')
+    export_time = time.perf_counter() - start_time
+    return {
+        'backend': name,
+        'load_s': load_time,
+        'cut_per_s': len(clips) / max(cut_time, 1e-9),
+        'export_per_s': len(clips) / max(export_time, 1e-9),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--minutes', type=float, default=10, help='length of the synthetic source recording')
+    parser.add_argument('--clips', type=int, default=500, help='number of clips to cut and export')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source_path = os.path.join(directory, 'source.wav')
+        write_source_wav(source_path, args.minutes)
+        spans = get_clip_spans(int(args.minutes * 60 * 1000), args.clips)
+        print(f'{"backend":<10}{"load (s)":>12}{"cuts/s":>14}{"exports/s":>14}')
+        for name in get_audio_backends():
+            result = run_backend(name, source_path, spans, directory)
+            print(f'{result["backend"]:<10}{result["load_s"]:>12.3f}'
+                  f'{result["cut_per_s"]:>14.0f}{result["export_per_s"]:>14.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Generators for synthetic ELAN projects: an EAF file with aligned tiers of made-up words and a matching WAV with a
+tone burst under each annotation. The same arguments (and seed) always give the same files.
+"""
+import os
+import random
+import wave
+import xml.etree.ElementTree as ElementTree
+from typing import List, Sequence, Tuple
+from urllib.request import pathname2url
+import numpy as np
+
+
+SYLLABLES = ['ka', 'li', 'mu', 'ra', 'ngu', 'ta', 'wi', 'ju', 'pa', 'ri', 'yu', 'ma', 'nhi', 'ku', 'la']
+DEFAULT_TIERS = ('Transcription', 'Translation')
+
+# Seconds of audio generated at a time, bounds memory use on long recordings.
+WAV_CHUNK_SECONDS = 60
+
+
+def synthetic_word(rng: random.Random, syllables: int = None) -> str:
+    return ''.join(rng.choice(SYLLABLES) for _ in range(syllables or rng.randint(1, 4)))
+
+
+def get_annotation_spans(annotation_count: int,
+                         annotation_ms: int = 400,
+                         gap_ms: int = 100) -> List[Tuple[int, int]]:
+    """:return: (start, end) in milliseconds of each annotation, one after the other with a gap between."""
+    return [(index * (annotation_ms + gap_ms) + gap_ms, (index + 1) * (annotation_ms + gap_ms))
+            for index in range(annotation_count)]
+
+
+def write_synthetic_wav(path: str,
+                        spans: Sequence[Tuple[int, int]],
+                        frame_rate: int = 8000,
+                        seed: int = 0) -> None:
+    """
+    Writes a mono 16-bit WAV long enough for the spans, with a tone burst (and a little noise) in each span.
+    :param spans: (start, end) in milliseconds, as from get_annotation_spans, at least one.
+    """
+    duration_ms = spans[-1][1] + 500
+    frame_count = duration_ms * frame_rate // 1000
+    starts = np.array([start for start, _ in spans], dtype=np.int64) * frame_rate // 1000
+    ends = np.array([end for _, end in spans], dtype=np.int64) * frame_rate // 1000
+    rng = np.random.default_rng(seed)
+    chunk_frames = WAV_CHUNK_SECONDS * frame_rate
+    with wave.open(path, 'wb') as file:
+        file.setnchannels(1)
+        file.setsampwidth(2)
+        file.setframerate(frame_rate)
+        for chunk_start in range(0, frame_count, chunk_frames):
+            frames = np.arange(chunk_start, min(chunk_start + chunk_frames, frame_count))
+            samples = 0.01 * rng.standard_normal(len(frames))
+            # The span each frame falls in (if any), found by searching the sorted span starts.
+            span = np.searchsorted(starts, frames, side='right') - 1
+            voiced = (span >= 0) & (frames < ends[np.clip(span, 0, None)])
+            pitch = 150 + 10 * (span % 20)
+            samples[voiced] += 0.4 * np.sin(2 * np.pi * pitch[voiced] * frames[voiced] / frame_rate)
+            file.writeframes((np.clip(samples, -1, 1) * 32767).astype('<i2').tobytes())
+
+
+def write_synthetic_eaf(path: str,
+                        media_path: str,
+                        spans: Sequence[Tuple[int, int]],
+                        tiers: Sequence[str] = DEFAULT_TIERS,
+                        seed: int = 0) -> None:
+    """
+    Writes an EAF file with an annotation on every tier for each span, linked to the media file. The first tier
+    holds words, the others their "translations" (other made-up words) aligned to the same times.
+    """
+    rng = random.Random(seed)
+    document = ElementTree.Element('ANNOTATION_DOCUMENT', {
+        'AUTHOR': 'Hermes benchmarks',
+        'DATE': '2020-01-01T00:00:00+00:00',
+        'FORMAT': '3.0',
+        'VERSION': '3.0',
+        'xmlns:xsi': 'http://www.w3.org/2001/XMLSchema-instance',
+        'xsi:noNamespaceSchemaLocation': 'http://www.mpi.nl/tools/elan/EAFv3.0.xsd',
+    })
+    header = ElementTree.SubElement(document, 'HEADER', {'MEDIA_FILE': '', 'TIME_UNITS': 'milliseconds'})
+    ElementTree.SubElement(header, 'MEDIA_DESCRIPTOR', {
+        'MEDIA_URL': 'file://' + pathname2url(os.path.abspath(media_path)),
+        'MIME_TYPE': 'audio/x-wav',
+        'RELATIVE_MEDIA_URL': './' + os.path.basename(media_path),
+    })
+    time_order = ElementTree.SubElement(document, 'TIME_ORDER')
+    for index, span in enumerate(spans):
+        for slot, time_value in enumerate(span, start=2 * index + 1):
+            ElementTree.SubElement(time_order, 'TIME_SLOT', {'TIME_SLOT_ID': f'ts{slot}',
+                                                             'TIME_VALUE': str(time_value)})
+    annotation_id = 0
+    for tier in tiers:
+        tier_element = ElementTree.SubElement(document, 'TIER', {'LINGUISTIC_TYPE_REF': 'default-lt',
+                                                                 'TIER_ID': tier})
+        for index in range(len(spans)):
+            annotation_id += 1
+            annotation = ElementTree.SubElement(ElementTree.SubElement(tier_element, 'ANNOTATION'),
+                                                'ALIGNABLE_ANNOTATION', {
+                                                    'ANNOTATION_ID': f'a{annotation_id}',
+                                                    'TIME_SLOT_REF1': f'ts{2 * index + 1}',
+                                                    'TIME_SLOT_REF2': f'ts{2 * index + 2}',
+                                                })
+            ElementTree.SubElement(annotation, 'ANNOTATION_VALUE').text = synthetic_word(rng)
+    ElementTree.SubElement(document, 'LINGUISTIC_TYPE', {'GRAPHIC_REFERENCES': 'false',
+                                                         'LINGUISTIC_TYPE_ID': 'default-lt',
+                                                         'TIME_ALIGNABLE': 'true'})
+    ElementTree.ElementTree(document).write(path, encoding='UTF-8', xml_declaration=True)
+
+
+def write_synthetic_project(directory: str,
+                            annotation_count: int,
+                            tiers: Sequence[str] = DEFAULT_TIERS,
+                            annotation_ms: int = 400,
+                            gap_ms: int = 100,
+                            frame_rate: int = 8000,
+                            seed: int = 0) -> Tuple[str, str]:
+    """
+    Writes synthetic.eaf and synthetic.wav to directory.
+    :return: the paths of the EAF and WAV files.
+    """
+    spans = get_annotation_spans(annotation_count, annotation_ms, gap_ms)
+    eaf_path = os.path.join(directory, 'synthetic.eaf')
+    wav_path = os.path.join(directory, 'synthetic.wav')
+    write_synthetic_wav(wav_path, spans, frame_rate, seed)
+    write_synthetic_eaf(eaf_path, wav_path, spans, tiers, seed)
+    return eaf_path, wav_path
@@ -0,0 +1,255 @@
+"""
+Times the main Hermes workflows on synthetic ELAN projects (see benchmarks.synthetic) of each size: EAF parse,
+extract_elan_data, match_translations, sample cutting, table population, filter_rows, save_project,
+load_project_data and every available export mode. Runs headless on the offscreen Qt platform.
+
+Results are saved to benchmarks/results/<commit>.json, compare them between commits with --compare.
+
+Run from the src directory:
+    python -m benchmarks.workflows [--sizes 1000 10000 100000] [--compare results/<commit>.json]
+"""
+import os
+# Must be set before Qt is first imported.
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Union
+from PyQt5.QtWidgets import QApplication, QMainWindow, QStatusBar
+# The windows package is imported first, as in main.py, the widgets import it back part way through.
+from windows.primary import ProgressBarWidget
+from audio import load_audio
+from audio.encode import encoder_available
+from datatypes import AppSettings, ConverterComponents, ConverterData, OperationMode, OutputMode, create_lmf
+from utilities.exporters import EXPORTERS, load_built_in_exporters
+from utilities.parse import extract_elan_data, extract_transcriptions, extract_translations, match_translations
+from utilities.pipeline import iter_export_audio
+from utilities.targets import DirectoryTarget
+from widgets.session import SessionManager
+from widgets.table import FilterTable
+from .synthetic import DEFAULT_TIERS, write_synthetic_project
+
+
+RESULTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+DEFAULT_SIZES = [1000, 10000, 100000]
+# Benchmarks that scan every translation for each transcription are only run up to this many rows by default.
+QUADRATIC_LIMIT = 10000
+
+BENCHMARKS = []
+
+
+def benchmark(name: str, quadratic: bool = False) -> Callable:
+    """
+    Function decorator adding a step to the suite. Steps run in the order declared, each building on the state the
+    previous ones left in the fixture.
+    :param quadratic: the step's time grows with the square of the rows, so it is skipped above the quadratic limit.
+    """
+    def register(function: Callable) -> Callable:
+        BENCHMARKS.append(SimpleNamespace(name=name, function=function, quadratic=quadratic))
+        return function
+    return register
+
+
+class Fixture(object):
+    """
+    A synthetic project in a temporary folder, with a session and table set up as the converter would, minus the
+    rest of the window.
+    """
+    def __init__(self, app: QApplication, directory: str, size: int) -> None:
+        self.size = size
+        self.eaf_path, self.wav_path = write_synthetic_project(directory, size)
+        self.data = ConverterData()
+        self.data.mode = OperationMode.ELAN
+        self.data.elan_file = self.eaf_path
+        self.data.audio_file = load_audio(self.wav_path, mmap=True)
+        self.settings = AppSettings()
+        self.settings.project_root_dir = directory
+        self.window = QMainWindow()
+        self.window.settings = self.settings
+        self.components = ConverterComponents(ProgressBarWidget(app), QStatusBar())
+        self.session = SessionManager(self.window)
+        self.session.converter = SimpleNamespace(components=self.components, data=self.data)
+        self.session.project_name = 'benchmark'
+        self.session.setup_project_paths()
+        for path in (self.session.assets_audio_path, self.session.assets_images_path, self.session.export_path,
+                     self.session.templates_path, self.session.saves_path):
+            os.makedirs(path)
+
+
+@benchmark('EAF parse')
+def run_eaf_parse(fixture: Fixture) -> None:
+    import pympi
+    fixture.data.eaf_object = pympi.Elan.Eaf(fixture.eaf_path)
+
+
+@benchmark('extract_elan_data', quadratic=True)
+def run_extract_elan_data(fixture: Fixture) -> None:
+    extract_elan_data(DEFAULT_TIERS[0], DEFAULT_TIERS[1], fixture.data)
+
+
+@benchmark('Transcriptions (unmatched)')
+def run_extract_transcriptions(fixture: Fixture) -> None:
+    # Builds the rows the later steps need without matching translations, which is timed separately.
+    data = fixture.data
+    translations = data.translations
+    data.translations = []
+    data.transcriptions = extract_transcriptions(DEFAULT_TIERS[0], data, data.audio_file)
+    data.translations = translations
+
+
+@benchmark('match_translations', quadratic=True)
+def run_match_translations(fixture: Fixture) -> None:
+    fixture.data.translations = extract_translations(DEFAULT_TIERS[1], fixture.data)
+    for transcription in fixture.data.transcriptions:
+        transcription.translation = match_translations(transcription, fixture.data.translations)
+
+
+@benchmark('Sample cut')
+def run_sample_cut(fixture: Fixture) -> None:
+    for transcription in fixture.data.transcriptions:
+        transcription.sample.get_clip()
+
+
+@benchmark('Table populate')
+def run_table_populate(fixture: Fixture) -> None:
+    fixture.components.filter_table = FilterTable(fixture.data, fixture.components.status_bar, fixture.settings)
+    fixture.components.table = fixture.components.filter_table.table
+    fixture.components.filter_table.populate_table(fixture.data.transcriptions)
+
+
+@benchmark('filter_rows')
+def run_filter_rows(fixture: Fixture) -> None:
+    fixture.components.table.filter_rows('ka')
+    fixture.components.table.filter_rows('')
+
+
+@benchmark('save_project')
+def run_save_project(fixture: Fixture) -> None:
+    fixture.session.save_project()
+
+
+@benchmark('load_project_data')
+def run_load_project_data(fixture: Fixture) -> None:
+    fixture.session.load_project_data()
+
+
+def run_export(fixture: Fixture, mode: OutputMode) -> Union[None, float]:
+    """:return: the time to export every row in mode, or None if the mode (or its audio encoder) is unavailable."""
+    exporter_class = EXPORTERS[mode]
+    audio_profile = fixture.settings.audio_profiles[mode]
+    if not exporter_class.available() or not encoder_available(audio_profile):
+        return None
+    export_path = os.path.join(fixture.session.export_path, mode.name.lower())
+    os.makedirs(export_path)
+    fixture.data.lmf = create_lmf('Transcription', 'Translation', 'Hermes benchmarks')
+    rows = list(range(len(fixture.data.transcriptions)))
+    start_time = time.perf_counter()
+    target = DirectoryTarget(export_path, fixture.session.asset_store)
+    exporter = exporter_class(fixture.data, fixture.settings, target=target)
+    exporter.plan(rows)
+    for row, sound_file in iter_export_audio(fixture.data.transcriptions, rows, audio_profile,
+                                             fixture.settings.export_processing):
+        exporter.emit(row, sound_file)
+    exporter.finalise()
+    target.close()
+    return time.perf_counter() - start_time
+
+
+def run_size(app: QApplication, size: int, quadratic_limit: int) -> Dict[str, Union[None, float]]:
+    """:return: the seconds each step took (None if skipped)."""
+    results = dict()
+    with tempfile.TemporaryDirectory() as directory:
+        start_time = time.perf_counter()
+        fixture = Fixture(app, directory, size)
+        results['Generate project'] = time.perf_counter() - start_time
+        for step in BENCHMARKS:
+            if step.quadratic and size > quadratic_limit:
+                results[step.name] = None
+                continue
+            start_time = time.perf_counter()
+            step.function(fixture)
+            results[step.name] = time.perf_counter() - start_time
+        # Settle the table's signals before the exports, so they are timed alone.
+        app.processEvents()
+        load_built_in_exporters()
+        for mode in (mode for mode in OutputMode if mode in EXPORTERS):
+            results[f'Export: {EXPORTERS[mode].name}'] = run_export(fixture, mode)
+    return results
+
+
+def get_commit() -> str:
+    """:return: the short hash of the checked out commit, suffixed with -dirty if there are uncommitted changes."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True,
+                                text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f'{commit}-dirty' if status.strip() else commit
+
+
+def format_seconds(seconds: Union[None, float]) -> str:
+    return f'{seconds:>12.3f}' if seconds is not None else f'{"skipped":>12}'
+
+
+def print_results(results: Dict[str, Dict[str, Union[None, float]]], base: dict = None) -> None:
+    for size, steps in results.items():
+        base_steps = (base or {}).get('results', {}).get(size, {})
+        print(f'\n{size} rows')
+        print(f'{"step":<40}{"seconds":>12}' + (f'{"base":>12}{"change":>10}' if base else ''))
+        for name, seconds in steps.items():
+            line = f'{name:<40}{format_seconds(seconds)}'
+            if base:
+                base_seconds = base_steps.get(name)
+                line += format_seconds(base_seconds)
+                if seconds is not None and base_seconds:
+                    line += f'{(seconds - base_seconds) / base_seconds:>+10.0%}'
+            print(line)
+
+
+def main(arguments: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='numbers of rows to run at')
+    parser.add_argument('--quadratic-limit', type=int, default=QUADRATIC_LIMIT,
+                        help='largest size to run the steps that grow with the square of the rows')
+    parser.add_argument('--output', default=RESULTS_PATH, help='folder to save the results to')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    args = parser.parse_args(arguments)
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    results = dict()
+    for size in args.sizes:
+        print(f'Running {size} rows...', flush=True)
+        results[str(size)] = run_size(app, size, args.quadratic_limit)
+
+    commit = get_commit()
+    report = {
+        'commit': commit,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    os.makedirs(args.output, exist_ok=True)
+    results_path = os.path.join(args.output, f'{commit}.json')
+    with open(results_path, 'w') as file:
+        json.dump(report, file, indent=2)
+
+    base = None
+    if args.compare:
+        with open(args.compare) as file:
+            base = json.load(file)
+    print_results(results, base)
+    print(f'\nSaved to {results_path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,19 +2,26 @@ import os
 import platform
 import tempfile
 from datetime import datetime
-from resizeimage import resizeimage
 from enum import Enum, unique
-from pydub import AudioSegment
-from typing import Union
-from uuid import uuid4
+from typing import TYPE_CHECKING, Union
+from audio import PCMClip, load_audio
+from audio.encode import AudioProfile
+from audio.processing import ProcessingOptions
+from perf import perf_timer
+from uuid import UUID, uuid4
 from tempfile import mkdtemp
-from PIL import Image
 from PyQt5.QtMultimedia import QMultimedia
-from PyQt5.QtWidgets import QProgressBar, QStatusBar
+from PyQt5.QtWidgets import QProgressBar, QPushButton, QStatusBar
+
+if TYPE_CHECKING:
+    from pydub import AudioSegment
 
 
 MATCH_ERROR_MARGIN = 1  # Second
 
+# Audio loaded by any of the audio backends.
+AudioClip = Union['AudioSegment', PCMClip]
+
 # Mapping of text-description to QMultimedia format.
 AUDIO_QUALITY = {
     "Very Low": QMultimedia.VeryLowQuality,
@@ -41,21 +48,15 @@ class OperationMode(Enum):
 class OutputMode(Enum):
     """
     Represents the file structure in which the products of the converter will be output.
+    Each mode is written by the exporter registered for it (see utilities.exporters).
     """
     OPIE = 0  # The original OPIE structure: (.txt transcription/translations, sound/image folders)
     LMF = 1  # Language Manifest File: JSON with image/sound folders.
     DICT = 2  # Generic Dictionary: CSV with image/sound folders.
-
-
-# Mapping of mode numbers to full names.
-OUTPUT_MODE_NAMES = {
-    0: "OPIE File Structure",
-    1: "Language Manifest File (JSON)",
-    2: "Generic Dictionary (CSV)"
-}
-
-# Mapping of mode names to mode numbers.
-OUTPUT_MODES_REV = {v: k for k, v in OUTPUT_MODE_NAMES.items()}
+    PARQUET = 3  # Dataset: Parquet shards holding the text, timings, audio and images.
+    ARROW = 4  # Dataset: Arrow IPC shards (memory-mappable) holding the text, timings, audio and images.
+    TAR = 5  # Dataset: WebDataset style tar shards of text, JSON, audio and image files with an index.
+    SQLITE = 6  # Dictionary package: a single SQLite file with audio/image BLOBs and a full text index.
 
 
 def create_lmf(transcription_language: str,
@@ -82,13 +83,15 @@ class Sample(object):
     Representation of a media clip based on a media file split based on ELAN data or recorded by
     the user using the RecordWindow.
     """
+    __slots__ = ('index', 'start', 'end', 'recorded', 'audio_file', 'sample_path', 'sample_object')
+
     def __init__(self,
                  index: int,
                  start: float = None,
                  end: float = None,
-                 audio_file: AudioSegment = None,
+                 audio_file: AudioClip = None,
                  sample_path: str = None,
-                 sample_object: AudioSegment = None) -> None:
+                 sample_object: AudioClip = None) -> None:
         self.index = index
         self.start = start
         self.end = end
@@ -99,7 +102,8 @@ class Sample(object):
 
     def get_sample_file_path(self) -> Union[None, str]:
         if not self.sample_path:
-            sample_file = self.audio_file[self.start:self.end]
+            with perf_timer('Clip cut'):
+                sample_file = self.audio_file[self.start:self.end]
             self.sample_object = sample_file
             temporary_folder = tempfile.mkdtemp()
             self.sample_path = os.path.join(temporary_folder, f'{str(self.index)}.wav')
@@ -107,13 +111,24 @@ class Sample(object):
             return self.sample_path
         return self.sample_path
 
-    def get_sample_file_object(self) -> Union[None, AudioSegment]:
+    def get_sample_file_object(self) -> Union[None, AudioClip]:
         self.get_sample_file_path()
         return self.sample_object
 
+    def get_clip(self) -> Union[None, AudioClip]:
+        """Returns the clip for this sample without writing it out to a temporary file."""
+        if self.sample_object is not None:
+            return self.sample_object
+        if self.audio_file is not None:
+            with perf_timer('Clip cut'):
+                return self.audio_file[self.start:self.end]
+        return None
+
     def set_sample(self, path):
+        """Sets the sample to an audio file (e.g. a recording), rather than a clip of the source media."""
         self.sample_path = path
-        self.sample_object = AudioSegment.from_wav(path)
+        self.sample_object = load_audio(path)
+        self.recorded = True
 
     def __str__(self):
         return f'[{self.start/1000}-{self.end/1000}]'
@@ -124,6 +139,8 @@ class Translation(object):
     Represents a translation parsed from an ELAN file or created empty in the 'from scratch' mode.
     Parsed Translations will be matched with a Transcription or discarded.
     """
+    __slots__ = ('index', 'translation', 'start', 'end')
+
     def __init__(self,
                  index: int,
                  translation: str,
@@ -142,7 +159,12 @@ class Transcription(object):
     """
     The core data structure of the program, storing the transcription, translation, samples, and
     images. Each is uniquely identified by a uuid and provides convenience methods for data access.
+
+    Rows are slotted (no per-instance __dict__) and the uuid is only generated when first used, as imports create
+    them by the hundred thousand.
     """
+    __slots__ = ('index', 'transcription', 'translation', 'image', 'preview_image', '_id', 'temp_file', 'sample')
+
     def __init__(self,
                  index: int,
                  transcription: str,
@@ -150,16 +172,16 @@ class Transcription(object):
                  image: str = None,
                  start: float = None,
                  end: float = None,
-                 media: AudioSegment = None) -> None:
+                 media: AudioClip = None) -> None:
         self.index = index
         self.transcription = transcription
         self.translation = translation
         self.image = image
         self.preview_image = None
-        self.id = uuid4()
+        self._id = None
         self.temp_file = None
 
-        if not (media and start and end):
+        if media is None or start is None or end is None:
             self.sample = None
         else:
             self.sample = Sample(
@@ -169,6 +191,16 @@ class Transcription(object):
                 audio_file=media
             )
 
+    @property
+    def id(self) -> UUID:
+        if self._id is None:
+            self._id = uuid4()
+        return self._id
+
+    @id.setter
+    def id(self, value: UUID) -> None:
+        self._id = value
+
     def time_matches_translation(self, translation: Translation) -> bool:
         if not self.sample:
             return False
@@ -179,6 +211,7 @@ class Transcription(object):
             return False
 
     def set_image(self, path_to_image):
+        from PIL import Image
         image = Image.open(path_to_image)
         new_image_path = self.get_temp_file() + self.id + '.png'
         image.save(new_image_path, 'PNG')
@@ -188,6 +221,8 @@ class Transcription(object):
         self.sample = Sample(index=self.index)
 
     def refresh_preview_image(self):
+        from PIL import Image
+        from resizeimage import resizeimage
         preview_path = os.path.join(self.get_temp_file(), f'{self.id}.png')
         # print(preview_path)
         with open(self.image, 'r+b') as file:
@@ -238,7 +273,7 @@ class ConverterComponents(object):
     """
     Reference storage for the components that make up (or are referenced by) the ConverterWidget.
     """
-    def __init__(self, progress_bar: QProgressBar, status_bar: QStatusBar):
+    def __init__(self, progress_bar: QProgressBar, status_bar: QStatusBar, cancel_button: QPushButton = None):
         self.elan_file_field = None
         self.transcription_menu = None
         self.translation_menu = None
@@ -247,33 +282,55 @@ class ConverterComponents(object):
         self.table = None
         self.progress_bar = progress_bar
         self.status_bar = status_bar
+        self.cancel_button = cancel_button
         self.tier_selector = None
         self.main_project_select = None
         self.project_mode_select = None
 
 
+def get_default_project_dir() -> str:
+    if platform.system() == "Windows":
+        return os.path.join(os.path.expandvars("%USERPROFILE%"), "Documents", "Hermes", "Projects")
+    return os.path.join(os.path.expanduser("~"), "Hermes", "Projects")
+
+
 class AppSettings(object):
     """
     In-memory representation of the application settings.
     Generally populated from computer's AppData on start-up.
     """
     def __init__(self,
-                 output_format: str = OUTPUT_MODE_NAMES[0],
+                 output_format: OutputMode = OutputMode.OPIE,
                  microphone: str = 'Default',
                  audio_quality: str = 'Very High',
                  ffmpeg_location: str = None,
-                 project_root_dir: str = None):
-        self.output_format = list(OutputMode)[OUTPUT_MODES_REV[output_format]]
+                 project_root_dir: str = None,
+                 export_processing: ProcessingOptions = None,
+                 audio_profiles: dict = None,
+                 compact_manifest: bool = False,
+                 shard_size: int = 256,
+                 shard_compression: str = '',
+                 export_archive: bool = False,
+                 archive_compression: int = 0):
+        self.output_format = output_format
         self.microphone = microphone
         self.audio_quality = AUDIO_QUALITY[audio_quality]
         self.ffmpeg_location = ffmpeg_location
         self.project_root_dir = project_root_dir
+        self.export_processing = export_processing or ProcessingOptions()
+        # Export audio format for each output mode.
+        self.audio_profiles = audio_profiles or {output_mode: AudioProfile() for output_mode in OutputMode}
+        # Write LMF manifests without indentation.
+        self.compact_manifest = compact_manifest
+        # Size in megabytes and compression (a tarfile compression mode, '' for none) of tar shard exports.
+        self.shard_size = shard_size
+        self.shard_compression = shard_compression
+        # Export into a single zip rather than folders, and the zipfile compression of its audio and images.
+        self.export_archive = export_archive
+        self.archive_compression = archive_compression
         self.default_project_dir = None
         if not project_root_dir:
-            if platform.system() == "Windows":
-                self.project_root_dir = os.path.join(os.path.expandvars("%USERPROFILE%"), "Documents", "Hermes", "Projects")
-            else:
-                self.project_root_dir = os.path.join(os.path.expanduser("~"), "Hermes", "Projects")
+            self.project_root_dir = get_default_project_dir()
             self.default_project_dir = self.project_root_dir
 
     def __str__(self):
@@ -1,11 +1,32 @@
+import time
+STARTED = time.perf_counter()
+
+import multiprocessing
+import os
 import sys
+from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QApplication
+from perf import PERF
+from utilities.logger import get_log_path
+from utilities.startup import StartupTimer
 from widgets.icon import ApplicationIcon
 from windows import PrimaryWindow
+from windows.about import VERSION
 
 if __name__ == '__main__':
+    # Audio QC runs in a spawned process pool, which frozen builds need to support.
+    multiprocessing.freeze_support()
+    startup = StartupTimer(STARTED)
+    startup.mark('Imports')
     App = QApplication(sys.argv)
     App.setWindowIcon(ApplicationIcon())
+    startup.mark('Application')
     Main = PrimaryWindow(App)
+    startup.mark('Primary window')
     Main.show()
-    sys.exit(App.exec_())
+    # Runs on the first pass of the event loop, once the window has been shown.
+    QTimer.singleShot(0, startup.finish)
+    exit_code = App.exec_()
+    Main.stop_profiler()
+    PERF.write_session_report(os.path.join(get_log_path(), 'perf'), VERSION)
+    sys.exit(exit_code)
@@ -0,0 +1,106 @@
+import cProfile
+import os
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import List
+
+
+# Seconds between samples of every thread's stack.
+SAMPLE_INTERVAL = 0.01
+# Frames tracemalloc keeps per allocation, and allocation sites listed in the memory report.
+MEMORY_FRAMES = 10
+MEMORY_TOP = 50
+
+
+class ProfilerCapture(object):
+    """
+    Profiles the app while it runs, between start() and stop(): cProfile on the thread that started it (the GUI
+    thread), stack samples of every thread (including worker QThreads and export pools) and a tracemalloc snapshot
+    diff. stop() writes each out alongside the others in a folder, for diagnosing slowdowns and memory use offline.
+    """
+    def __init__(self, interval: float = SAMPLE_INTERVAL) -> None:
+        self.interval = interval
+        self.running = False
+        self.profile = None
+        self.sampler = None
+        self.stacks = Counter()
+        self.sample_count = 0
+        self.started_at = None
+        self.stop_sampling = threading.Event()
+        self.started_tracing = False
+        self.memory_start = None
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self.running = True
+        self.started_at = datetime.now()
+        self.stacks = Counter()
+        self.sample_count = 0
+        self.started_tracing = not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start(MEMORY_FRAMES)
+        self.memory_start = tracemalloc.take_snapshot()
+        self.stop_sampling.clear()
+        self.sampler = threading.Thread(target=self.sample, name='Profiler sampler', daemon=True)
+        self.sampler.start()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def sample(self) -> None:
+        own_thread = threading.get_ident()
+        while not self.stop_sampling.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_thread:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                    frame = frame.f_back
+                stack.append(names.get(ident, f'Thread {ident}'))
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.sample_count += 1
+
+    def stop(self, folder: str) -> List[str]:
+        """
+        Stops profiling and writes profile_<start time>.prof (cProfile stats of the GUI thread, see pstats),
+        profile_<start time>.stacks.txt (sampled stacks in folded format, one "thread;frame;frame count" line per
+        stack, for flame graph tools) and profile_<start time>.memory.txt (the allocation sites that grew most) to
+        folder.
+        :return: the paths written.
+        """
+        if not self.running:
+            return []
+        self.profile.disable()
+        self.stop_sampling.set()
+        self.sampler.join()
+        memory_end = tracemalloc.take_snapshot()
+        if self.started_tracing:
+            tracemalloc.stop()
+        self.running = False
+
+        os.makedirs(folder, exist_ok=True)
+        name = f'profile_{self.started_at.strftime("%Y-%m-%d_%H-%M-%S")}'
+        duration = (datetime.now() - self.started_at).total_seconds()
+        profile_path = os.path.join(folder, f'{name}.prof')
+        self.profile.dump_stats(profile_path)
+        stacks_path = os.path.join(folder, f'{name}.stacks.txt')
+        with open(stacks_path, 'w') as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f'{stack} {count}\n')
+        memory_path = os.path.join(folder, f'{name}.memory.txt')
+        with open(memory_path, 'w') as file:
+            file.write(f'Profiled for {duration:.1f} s, {self.sample_count} stack samples.\n')
+            file.write(f'Top {MEMORY_TOP} allocation sites by growth:\n')
+            for statistic in memory_end.compare_to(self.memory_start, 'traceback')[:MEMORY_TOP]:
+                file.write(f'\n{statistic}\n')
+                for line in statistic.traceback.format():
+                    file.write(f'{line}\n')
+        self.profile = None
+        self.memory_start = None
+        return [profile_path, stacks_path, memory_path]
@@ -0,0 +1,174 @@
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from typing import Callable, Iterator, Union
+
+
+# Completed spans kept for the trace, older spans are dropped.
+PERF_SPAN_LIMIT = 500
+# Session reports kept in the report folder, older reports are removed.
+PERF_REPORTS_KEPT = 20
+
+
+class PerfTimer(object):
+    """
+    Running totals of the time taken by one named operation.
+    """
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.minimum = seconds if self.minimum is None else min(self.minimum, seconds)
+        self.maximum = max(self.maximum, seconds)
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'mean_ms': self.total * 1000 / self.count if self.count else 0.0,
+            'min_ms': (self.minimum or 0.0) * 1000,
+            'max_ms': self.maximum * 1000,
+        }
+
+
+class PerfRecorder(object):
+    """
+    Collects timers, counters and a trace of spans from any thread for the running session.
+
+    span() times an operation and adds it to the trace, with the span it ran inside (on the same thread) as its
+    parent. timer() only adds to the operation's totals, for operations run once per row.
+    """
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.started = time.perf_counter()
+            self.started_at = datetime.now()
+            self.timers = dict()
+            self.counters = dict()
+            self.spans = deque(maxlen=PERF_SPAN_LIMIT)
+
+    def record(self, name: str, seconds: float) -> None:
+        with self.lock:
+            if name not in self.timers:
+                self.timers[name] = PerfTimer()
+            self.timers[name].add(seconds)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        stack = getattr(self.local, 'stack', None)
+        if stack is None:
+            stack = self.local.stack = []
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - started
+            stack.pop()
+            self.record(name, duration)
+            with self.lock:
+                self.spans.append({
+                    'name': name,
+                    'parent': parent,
+                    'thread': threading.current_thread().name,
+                    'start_ms': (started - self.started) * 1000,
+                    'duration_ms': duration * 1000,
+                })
+
+    def spanned(self, name: Union[str, Callable[..., str]]) -> Callable:
+        """
+        Decorates a function to run it in a span.
+        :param name: the span's name, or a function of the decorated function's arguments returning it.
+        """
+        def decorator(function: Callable) -> Callable:
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(name(*args, **kwargs) if callable(name) else name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def report(self, version: str = None) -> dict:
+        """:return: the session so far, as written out by write_report."""
+        with self.lock:
+            return {
+                'version': version,
+                'started': self.started_at.isoformat(timespec='seconds'),
+                'duration_s': time.perf_counter() - self.started,
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'frozen': getattr(sys, 'frozen', False),
+                'timers': {name: timer.to_dict() for name, timer in sorted(self.timers.items())},
+                'counters': dict(sorted(self.counters.items())),
+                'spans': list(self.spans),
+            }
+
+    def write_report(self, path: str, version: str = None) -> None:
+        with open(path, 'w') as file:
+            json.dump(self.report(version), file, indent=2)
+
+    def write_session_report(self, folder: str, version: str = None) -> str:
+        """
+        Writes the session's report to folder as perf_hermes_<start time>.json, keeping only the latest
+        PERF_REPORTS_KEPT reports there.
+        :return: the path of the report.
+        """
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f'perf_hermes_{self.started_at.strftime("%Y-%m-%d_%H-%M-%S")}.json')
+        self.write_report(path, version)
+        reports = sorted(name for name in os.listdir(folder)
+                         if name.startswith('perf_hermes_') and name.endswith('.json'))
+        for name in reports[:-PERF_REPORTS_KEPT]:
+            os.remove(os.path.join(folder, name))
+        return path
+
+
+PERF = PerfRecorder()
+
+
+def perf_span(name: str):
+    """Times the operation named (in a with block) and adds it to the session's trace."""
+    return PERF.span(name)
+
+
+def perf_spanned(name: Union[str, Callable[..., str]]) -> Callable:
+    """Decorates a function to time it and add it to the session's trace, see PerfRecorder.spanned."""
+    return PERF.spanned(name)
+
+
+def perf_timer(name: str):
+    """Times the operation named (in a with block) without tracing it, for operations run once per row."""
+    return PERF.timer(name)
+
+
+def perf_count(name: str, amount: int = 1) -> None:
+    PERF.count(name, amount)
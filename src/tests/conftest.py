@@ -0,0 +1,21 @@
+import pytest
+
+from datatypes import ConverterData, Transcription, create_lmf
+
+WORDS = [('ngaya', 'I'), ('yindyamarra', 'respect'), ('Bürru', 'kangaroo')]
+
+
+@pytest.fixture
+def data(tmp_path):
+    """Converter data for three words, the last with an image, exporting to tmp_path/export."""
+    image_path = tmp_path / 'burru.png'
+    image_path.write_bytes(b'\x89PNG not really')
+    export_path = tmp_path / 'export'
+    export_path.mkdir()
+    data = ConverterData()
+    data.transcriptions = [Transcription(index=index, transcription=transcription, translation=translation)
+                           for index, (transcription, translation) in enumerate(WORDS)]
+    data.transcriptions[2].image = str(image_path)
+    data.lmf = create_lmf('Wiradjuri', 'English', 'Hermes tests')
+    data.export_location = str(export_path)
+    yield data
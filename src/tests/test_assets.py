@@ -0,0 +1,42 @@
+import os
+import stat
+
+from audio.encode import EncodedAudio
+from utilities.assets import AssetStore, clone_file
+
+
+def is_writable(path) -> bool:
+    return bool(os.stat(path).st_mode & stat.S_IWUSR)
+
+
+class TestAssetStore:
+
+    def test_exports_are_writable_and_replaceable(self, tmp_path):
+        store = AssetStore(str(tmp_path / 'store'))
+        source = tmp_path / 'ngaya.wav'
+        source.write_bytes(b'RIFF ngaya')
+        destination = str(tmp_path / 'ngaya_export.wav')
+        for _ in range(2):
+            store.export_file(str(source), destination)
+            store.export_audio(EncodedAudio(b'RIFF gaba', 'wav'), str(tmp_path / 'gaba_export.wav'))
+        assert is_writable(destination)
+        assert is_writable(store.add_file(str(source)))
+        with open(destination, 'rb') as file:
+            assert file.read() == b'RIFF ngaya'
+
+    def test_read_only_store_files_are_linked_out_writable(self, tmp_path):
+        store = AssetStore(str(tmp_path / 'store'))
+        stored_path = store.add_bytes(b'RIFF gaba', '.wav')
+        # As written by earlier versions.
+        os.chmod(stored_path, 0o444)
+        destination = str(tmp_path / 'gaba.wav')
+        store.export_audio(EncodedAudio(b'RIFF gaba', 'wav'), destination)
+        assert is_writable(destination)
+
+    def test_clone_replaces_read_only_destination(self, tmp_path):
+        source, destination = tmp_path / 'source.png', tmp_path / 'destination.png'
+        source.write_bytes(b'new')
+        destination.write_bytes(b'old')
+        os.chmod(destination, 0o444)
+        clone_file(str(source), str(destination))
+        assert destination.read_bytes() == b'new'
@@ -0,0 +1,63 @@
+import io
+import wave
+import numpy as np
+import pytest
+
+from audio import PCMClip
+from audio import encode
+from audio.encode import AudioProfile, EncoderUnavailableError, convert_clip, encode_clip, encoder_available
+
+
+@pytest.fixture
+def clip() -> PCMClip:
+    time_axis = np.arange(44100) / 44100
+    tone = 0.5 * np.sin(2 * np.pi * 440 * time_axis)
+    return PCMClip.from_float(np.stack([tone, tone], axis=1), 44100)
+
+
+class TestAudioProfile:
+
+    def test_convert_clip(self, clip: PCMClip):
+        converted = convert_clip(clip, AudioProfile(frame_rate=16000, channels=1, bit_depth=32))
+        assert (converted.frame_rate, converted.channels, converted.sample_width) == (16000, 1, 4)
+        assert converted.frame_count == 16000
+
+    def test_empty_profile_keeps_source_format(self, clip: PCMClip):
+        assert convert_clip(clip, AudioProfile()) is clip
+
+    def test_needs_ffmpeg(self):
+        assert not AudioProfile('wav').needs_ffmpeg
+        assert AudioProfile('flac').needs_ffmpeg
+        assert AudioProfile('opus').extension == 'opus'
+        assert encoder_available(AudioProfile('wav'))
+
+
+class TestEncodeClip:
+
+    def test_wav(self, clip: PCMClip):
+        encoded = encode_clip(clip, AudioProfile('wav', frame_rate=22050, channels=1, bit_depth=16))
+        assert encoded.extension == 'wav'
+        with wave.open(io.BytesIO(encoded.data)) as wav_file:
+            assert (wav_file.getframerate(), wav_file.getnchannels(), wav_file.getsampwidth()) == (22050, 1, 2)
+            assert wav_file.getnframes() == 22050
+
+    def test_save(self, clip: PCMClip, tmp_path):
+        encoded = encode_clip(clip, AudioProfile())
+        path = encoded.save(str(tmp_path / 'tone.wav'))
+        with open(path, 'rb') as file:
+            assert file.read() == encoded.data
+
+    @pytest.mark.parametrize('codec, magic', [('flac', b'fLaC'), ('opus', b'OggS')])
+    def test_ffmpeg_codecs(self, clip: PCMClip, codec: str, magic: bytes):
+        profile = AudioProfile(codec, frame_rate=48000, channels=1)
+        if not encoder_available(profile):
+            pytest.skip('ffmpeg is not installed')
+        encoded = encode_clip(clip, profile)
+        assert encoded.extension == codec
+        assert encoded.data.startswith(magic)
+
+    def test_missing_ffmpeg(self, clip: PCMClip, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr(encode, 'get_ffmpeg', lambda: 'hermes-missing-ffmpeg')
+        assert not encoder_available(AudioProfile('flac'))
+        with pytest.raises(EncoderUnavailableError):
+            encode_clip(clip, AudioProfile('flac'))
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from audio.intervals import IntervalIndex, format_time, parse_time, parse_time_range
+
+
+class TestIntervalIndex:
+
+    @pytest.fixture
+    def index(self):
+        # Unsorted spans on a single tier, keyed by row.
+        yield IntervalIndex([(1000, 1500), (0, 400), (500, 900), (2000, 2600)], keys=[12, 10, 11, 13])
+
+    def test_overlapping(self, index: IntervalIndex):
+        assert index.overlapping(450, 1200) == [11, 12]
+        assert index.overlapping(0, 10000) == [10, 11, 12, 13]
+        assert index.overlapping(1600, 1900) == []
+        # Ranges touching a span's ends include it.
+        assert index.overlapping(900, 1000) == [11, 12]
+
+    def test_at(self, index: IntervalIndex):
+        assert index.at(600) == [11]
+        assert index.at(450) == []
+
+    def test_nearest(self, index: IntervalIndex):
+        assert index.nearest(1200) == 12
+        assert index.nearest(950) == 11
+        assert index.nearest(980) == 12
+        assert index.nearest(-50) == 10
+        assert index.nearest(99999) == 13
+
+    def test_nested_spans(self):
+        index = IntervalIndex([(0, 10000), (100, 200), (5000, 6000), (9000, 9500)])
+        assert index.overlapping(5500, 5600) == [0, 2]
+        assert index.overlapping(7000, 8000) == [0]
+        assert index.nearest(150) == 1
+
+    def test_empty(self):
+        index = IntervalIndex([])
+        assert len(index) == 0
+        assert index.overlapping(0, 1000) == []
+        assert index.nearest(0) is None
+
+    def test_matches_scan(self):
+        spans = [((index * 37) % 1000, (index * 37) % 1000 + (index % 7) * 40) for index in range(300)]
+        index = IntervalIndex(spans)
+        for start, end in [(0, 10), (250, 260), (500, 900), (990, 2000)]:
+            expected = {key for key, (span_start, span_end) in enumerate(spans)
+                        if span_start <= end and span_end >= start}
+            assert set(index.overlapping(start, end)) == expected
+
+    def test_matches_scan_with_enclosing_spans(self):
+        rng = np.random.default_rng(0)
+        starts = rng.uniform(0, 100000, 2000)
+        spans = [(start, start + length) for start, length in zip(starts, rng.exponential(500, 2000))]
+        # A whole recording annotation, and spans sharing their ends.
+        spans += [(0, 100000), (5000, 5000), (5000, 6000), (5000, 6000)]
+        index = IntervalIndex(spans)
+        for start, end in [(0, 0), (5000, 5000), (12345, 12400), (50000, 60000), (99999, 200000), (-10, -1)]:
+            found = index.overlapping(start, end)
+            assert set(found) == {key for key, (span_start, span_end) in enumerate(spans)
+                                  if span_start <= end and span_end >= start}
+            assert [spans[key][0] for key in found] == sorted(spans[key][0] for key in found)
+
+
+class TestTimes:
+
+    def test_parse_time(self):
+        assert parse_time('45') == 45000
+        assert parse_time('12:30') == 750000
+        assert parse_time(' 1:02:03.5 ') == 3723500
+        with pytest.raises(ValueError):
+            parse_time('12m30')
+
+    def test_parse_time_range(self):
+        assert parse_time_range('12:30-13:10') == (750000, 790000)
+        assert parse_time_range('12:30') == (750000, 750000)
+        with pytest.raises(ValueError):
+            parse_time_range('13:10-12:30')
+
+    def test_format_time(self):
+        assert format_time(750000) == '12:30.0'
+        assert format_time(3723540) == '1:02:03.5'
+        assert format_time(parse_time(format_time(4321))) == format_time(4321)
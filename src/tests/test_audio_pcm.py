@@ -0,0 +1,48 @@
+import io
+import os
+import wave
+import numpy as np
+import pytest
+
+from audio import PCMClip, load_audio, NumpyBackend
+
+
+@pytest.fixture(scope="module")
+def wav_path(tmp_path_factory):
+    time_axis = np.arange(44100) / 44100
+    tone = 0.5 * np.sin(2 * np.pi * 440 * time_axis)
+    path = os.path.join(tmp_path_factory.mktemp("audio"), "tone.wav")
+    PCMClip.from_float(np.stack([tone, tone], axis=1), 44100).export(path)
+    yield path
+
+
+class TestPCMClip:
+
+    def test_load_prefers_numpy_backend(self, wav_path: str):
+        clip = load_audio(wav_path)
+        assert isinstance(clip, PCMClip)
+        assert NumpyBackend().can_load(wav_path)
+        assert (len(clip), clip.channels, clip.frame_rate, clip.sample_width) == (1000, 2, 44100, 2)
+
+    def test_slice_is_view(self, wav_path: str):
+        clip = load_audio(wav_path, mmap=True)
+        sample = clip[250:500]
+        assert len(sample) == 250
+        assert np.shares_memory(sample.samples, clip.samples)
+        assert len(clip[900:2000]) == 100
+
+    def test_export_round_trip(self, wav_path: str):
+        sample = load_audio(wav_path)[100:200]
+        buffer = io.BytesIO()
+        sample.export(buffer, format='wav')
+        with wave.open(io.BytesIO(buffer.getvalue())) as wav_file:
+            assert wav_file.getnframes() == sample.frame_count
+            assert wav_file.readframes(sample.frame_count) == sample.raw_data
+
+    def test_conversions(self, wav_path: str):
+        clip = load_audio(wav_path)
+        converted = clip.set_channels(1).set_frame_rate(16000).set_sample_width(1)
+        assert (converted.channels, converted.frame_rate, converted.sample_width) == (1, 16000, 1)
+        assert converted.frame_count == 16000
+        quieter = clip.apply_gain(-6)
+        assert np.abs(quieter.to_float()).max() == pytest.approx(0.25, abs=0.01)
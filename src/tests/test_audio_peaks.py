@@ -0,0 +1,40 @@
+import numpy as np
+
+from audio import PCMClip
+from audio.peaks import PEAK_BLOCK, PeakPyramid
+
+
+FRAME_RATE = 8000
+
+
+class TestPeakPyramid:
+
+    def setup_method(self):
+        rng = np.random.default_rng(0)
+        self.samples = rng.uniform(-0.5, 0.5, (FRAME_RATE * 20 + 123, 2))
+        self.samples[50000, 1] = 0.9
+        self.clip = PCMClip.from_float(self.samples, FRAME_RATE)
+        self.pyramid = PeakPyramid.from_clip(self.clip)
+
+    def test_peaks_match_samples(self):
+        floats = self.clip.to_float()
+        for start, end, pixels in [(0, self.clip.frame_count, 500), (49000, 51000, 40), (100, 1000, 900)]:
+            peaks = self.pyramid.peaks(start, end, pixels, self.clip)
+            assert peaks.shape == (pixels, 2)
+            assert peaks[:, 0].min() == floats[start:end].min()
+            assert peaks[:, 1].max() == floats[start:end].max()
+
+    def test_coarse_levels_bound_the_samples(self):
+        assert self.pyramid.levels[-1].shape == (1, 2)
+        assert self.pyramid.levels[-1][0, 1] == self.clip.to_float().max()
+        # Without the clip, narrow spans repeat the finest level rather than reading samples.
+        peaks = self.pyramid.peaks(0, PEAK_BLOCK, 4)
+        assert np.all(peaks == self.pyramid.levels[0][0])
+
+    def test_save_and_load(self, tmp_path):
+        path = str(tmp_path / 'peaks.npz')
+        self.pyramid.save(path)
+        loaded = PeakPyramid.load(path)
+        assert loaded.frame_count == self.pyramid.frame_count
+        assert len(loaded.levels) == len(self.pyramid.levels)
+        assert np.array_equal(loaded.levels[3], self.pyramid.levels[3])
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from audio import PCMClip
+from audio.processing import ProcessingOptions, integrated_loudness, peak_level, process_clip
+
+
+FRAME_RATE = 48000
+
+
+def tone(seconds: float, amplitude: float = 0.5, frequency: float = 1000) -> np.ndarray:
+    time_axis = np.arange(int(seconds * FRAME_RATE)) / FRAME_RATE
+    return (amplitude * np.sin(2 * np.pi * frequency * time_axis))[:, None].astype(np.float32)
+
+
+class TestProcessing:
+
+    def test_integrated_loudness_of_full_scale_sine(self):
+        # BS.1770 reference: a 0 dBFS 1 kHz sine on one channel measures -3.01 LUFS.
+        assert integrated_loudness(tone(3, amplitude=1.0), FRAME_RATE) == pytest.approx(-3.01, abs=0.05)
+
+    def test_trim_silence_keeps_padding(self):
+        silence = np.zeros((FRAME_RATE, 1), dtype=np.float32)
+        clip = PCMClip.from_float(np.concatenate([silence, tone(0.5), silence]), FRAME_RATE)
+        trimmed = process_clip(clip, ProcessingOptions(trim_silence=True, silence_padding=50))
+        assert len(trimmed) == pytest.approx(600, abs=20)
+
+    def test_normalisation_targets(self):
+        clip = PCMClip.from_float(tone(1, amplitude=0.05), FRAME_RATE)
+        peak = process_clip(clip, ProcessingOptions(normalisation='peak', target_peak=-3))
+        assert peak_level(peak.to_float()) == pytest.approx(-3, abs=0.05)
+        loud = process_clip(clip, ProcessingOptions(normalisation='loudness', target_loudness=-23))
+        assert integrated_loudness(loud.to_float(), FRAME_RATE) == pytest.approx(-23, abs=0.1)
+
+    def test_disabled_options(self):
+        assert not ProcessingOptions().enabled
+        assert ProcessingOptions(fade_length=10).enabled
@@ -0,0 +1,73 @@
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from audio import PCMClip, qc
+from audio.qc import analyse_samples, run_qc
+
+
+FRAME_RATE = 16000
+
+
+def make_clip(amplitude: float, offset: float = 0.0) -> PCMClip:
+    # Half a second of silence, a second of tone, half a second of silence.
+    rng = np.random.default_rng(0)
+    signal = np.zeros(2 * FRAME_RATE)
+    signal[FRAME_RATE // 2:3 * FRAME_RATE // 2] = amplitude * np.sin(2 * np.pi * 200 * np.arange(FRAME_RATE) / FRAME_RATE)
+    signal += rng.normal(0, 0.001, signal.size) + offset
+    return PCMClip.from_float(signal[:, None], FRAME_RATE)
+
+
+class TestAudioQC:
+
+    def test_clean_clip(self):
+        clip = make_clip(0.5)
+        report = analyse_samples(clip.samples, clip.frame_rate, clip.sample_width)
+        assert abs(report.duration - 2) < 1e-6
+        assert abs(report.peak - 20 * np.log10(0.5)) < 0.1
+        assert report.clipping == 0
+        assert report.snr > 40
+        assert abs(report.leading_silence - 500) <= 10
+        assert abs(report.trailing_silence - 500) <= 10
+        assert report.issues == []
+
+    def test_flags_clipping_and_dc_offset(self):
+        clip = make_clip(1.5, offset=0.1)
+        issues = analyse_samples(clip.samples, clip.frame_rate, clip.sample_width).issues
+        assert 'Clipped' in issues
+        assert 'DC offset' in issues
+
+    def test_cached_clips_are_not_reanalysed(self):
+        cache = dict()
+        clips = [(0, make_clip(0.5)), (1, make_clip(0.05))]
+        first = run_qc(clips, cache)
+        assert len(cache) == 2
+        for values in cache.values():
+            values['peak'] = 1.0
+        second = run_qc(clips, cache)
+        assert first[1].peak != second[1].peak == 1.0
+
+    def test_pool_queues_bounded_batches(self, monkeypatch):
+        queued = []
+
+        class ThreadExecutor(ThreadPoolExecutor):
+            """Stands in for the process pool, recording how many clips are queued as each is submitted."""
+            def __init__(self, max_workers: int, mp_context=None) -> None:
+                super().__init__(max_workers)
+                self.futures = []
+
+            def submit(self, *args, **kwargs) -> Future:
+                queued.append(sum(1 for future in self.futures if not future.done()) + 1)
+                self.futures.append(super().submit(*args, **kwargs))
+                return self.futures[-1]
+
+        monkeypatch.setattr(qc, 'ProcessPoolExecutor', ThreadExecutor)
+        clips = [(row, make_clip(0.1 + row / 100)) for row in range(40)]
+        cache = {qc.clip_hash(clips[0][1]): analyse_samples(clips[0][1].samples, FRAME_RATE, 2).to_dict()}
+        progress = []
+        reports = run_qc(clips, cache, workers=2, progress=progress.append)
+        assert sorted(reports) == list(range(40))
+        assert len(queued) == 39
+        assert max(queued) <= 2 * qc.CLIPS_PER_WORKER
+        assert len(cache) == 40
+        assert progress[-1] == 1
+        assert reports[5].to_dict() == analyse_samples(clips[5][1].samples, FRAME_RATE, 2).to_dict()
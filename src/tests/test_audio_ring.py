@@ -0,0 +1,42 @@
+import numpy as np
+
+from audio.ring import RingBuffer
+from audio.segment import StreamingSegmenter
+
+
+FRAME_RATE = 16000
+
+
+class TestRingBuffer:
+
+    def test_reads_across_wrap(self):
+        ring = RingBuffer(10)
+        ring.write(np.arange(7, dtype=np.int16))
+        ring.write(np.arange(7, 13, dtype=np.int16))
+        assert ring.oldest == 3
+        assert ring.read(0, 13).ravel().tolist() == list(range(3, 13))
+        assert ring.read(8, 11).ravel().tolist() == [8, 9, 10]
+
+    def test_write_larger_than_capacity(self):
+        ring = RingBuffer(10)
+        ring.write(np.arange(37, dtype=np.int16))
+        assert ring.written == 37
+        assert ring.read(27, 37).ravel().tolist() == list(range(27, 37))
+
+
+class TestStreamingSegmenter:
+
+    def test_matches_offline_spans(self):
+        rng = np.random.default_rng(0)
+        time_axis = np.arange(10 * FRAME_RATE) / FRAME_RATE
+        voiced = ((time_axis % 3) >= 1) & ((time_axis % 3) < 1.5)
+        signal = 0.3 * np.sin(2 * np.pi * 220 * time_axis) * voiced + rng.normal(0, 0.002, time_axis.size)
+        segmenter = StreamingSegmenter(FRAME_RATE)
+        spans = []
+        # Uneven chunks, as delivered by an audio device.
+        for start in range(0, signal.size, 1234):
+            spans.extend(segmenter.feed(signal[start:start + 1234]))
+        assert len(spans) == 3
+        for (start, end), expected_start in zip(spans, [1, 4, 7]):
+            assert abs(start / FRAME_RATE - expected_start) <= 0.02
+            assert abs(end / FRAME_RATE - (expected_start + 0.5)) <= 0.02
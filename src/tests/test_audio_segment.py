@@ -0,0 +1,28 @@
+import numpy as np
+
+from audio import PCMClip
+from audio.segment import SegmentationOptions, detect_segments
+
+
+FRAME_RATE = 16000
+
+
+class TestSegmentation:
+
+    def test_detects_words_between_pauses(self):
+        rng = np.random.default_rng(0)
+        time_axis = np.arange(10 * FRAME_RATE) / FRAME_RATE
+        # A 0.5 s tone at 1.0 s, 4.0 s and 7.0 s over low level noise.
+        voiced = ((time_axis % 3) >= 1) & ((time_axis % 3) < 1.5)
+        signal = 0.3 * np.sin(2 * np.pi * 220 * time_axis) * voiced + rng.normal(0, 0.002, time_axis.size)
+        clip = PCMClip.from_float(signal[:, None], FRAME_RATE)
+        # Small blocks to exercise block boundaries.
+        spans = detect_segments(clip, SegmentationOptions(padding=0, block_length=1))
+        assert len(spans) == 3
+        for (start, end), expected_start in zip(spans, [1000, 4000, 7000]):
+            assert abs(start - expected_start) <= 20
+            assert abs(end - (expected_start + 500)) <= 20
+
+    def test_silence_has_no_segments(self):
+        clip = PCMClip.from_float(np.zeros((FRAME_RATE, 1)), FRAME_RATE)
+        assert detect_segments(clip) == []
@@ -0,0 +1,44 @@
+import pympi
+import pytest
+
+from audio import load_audio
+from benchmarks.synthetic import get_annotation_spans, write_synthetic_project
+
+
+@pytest.fixture(scope="module")
+def project(tmp_path_factory):
+    yield write_synthetic_project(str(tmp_path_factory.mktemp("synthetic")), 50, tiers=('Words', 'Gloss', 'Notes'))
+
+
+class TestSyntheticProject:
+
+    def test_tiers_are_aligned(self, project):
+        eaf = pympi.Elan.Eaf(project[0])
+        assert sorted(eaf.get_tier_names()) == ['Gloss', 'Notes', 'Words']
+        spans = get_annotation_spans(50)
+        for tier in ('Words', 'Gloss', 'Notes'):
+            annotations = sorted(eaf.get_annotation_data_for_tier(tier))
+            assert [(start, end) for start, end, _ in annotations] == spans
+            assert all(value for _, _, value in annotations)
+
+    def test_media_is_linked(self, project):
+        eaf_path, wav_path = project
+        linked_file = pympi.Elan.Eaf(eaf_path).get_linked_files()[0]
+        assert linked_file['MEDIA_URL'].endswith('/synthetic.wav')
+        assert linked_file['RELATIVE_MEDIA_URL'] == './synthetic.wav'
+
+    def test_audio_covers_annotations(self, project):
+        clip = load_audio(project[1])
+        start, end = get_annotation_spans(50)[-1]
+        assert len(clip) >= end
+        # Tone under the annotations, near silence between them.
+        assert abs(clip[start:end].to_float()).max() > 0.3
+        assert abs(clip[end:end + 50].to_float()).max() < 0.1
+
+    def test_generation_is_reproducible(self, project, tmp_path):
+        eaf_path, wav_path = write_synthetic_project(str(tmp_path), 50, tiers=('Words', 'Gloss', 'Notes'))
+        with open(project[1], 'rb') as first_file, open(wav_path, 'rb') as second_file:
+            assert first_file.read() == second_file.read()
+        first_eaf, second_eaf = pympi.Elan.Eaf(project[0]), pympi.Elan.Eaf(eaf_path)
+        for tier in ('Words', 'Gloss', 'Notes'):
+            assert first_eaf.get_annotation_data_for_tier(tier) == second_eaf.get_annotation_data_for_tier(tier)
@@ -0,0 +1,62 @@
+import json
+import os
+import numpy as np
+import pytest
+
+from audio.encode import EncodedAudio
+from audio.pcm import PCMClip
+from datatypes import AppSettings, ConverterData, Transcription
+from utilities.dataset import ArrowExporter, ParquetExporter, pyarrow_available
+
+pytestmark = pytest.mark.skipif(not pyarrow_available(), reason='pyarrow is not installed')
+
+
+def sound_file(row: int) -> EncodedAudio:
+    return EncodedAudio(b'RIFF' + bytes([row]) * 100, 'wav')
+
+
+def read_dataset(data: ConverterData, exporter_class):
+    import pyarrow.ipc
+    import pyarrow.parquet
+    exporter = exporter_class(data, AppSettings())
+    exporter.plan([0, 1, 2])
+    for row in range(3):
+        exporter.emit(row, sound_file(row) if row != 1 else None)
+    exporter.finalise()
+    dataset_path = os.path.join(data.export_location, 'dataset')
+    assert os.listdir(dataset_path) == [f'part-00000.{exporter_class.extension}']
+    path = os.path.join(dataset_path, f'part-00000.{exporter_class.extension}')
+    if exporter_class is ParquetExporter:
+        return pyarrow.parquet.read_table(path)
+    with pyarrow.ipc.open_file(path) as reader:
+        return reader.read_all()
+
+
+@pytest.mark.parametrize('exporter_class', [ParquetExporter, ArrowExporter])
+class TestDatasetExporter:
+
+    def test_rows(self, data: ConverterData, exporter_class):
+        table = read_dataset(data, exporter_class)
+        rows = table.to_pylist()
+        assert [(row['transcription'], row['translation']) for row in rows] == \
+            [(transcription.transcription, transcription.translation) for transcription in data.transcriptions]
+        assert [row['id'] for row in rows] == [str(transcription.id) for transcription in data.transcriptions]
+        assert (rows[0]['audio'], rows[0]['audio_format']) == (sound_file(0).data, 'wav')
+        assert rows[1]['audio'] is None
+        assert (rows[2]['image'], rows[2]['image_format']) == (b'\x89PNG not really', 'png')
+        assert json.loads(table.schema.metadata[b'hermes']) == {key: value for key, value in data.lmf.items()
+                                                                 if key != 'words'}
+
+    def test_recorded_sample(self, data: ConverterData, exporter_class, tmp_path):
+        path = str(tmp_path / 'ngaya.wav')
+        PCMClip(np.zeros((800, 1), dtype=np.int16), 8000, 2).export(path, format='wav')
+        data.transcriptions[0] = Transcription(index=0, transcription='ngaya', start=100, end=500, media=object())
+        data.transcriptions[1] = Transcription(index=1, transcription='yindyamarra', start=600, end=900,
+                                               media=object())
+        # As the record windows do on saving a recording.
+        data.transcriptions[0].set_blank_sample()
+        data.transcriptions[0].sample.set_sample(path)
+        assert data.transcriptions[0].sample.recorded
+        rows = read_dataset(data, exporter_class).to_pylist()
+        assert (rows[0]['start'], rows[0]['end'], rows[0]['source_media']) == (None, None, path)
+        assert (rows[1]['start'], rows[1]['end']) == (600, 900)
@@ -0,0 +1,30 @@
+import pytest
+
+from datatypes import Sample, Transcription, Translation
+
+
+class TestTranscription:
+
+    def test_rows_have_no_instance_dict(self):
+        transcription = Transcription(index=0, transcription='ngaya', start=100, end=500, media=object())
+        for row in (transcription, transcription.sample, Translation(index=0, translation='I', start=100, end=500)):
+            assert not hasattr(row, '__dict__')
+        with pytest.raises(AttributeError):
+            transcription.unknown = True
+
+    def test_id_is_generated_once(self):
+        first, second = Transcription(index=0, transcription='ngaya'), Transcription(index=1, transcription='nginda')
+        assert first.id == first.id
+        assert first.id != second.id
+
+    def test_sample_needs_media_and_times(self):
+        assert Transcription(index=0, transcription='ngaya', start=100, end=500).sample is None
+        sample = Transcription(index=0, transcription='ngaya', start=100, end=500, media=object()).sample
+        assert isinstance(sample, Sample)
+        assert (sample.start, sample.end, sample.recorded) == (100, 500, False)
+
+    def test_time_matches_translation(self):
+        transcription = Transcription(index=0, transcription='ngaya', start=100, end=500, media=object())
+        assert transcription.time_matches_translation(Translation(index=0, translation='I', start=100, end=500))
+        assert not transcription.time_matches_translation(Translation(index=1, translation='you', start=600,
+                                                                      end=900))
@@ -0,0 +1,98 @@
+import errno
+import os
+import pytest
+
+from audio.encode import EncodedAudio
+from datatypes import AppSettings, ConverterData, OutputMode
+from utilities.exporters import (EXPORTERS, Exporter, exporter_names, get_exporter, load_built_in_exporters,
+                                 register_exporter)
+from utilities.output import DictExporter, LMFExporter, OpieExporter
+from utilities.targets import DirectoryTarget, ExportTarget
+
+load_built_in_exporters()
+
+AVAILABLE_MODES = [mode for mode in OutputMode if mode in EXPORTERS and EXPORTERS[mode].available()]
+
+
+class FullTarget(DirectoryTarget):
+    """A folder on a full disk, folders can be made in it but files can't be written."""
+    def open(self, *args, **kwargs):
+        raise OSError(errno.ENOSPC, 'No space left on device')
+
+    open_stream = write_text = write_audio = write_file = temporary_path = open
+
+
+class TestRegistry:
+
+    def test_built_in_exporters(self):
+        assert get_exporter(OutputMode.OPIE) is OpieExporter
+        assert get_exporter(OutputMode.DICT) is DictExporter
+        assert get_exporter(OutputMode.LMF) is LMFExporter
+        assert get_exporter(OutputMode.LMF).requires_manifest
+        assert exporter_names() == {mode: EXPORTERS[mode].name for mode in OutputMode}
+
+    def test_register_replaces_exporter(self, data: ConverterData, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setitem(EXPORTERS, OutputMode.DICT, DictExporter)
+
+        @register_exporter
+        class WordListExporter(Exporter):
+            mode = OutputMode.DICT
+            name = 'Word List'
+
+            def plan(self, rows):
+                super().plan(rows)
+                self.file = open(os.path.join(self.data.export_location, 'words.txt'), 'w')
+
+            def emit_transcription(self, row, transcription, sound_file):
+                self.file.write(f'{transcription.transcription}\n')
+
+            def finalise(self):
+                self.file.close()
+
+        assert get_exporter(OutputMode.DICT) is WordListExporter
+        assert exporter_names()[OutputMode.DICT] == 'Word List'
+        exporter = WordListExporter(data, AppSettings())
+        exporter.plan([2, 0])
+        for row in exporter.rows:
+            exporter.emit(row)
+        exporter.finalise()
+        assert exporter.row_count == 2
+        with open(os.path.join(data.export_location, 'words.txt')) as file:
+            assert file.read() == 'Bürru\nngaya\n'
+
+
+class TestExporter:
+
+    def test_abstract(self, data: ConverterData):
+        with pytest.raises(TypeError):
+            Exporter(data, AppSettings())
+        with pytest.raises(TypeError):
+            ExportTarget()
+
+    def test_abort_does_not_finalise(self, data: ConverterData):
+        class FinalisingExporter(Exporter):
+            finalised = False
+
+            def emit_transcription(self, row, transcription, sound_file):
+                pass
+
+            def finalise(self):
+                self.finalised = True
+
+        exporter = FinalisingExporter(data, AppSettings())
+        exporter.plan([0, 1])
+        exporter.emit(0)
+        exporter.abort()
+        assert not exporter.finalised
+
+    @pytest.mark.parametrize('mode', AVAILABLE_MODES, ids=[mode.name for mode in AVAILABLE_MODES])
+    def test_abort_after_failure(self, data: ConverterData, mode: OutputMode):
+        exporter = EXPORTERS[mode](data, AppSettings(), target=FullTarget(data.export_location))
+        # Fails part way through plan(), or on the first file written after it.
+        with pytest.raises(OSError):
+            exporter.plan([0, 1, 2])
+            for row in exporter.rows:
+                exporter.emit(row, EncodedAudio(b'RIFF', 'wav'))
+            exporter.finalise()
+        exporter.abort()
+        assert not [name for _, _, names in os.walk(data.export_location) for name in names]
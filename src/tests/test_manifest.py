@@ -0,0 +1,70 @@
+import json
+import pytest
+
+from utilities.manifest import ManifestWriter, manifest_complete, recover_manifest
+
+HEADER = {
+    'transcription-language': 'Wiradjuri',
+    'translation-language': 'English',
+    'author': 'Hermes tests',
+    'words': [{'ignored': True}],
+}
+ENTRIES = [
+    {'id': '1', 'transcription': 'ngaya', 'translation': ['I'], 'audio': ['sound/ngaya.wav']},
+    {'id': '2', 'transcription': 'yindyamarra', 'translation': ['respect, "gentleness"'], 'image': []},
+    {'id': '3', 'transcription': 'gaba', 'translation': ['good'], 'nested': {'tags': ['adj', 'ü']}},
+]
+
+
+def write_manifest(path, entries: list, compact: bool = False) -> str:
+    with ManifestWriter(str(path), HEADER, compact=compact) as writer:
+        for entry in entries:
+            writer.write_entry(entry)
+    with open(path) as file:
+        return file.read()
+
+
+class TestManifestWriter:
+
+    @pytest.mark.parametrize('count', [0, 1, len(ENTRIES)])
+    def test_matches_json_dump(self, tmp_path, count: int):
+        text = write_manifest(tmp_path / 'manifest.json', ENTRIES[:count])
+        assert text == json.dumps({**HEADER, 'words': ENTRIES[:count]}, indent=4)
+
+    @pytest.mark.parametrize('count', [0, 1, len(ENTRIES)])
+    def test_compact(self, tmp_path, count: int):
+        text = write_manifest(tmp_path / 'manifest.json', ENTRIES[:count], compact=True)
+        assert json.loads(text) == {**HEADER, 'words': ENTRIES[:count]}
+        # One line per entry, without indentation.
+        assert len(text.splitlines()) == count + (2 if count else 1)
+        assert '    ' not in text
+
+
+class TestRecoverManifest:
+
+    @pytest.mark.parametrize('compact', [False, True])
+    def test_recovers_whole_entries(self, tmp_path, compact: bool):
+        path = tmp_path / 'manifest.json'
+        text = write_manifest(path, ENTRIES, compact=compact)
+        # Cut off part way through the last entry, as an interrupted export leaves it.
+        path.write_text(text[:text.index('gaba')])
+        assert not manifest_complete(str(path))
+        assert recover_manifest(str(path), compact=compact) == 2
+        assert manifest_complete(str(path))
+        with open(path) as file:
+            assert json.load(file) == {**HEADER, 'words': ENTRIES[:2]}
+
+    def test_recovered_path(self, tmp_path):
+        path, recovered_path = tmp_path / 'manifest.json', tmp_path / 'recovered.json'
+        text = write_manifest(path, ENTRIES)
+        # Cut off after the last entry, before the list of words is closed.
+        path.write_text(text[:text.rindex(']')])
+        assert recover_manifest(str(path), str(recovered_path)) == 3
+        assert recovered_path.read_text() == json.dumps({**HEADER, 'words': ENTRIES}, indent=4)
+        assert not manifest_complete(str(path))
+
+    def test_header_is_required(self, tmp_path):
+        path = tmp_path / 'manifest.json'
+        path.write_text('{\n    "author": "Hermes')
+        with pytest.raises(ValueError):
+            recover_manifest(str(path))
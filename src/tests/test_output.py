@@ -0,0 +1,63 @@
+import builtins
+import csv
+import os
+import pytest
+
+from audio.encode import EncodedAudio
+from datatypes import AppSettings, ConverterData
+from utilities.manifest import manifest_complete
+from utilities.output import DictExporter, LMFExporter
+
+
+def sound_file(row: int) -> EncodedAudio:
+    return EncodedAudio(b'RIFF' + bytes([row]) * 100, 'wav')
+
+
+def export_rows(exporter, rows: list) -> None:
+    exporter.plan(rows)
+    for row in rows:
+        exporter.emit(row, sound_file(row) if row != 1 else None)
+    exporter.finalise()
+
+
+class TestDictExporter:
+
+    def test_rows(self, data: ConverterData):
+        export_rows(DictExporter(data, AppSettings()), [0, 1, 2])
+        with open(os.path.join(data.export_location, 'dictionary.csv'), newline='') as file:
+            header, *rows = list(csv.reader(file))
+        assert header == ['Transcription', 'Translation', 'Audio', 'Image']
+        assert [row[:2] for row in rows] == [[transcription.transcription, transcription.translation]
+                                             for transcription in data.transcriptions]
+        sound_path = os.path.join(data.export_location, 'sounds', 'ngaya-0.wav')
+        assert rows[0][2:] == [sound_path, '']
+        with open(sound_path, 'rb') as file:
+            assert file.read() == sound_file(0).data
+        assert rows[1][2:] == ['', '']
+        assert rows[2][3] == os.path.join(data.export_location, 'images', 'Bürru-2.png')
+        assert os.path.isfile(rows[2][3])
+
+    def test_opened_once(self, data: ConverterData, monkeypatch: pytest.MonkeyPatch):
+        opened = []
+        builtin_open = builtins.open
+
+        def counting_open(file, *args, **kwargs):
+            opened.append(os.path.basename(str(file)))
+            return builtin_open(file, *args, **kwargs)
+
+        monkeypatch.setattr(builtins, 'open', counting_open)
+        export_rows(DictExporter(data, AppSettings()), [0, 1, 2])
+        monkeypatch.undo()
+        assert opened.count('dictionary.csv') == 1
+
+
+class TestLMFExporter:
+
+    def test_abort_leaves_manifest_to_recover(self, data: ConverterData):
+        manifest_path = os.path.join(data.export_location, 'manifest.json')
+        exporter = LMFExporter(data, AppSettings())
+        exporter.plan([0, 1])
+        exporter.emit(0, sound_file(0))
+        exporter.abort()
+        assert os.path.isfile(manifest_path)
+        assert not manifest_complete(manifest_path)
@@ -0,0 +1,61 @@
+import json
+import os
+import sqlite3
+import pytest
+
+from audio.encode import EncodedAudio
+from datatypes import AppSettings, ConverterData
+from utilities.package import PACKAGE_FILE, SQLitePackageExporter, fts5_available, search_package
+
+pytestmark = pytest.mark.skipif(not fts5_available(), reason='SQLite without FTS5')
+
+
+def sound_file(row: int) -> EncodedAudio:
+    return EncodedAudio(b'RIFF' + bytes([row]) * 100, 'wav')
+
+
+class TestSQLitePackageExporter:
+
+    @pytest.fixture
+    def package(self, data: ConverterData):
+        export_path = data.export_location
+        exporter = SQLitePackageExporter(data, AppSettings())
+        exporter.plan([0, 1, 2])
+        for row in range(3):
+            exporter.emit(row, sound_file(row) if row != 1 else None)
+        exporter.finalise()
+        assert os.listdir(export_path) == [PACKAGE_FILE]
+        connection = sqlite3.connect(os.path.join(export_path, PACKAGE_FILE))
+        connection.row_factory = sqlite3.Row
+        yield connection
+        connection.close()
+
+    def test_words(self, data: ConverterData, package: sqlite3.Connection):
+        words = package.execute('SELECT * FROM words ORDER BY id').fetchall()
+        assert [(word['transcription'], word['translation']) for word in words] == \
+            [(transcription.transcription, transcription.translation) for transcription in data.transcriptions]
+        assert [word['uuid'] for word in words] == [str(transcription.id) for transcription in data.transcriptions]
+        assert words[0]['audio'] == sound_file(0).data
+        assert words[0]['audio_format'] == 'wav'
+        assert words[1]['audio'] is None
+        assert (words[2]['image'], words[2]['image_format']) == (b'\x89PNG not really', 'png')
+
+    def test_metadata(self, data: ConverterData, package: sqlite3.Connection):
+        metadata = {row['key']: json.loads(row['value']) for row in package.execute('SELECT * FROM metadata')}
+        assert metadata == {key: value for key, value in data.lmf.items() if key != 'words'}
+
+    def test_search(self, package: sqlite3.Connection):
+        assert [word['transcription'] for word in search_package(package, 'burru')] == ['Bürru']
+        assert [word['transcription'] for word in search_package(package, 'respect')] == ['yindyamarra']
+        assert [word['transcription'] for word in search_package(package, 'nga*')] == ['ngaya']
+        assert search_package(package, 'emu') == []
+
+    def test_abort_removes_temporary_file(self, data: ConverterData):
+        export_path = data.export_location
+        exporter = SQLitePackageExporter(data, AppSettings())
+        exporter.plan([0, 1])
+        exporter.emit(0, sound_file(0))
+        assert os.path.exists(os.path.join(export_path, f'{PACKAGE_FILE}.tmp'))
+        exporter.abort()
+        assert not os.path.exists(os.path.join(export_path, f'{PACKAGE_FILE}.tmp'))
+        assert not os.path.exists(os.path.join(export_path, PACKAGE_FILE))
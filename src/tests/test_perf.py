@@ -0,0 +1,113 @@
+import json
+import os
+import pstats
+import threading
+import time
+import pytest
+
+from perf import PerfRecorder, ProfilerCapture, PERF_REPORTS_KEPT, PERF_SPAN_LIMIT
+
+
+class TestPerfRecorder:
+
+    @pytest.fixture
+    def recorder(self):
+        yield PerfRecorder()
+
+    def test_timer_totals(self, recorder: PerfRecorder):
+        for seconds in (0.001, 0.003):
+            recorder.record('Clip cut', seconds)
+        timer = recorder.report()['timers']['Clip cut']
+        assert timer['count'] == 2
+        assert timer['total_ms'] == pytest.approx(4)
+        assert timer['mean_ms'] == pytest.approx(2)
+        assert timer['min_ms'] == pytest.approx(1)
+        assert timer['max_ms'] == pytest.approx(3)
+
+    def test_spans_record_parent(self, recorder: PerfRecorder):
+        with recorder.span('Export'):
+            with recorder.span('Export finalise'):
+                pass
+        spans = recorder.report()['spans']
+        assert [(span['name'], span['parent']) for span in spans] == [('Export finalise', 'Export'),
+                                                                      ('Export', None)]
+        assert recorder.report()['timers']['Export']['count'] == 1
+
+    def test_timer_is_not_traced(self, recorder: PerfRecorder):
+        with recorder.timer('Audio encode'):
+            pass
+        report = recorder.report()
+        assert report['timers']['Audio encode']['count'] == 1
+        assert report['spans'] == []
+
+    def test_spanned_names_span_from_arguments(self, recorder: PerfRecorder):
+        @recorder.spanned(lambda mode: mode.title())
+        def save(mode: str) -> str:
+            return mode
+
+        assert save('autosave') == 'autosave'
+        assert save.__name__ == 'save'
+        assert recorder.report()['timers']['Autosave']['count'] == 1
+
+    def test_span_records_on_error(self, recorder: PerfRecorder):
+        with pytest.raises(ValueError):
+            with recorder.span('Save'):
+                raise ValueError
+        assert recorder.report()['timers']['Save']['count'] == 1
+
+    def test_counters_across_threads(self, recorder: PerfRecorder):
+        def count():
+            for _ in range(1000):
+                recorder.count('Rows exported')
+        threads = [threading.Thread(target=count) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert recorder.report()['counters']['Rows exported'] == 4000
+
+    def test_trace_is_bounded(self, recorder: PerfRecorder):
+        for _ in range(PERF_SPAN_LIMIT + 10):
+            with recorder.span('Filter'):
+                pass
+        report = recorder.report()
+        assert len(report['spans']) == PERF_SPAN_LIMIT
+        assert report['timers']['Filter']['count'] == PERF_SPAN_LIMIT + 10
+
+    def test_session_reports_are_pruned(self, recorder: PerfRecorder, tmp_path):
+        for index in range(PERF_REPORTS_KEPT + 2):
+            (tmp_path / f'perf_hermes_2000-01-01_00-00-{index:02d}.json').write_text('{}')
+        path = recorder.write_session_report(str(tmp_path), '1.0')
+        with open(path) as file:
+            assert json.load(file)['version'] == '1.0'
+        assert len(os.listdir(tmp_path)) == PERF_REPORTS_KEPT
+        assert os.path.basename(path) in os.listdir(tmp_path)
+
+
+class TestProfilerCapture:
+
+    def test_capture_writes_profile_stacks_and_memory(self, tmp_path):
+        def busy_worker():
+            deadline = time.perf_counter() + 0.2
+            while time.perf_counter() < deadline:
+                sum(range(1000))
+
+        profiler = ProfilerCapture(interval=0.005)
+        profiler.start()
+        worker = threading.Thread(target=busy_worker, name='Export worker')
+        worker.start()
+        allocated = [bytearray(1024) for _ in range(1000)]
+        worker.join()
+        profile_path, stacks_path, memory_path = profiler.stop(str(tmp_path))
+        assert not profiler.running
+        assert pstats.Stats(profile_path).total_calls > 0
+        with open(stacks_path) as file:
+            stacks = file.read().splitlines()
+        assert any(stack.startswith('Export worker;') and 'busy_worker' in stack for stack in stacks)
+        with open(memory_path) as file:
+            assert 'test_perf.py' in file.read()
+        assert len(allocated) == 1000
+
+    def test_stop_without_start(self, tmp_path):
+        assert ProfilerCapture().stop(str(tmp_path)) == []
+        assert os.listdir(tmp_path) == []
@@ -0,0 +1,90 @@
+import json
+import os
+import pytest
+
+from utilities.search import ProjectSearchIndex, search_query
+
+
+def write_save(root, project: str, words: list) -> str:
+    saves_path = root / project / 'saves'
+    saves_path.mkdir(parents=True, exist_ok=True)
+    save_path = saves_path / f'{project}.hermes'
+    save_path.write_text(json.dumps({'words': [{'id': f'{project}-{index}', 'transcription': transcription,
+                                                'translation': [translation]}
+                                               for index, (transcription, translation) in enumerate(words)]}))
+    return str(save_path)
+
+
+class TestProjectSearchIndex:
+
+    @pytest.fixture
+    def root(self, tmp_path):
+        root = tmp_path / 'projects'
+        write_save(root, 'wiradjuri', [('ngaya', 'I'), ('yindyamarra', 'respect, gentleness')])
+        write_save(root, 'gamilaraay', [('ngaya', 'I, me'), ('gaba', 'good')])
+        # Autosaves and folders without a save aren't indexed.
+        (root / 'gamilaraay' / 'saves' / 'autosave.hermes').write_text(json.dumps({'words': [
+            {'id': 'a', 'transcription': 'autosaved', 'translation': ['']}]}))
+        (root / 'empty').mkdir()
+        yield root
+
+    @pytest.fixture
+    def index(self, root, tmp_path):
+        with ProjectSearchIndex(str(root), str(tmp_path / 'index.sqlite')) as index:
+            index.refresh()
+            yield index
+
+    def test_search_across_projects(self, index: ProjectSearchIndex):
+        hits = index.search('ngaya')
+        assert sorted(hit['project'] for hit in hits) == ['gamilaraay', 'wiradjuri']
+        assert index.search('autosaved') == []
+        assert index.word_count() == 4
+
+    def test_search_translations_by_prefix(self, index: ProjectSearchIndex):
+        assert [hit['transcription'] for hit in index.search('gentle')] == ['yindyamarra']
+        assert [hit['uuid'] for hit in index.search('I me')] == ['gamilaraay-0']
+
+    def test_refresh_is_incremental(self, root, index: ProjectSearchIndex):
+        assert index.refresh() == 0
+        save_path = write_save(root, 'wiradjuri', [('ngaya', 'I'), ('giir', 'true, really')])
+        os.utime(save_path, ns=(1, 1))
+        assert index.refresh() == 1
+        assert index.search('yindyamarra') == []
+        assert [hit['transcription'] for hit in index.search('really')] == ['giir']
+
+    def test_refresh_drops_removed_projects(self, root, index: ProjectSearchIndex):
+        os.remove(root / 'gamilaraay' / 'saves' / 'gamilaraay.hermes')
+        index.refresh()
+        assert [hit['project'] for hit in index.search('ngaya')] == ['wiradjuri']
+        assert index.search('good') == []
+
+    def test_update_save_from_memory(self, root, index: ProjectSearchIndex):
+        save_path = str(root / 'gamilaraay' / 'saves' / 'gamilaraay.hermes')
+        assert index.update_save(save_path, {'words': [{'id': 'x', 'transcription': 'guwaymbal',
+                                                        'translation': ['dusk']}]})
+        assert [hit['project'] for hit in index.search('dusk')] == ['gamilaraay']
+        assert index.search('gaba') == []
+
+    def test_unreadable_save_is_skipped(self, root, index: ProjectSearchIndex):
+        save_path = root / 'wiradjuri' / 'saves' / 'wiradjuri.hermes'
+        save_path.write_text('{')
+        assert index.refresh() == 0
+        assert len(index.search('ngaya')) == 2
+
+    def test_index_is_reused(self, root, tmp_path, index: ProjectSearchIndex):
+        with ProjectSearchIndex(str(root), str(tmp_path / 'index.sqlite')) as reopened:
+            assert reopened.refresh() == 0
+            assert reopened.word_count() == 4
+
+
+class TestSearchQuery:
+
+    def test_terms_are_quoted_prefixes(self):
+        assert search_query('  ') is None
+        assert search_query('ngaya gab') == '"ngaya"* "gab"*'
+        assert search_query('say "hi"') == '"say"* """hi"""*'
+
+    def test_operators_are_literal(self, tmp_path):
+        with ProjectSearchIndex(str(tmp_path), str(tmp_path / 'index.sqlite')) as index:
+            for text in ('AND', 'a - b', 'NEAR(', '*', '"'):
+                assert index.search(text) == []
@@ -0,0 +1,67 @@
+import json
+import os
+import tarfile
+import zipfile
+import pytest
+
+from audio.encode import EncodedAudio
+from datatypes import AppSettings, ConverterData, Transcription
+from utilities.shards import SHARD_INDEX, TarShardExporter
+from utilities.targets import ZipTarget
+
+# Each clip is 64 KiB of silence, which compresses to next to nothing.
+CLIP = EncodedAudio(b'RIFF' + bytes(64 * 1024), 'wav')
+
+
+def export_shards(data: ConverterData, compression: str, count: int = 10, target=None) -> None:
+    data.transcriptions = [Transcription(index=index, transcription=f'word {index}') for index in range(count)]
+    settings = AppSettings(shard_compression=compression)
+    # Shards of about 160 KiB, in place of whole megabytes.
+    settings.shard_size = 0.15
+    exporter = TarShardExporter(data, settings, target=target)
+    exporter.plan(list(range(count)))
+    for row in range(count):
+        exporter.emit(row, CLIP)
+    exporter.finalise()
+    if target is not None:
+        target.close()
+
+
+class TestTarShardExporter:
+
+    @pytest.mark.parametrize('compression, shard_count', [('', 4), ('gz', 1), ('bz2', 1), ('xz', 1)])
+    def test_shard_size_on_disk(self, data: ConverterData, compression: str, shard_count: int):
+        export_shards(data, compression)
+        shards_path = os.path.join(data.export_location, 'shards')
+        shards = sorted(name for name in os.listdir(shards_path) if name.startswith('shard-'))
+        assert len(shards) == shard_count
+        members = []
+        for shard in shards:
+            with tarfile.open(os.path.join(shards_path, shard)) as archive:
+                members += archive.getnames()
+        assert len(members) == 30
+
+    def test_index_offsets(self, data: ConverterData):
+        export_shards(data, '', count=3)
+        shards_path = os.path.join(data.export_location, 'shards')
+        with open(os.path.join(shards_path, SHARD_INDEX)) as file:
+            index = [json.loads(line) for line in file]
+        assert [entry['key'] for entry in index] == ['00000000', '00000001', '00000002']
+        for entry in index:
+            with open(os.path.join(shards_path, entry['shard']), 'rb') as shard:
+                shard.seek(entry['members']['txt'][0])
+                assert shard.read(entry['members']['txt'][1]) == f'word {int(entry["key"])}'.encode('utf-8')
+                offset, size = entry['members']['wav']
+                shard.seek(offset)
+                assert shard.read(size) == CLIP.data
+
+    @pytest.mark.parametrize('compression', ['', 'gz'])
+    def test_zip_target(self, data: ConverterData, compression: str, tmp_path):
+        archive_path = tmp_path / 'export.zip'
+        export_shards(data, compression, target=ZipTarget(str(archive_path)))
+        with zipfile.ZipFile(archive_path) as archive:
+            shards = [name for name in archive.namelist() if name.startswith('shards/shard-')]
+            assert shards
+            for shard in shards:
+                with archive.open(shard) as file, tarfile.open(fileobj=file, mode='r|*') as shard_archive:
+                    assert all(member.name.endswith(('.txt', '.json', '.wav')) for member in shard_archive)
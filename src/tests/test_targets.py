@@ -0,0 +1,59 @@
+import os
+import zipfile
+import pytest
+
+from audio.encode import EncodedAudio
+from datatypes import AppSettings, ConverterData, OutputMode
+from utilities.exporters import EXPORTERS, load_built_in_exporters
+from utilities.targets import DirectoryTarget, ZipTarget
+
+load_built_in_exporters()
+
+AVAILABLE_MODES = [mode for mode in OutputMode if mode in EXPORTERS and EXPORTERS[mode].available()]
+
+
+def run_export(data: ConverterData, mode: OutputMode, target) -> None:
+    exporter = EXPORTERS[mode](data, AppSettings(), target=target)
+    rows = list(range(len(data.transcriptions)))
+    exporter.plan(rows)
+    for row in rows:
+        exporter.emit(row, EncodedAudio(b'RIFF' + bytes([row]) * 64, 'wav') if row != 1 else None)
+    exporter.finalise()
+    target.close()
+
+
+def directory_files(root) -> set:
+    return {os.path.relpath(os.path.join(folder, name), root).replace(os.sep, '/')
+            for folder, _, names in os.walk(root) for name in names}
+
+
+@pytest.mark.parametrize('mode', AVAILABLE_MODES, ids=[mode.name for mode in AVAILABLE_MODES])
+class TestZipTarget:
+
+    def test_layout_matches_directory(self, data: ConverterData, mode: OutputMode, tmp_path):
+        run_export(data, mode, DirectoryTarget(data.export_location))
+        archive_path = tmp_path / 'export.zip'
+        run_export(data, mode, ZipTarget(str(archive_path)))
+        assert not os.path.exists(f'{archive_path}.tmp')
+        with zipfile.ZipFile(archive_path) as archive:
+            assert archive.testzip() is None
+            members = {name for name in archive.namelist() if not name.endswith('/')}
+        assert members == directory_files(data.export_location)
+
+    def test_references_are_archive_relative(self, data: ConverterData, mode: OutputMode, tmp_path):
+        archive_path = tmp_path / 'export.zip'
+        run_export(data, mode, ZipTarget(str(archive_path)))
+        with zipfile.ZipFile(archive_path) as archive:
+            for name in archive.namelist():
+                assert str(tmp_path).encode('utf-8') not in archive.read(name), name
+
+    def test_abort_removes_archive(self, data: ConverterData, mode: OutputMode, tmp_path):
+        archive_path = tmp_path / 'export.zip'
+        target = ZipTarget(str(archive_path))
+        exporter = EXPORTERS[mode](data, AppSettings(), target=target)
+        exporter.plan([0, 1])
+        exporter.emit(0, EncodedAudio(b'RIFF', 'wav'))
+        exporter.abort()
+        target.abort()
+        assert not os.path.exists(archive_path)
+        assert not os.path.exists(f'{archive_path}.tmp')
@@ -0,0 +1,17 @@
+import sys
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QApplication, QTableWidget
+from widgets.formatting import numeric_item
+
+
+class TestNumericItem:
+
+    def test_sorts_by_value(self):
+        app = QApplication.instance() or QApplication(sys.argv)
+        table = QTableWidget(4, 1)
+        for row, value in enumerate([10, 9.5, 100, -2]):
+            table.setItem(row, 0, numeric_item(value))
+        table.sortItems(0, Qt.AscendingOrder)
+        assert [table.item(row, 0).data(Qt.DisplayRole) for row in range(4)] == [-2, 9.5, 10, 100]
+        assert table.item(3, 0).text() == '100'
@@ -0,0 +1,43 @@
+import sys
+import pytest
+
+from PyQt5.QtWidgets import QApplication, QStatusBar
+import windows  # Loads the windows before the widgets, which import them in turn.
+from datatypes import AppSettings, ConverterData, Transcription
+from widgets.table import FilterTable, TABLE_COLUMNS
+
+
+class TestTimeNavigator:
+
+    @pytest.fixture
+    def filter_table(self):
+        app = QApplication.instance() or QApplication(sys.argv)
+        data = ConverterData()
+        data.transcriptions = [Transcription(index=index, transcription=f'word {index}', start=index * 1000,
+                                             end=index * 1000 + 800, media=object()) for index in range(5)]
+        filter_table = FilterTable(data, QStatusBar(), AppSettings())
+        filter_table.populate_table(data.transcriptions)
+        yield filter_table
+
+    def go_to(self, filter_table: FilterTable, text: str) -> None:
+        filter_table.time_field.setText(text)
+        filter_table.on_time_entered()
+
+    def test_jump_to_time(self, filter_table: FilterTable):
+        self.go_to(filter_table, '0:02.5')
+        assert filter_table.table.currentRow() == 2
+        self.go_to(filter_table, '0:01-0:02.5')
+        assert [row for row in range(5) if not filter_table.table.isRowHidden(row)] == [1, 2]
+        self.go_to(filter_table, '')
+        assert not any(filter_table.table.isRowHidden(row) for row in range(5))
+
+    def test_rerecorded_rows_leave_the_index(self, filter_table: FilterTable):
+        self.go_to(filter_table, '0:03.2')
+        assert filter_table.table.currentRow() == 3
+        # As the record windows do on saving a recording.
+        filter_table.data.transcriptions[3].set_blank_sample()
+        filter_table.table.cellWidget(3, TABLE_COLUMNS['Audio']).on_sample_changed()
+        self.go_to(filter_table, '0:03.2')
+        assert filter_table.table.currentRow() in (2, 4)
+        self.go_to(filter_table, '0:03-0:03.5')
+        assert [row for row in range(5) if not filter_table.table.isRowHidden(row)] == []
@@ -0,0 +1,25 @@
+import sys
+import numpy as np
+
+from PyQt5.QtWidgets import QApplication
+from audio.pcm import PCMClip
+from audio.peaks import clip_peaks
+from widgets.waveform import PeakWorker
+
+
+class TestPeakWorker:
+
+    def test_builds_clip_peaks(self):
+        app = QApplication.instance() or QApplication(sys.argv)
+        samples = (np.sin(np.arange(48000 * 5) / 20) * 20000).astype(np.int16).reshape(-1, 1)
+        clip = PCMClip(samples, 48000, 2)
+        pyramids = []
+        worker = PeakWorker(clip)
+        worker.pyramid_ready.connect(pyramids.append)
+        worker.start()
+        assert worker.wait(10000)
+        app.processEvents()
+        assert len(pyramids) == 1
+        assert pyramids[0].frame_count == clip.frame_count
+        # Built into the clip's cache entry, so the GUI thread can reuse it.
+        assert clip_peaks(clip) is pyramids[0]
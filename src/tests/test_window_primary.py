@@ -1,7 +1,9 @@
 import sys, os
+import sqlite3
 import pytest
 from pytest_mock import mocker
 
+from PyQt5.QtCore import QThread
 from PyQt5.QtWidgets import QApplication, QWidget
 from windows.primary import PrimaryWindow, ProgressBarWidget
 from widgets.icon import ApplicationIcon
@@ -42,3 +44,23 @@ class TestMain:
         assert isinstance(main_window.session, SessionManager)
         assert isinstance(main_window.settings, AppSettings)
 
+
+    def test_search_index_error(self, main_window: PrimaryWindow, mocker):
+        mocker.patch('windows.search.ProjectSearchIndex', side_effect=sqlite3.OperationalError('database is locked'))
+        warning = mocker.patch('windows.primary.WarningMessage')
+        main_window.on_click_search()
+        warning.return_value.warning.assert_called_once()
+
+    def test_close_stops_workers(self, main_window: PrimaryWindow):
+        class Worker(QThread):
+            def run(self):
+                while not self.isInterruptionRequested():
+                    self.msleep(5)
+
+        main_window.converter.import_worker = Worker()
+        main_window.converter.qc_worker = Worker()
+        for worker in (main_window.converter.import_worker, main_window.converter.qc_worker):
+            worker.start()
+        main_window.close()
+        assert main_window.converter.import_worker.isFinished()
+        assert main_window.converter.qc_worker.isFinished()
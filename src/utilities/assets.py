@@ -0,0 +1,178 @@
+import hashlib
+import os
+import shutil
+import stat
+import threading
+from typing import Union
+from audio.encode import EncodedAudio
+from utilities.logger import setup_custom_logger
+
+try:
+    import fcntl
+except ImportError:
+    # Windows, where only hard links and copies are used.
+    fcntl = None
+
+
+LOG_ASSETS = setup_custom_logger("Asset Store")
+
+# ioctl request cloning one file's extents into another (copy-on-write) on Btrfs, XFS and similar, from linux/fs.h.
+FICLONE = 0x40049409
+HASH_CHUNK = 1024 * 1024
+
+
+def reflink(source: str, destination: str) -> None:
+    """
+    Creates destination as a copy-on-write clone of source.
+    :raises OSError: if the platform or filesystem does not support it.
+    """
+    if fcntl is None:
+        raise OSError('Reflinks are not supported on this platform')
+    with open(source, 'rb') as source_file, open(destination, 'wb') as destination_file:
+        try:
+            fcntl.ioctl(destination_file.fileno(), FICLONE, source_file.fileno())
+        except OSError:
+            destination_file.close()
+            os.remove(destination)
+            raise
+
+
+def make_writable(path: str) -> None:
+    """Clears the read-only bit of path, without which Windows refuses to remove or replace it."""
+    mode = os.stat(path).st_mode
+    if not mode & stat.S_IWUSR:
+        os.chmod(path, mode | stat.S_IWUSR)
+
+
+def clone_file(source: str, destination: str, allow_hard_link: bool = True) -> str:
+    """
+    Puts a copy of source at destination as cheaply as the filesystem allows: a reflink, then (if allowed) a hard
+    link, then a plain copy. Any existing destination is replaced.
+    :return: the method used, 'reflink', 'link' or 'copy'.
+    """
+    if os.path.lexists(destination):
+        if os.path.exists(destination) and os.path.samefile(source, destination):
+            return 'link'
+        if os.path.exists(destination):
+            make_writable(destination)
+        os.remove(destination)
+    try:
+        reflink(source, destination)
+        return 'reflink'
+    except OSError:
+        pass
+    if allow_hard_link:
+        try:
+            os.link(source, destination)
+            return 'link'
+        except OSError:
+            pass
+    shutil.copyfile(source, destination)
+    return 'copy'
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AssetStore(object):
+    """
+    Content-addressed store of a project's assets (audio and images), each kept once as
+    root/<first two characters of its SHA-256>/<SHA-256><extension> however many words use it.
+
+    Files are copied (or reflinked) into the store, never hard linked, as the originals may be edited later. Stored
+    files are then hard linked (or reflinked) out to exports, so repeated and shared assets cost next to nothing to
+    save or export. They are left writable, as hard links share their mode and exports must stay replaceable (files
+    are only ever replaced in exports, never written through, see export_audio).
+    """
+    def __init__(self, root: str) -> None:
+        self.root = root
+        # Digests of files already seen, by (path, size, modification time), so unchanged files are not re-hashed.
+        self.digests = dict()
+        self.lock = threading.Lock()
+
+    def stored_path(self, digest: str, extension: str) -> str:
+        return os.path.join(self.root, digest[:2], f'{digest}{extension.lower()}')
+
+    def contains(self, path: str) -> bool:
+        return os.path.dirname(os.path.dirname(os.path.abspath(path))) == os.path.abspath(self.root)
+
+    def add_file(self, path: str) -> str:
+        """
+        :param path: the file to store.
+        :return: the path of the stored copy.
+        """
+        if self.contains(path):
+            return path
+        status = os.stat(path)
+        key = (os.path.abspath(path), status.st_size, status.st_mtime_ns)
+        with self.lock:
+            digest = self.digests.get(key)
+        if digest is None:
+            digest = file_digest(path)
+            with self.lock:
+                self.digests[key] = digest
+        stored_path = self.stored_path(digest, os.path.splitext(path)[1])
+        if not os.path.exists(stored_path):
+            self.place(stored_path, lambda temporary_path: clone_file(path, temporary_path, allow_hard_link=False))
+        return stored_path
+
+    def add_bytes(self, data: bytes, extension: str) -> str:
+        """
+        :param extension: file extension of the data, including the dot.
+        :return: the path of the stored copy.
+        """
+        stored_path = self.stored_path(hashlib.sha256(data).hexdigest(), extension)
+        if not os.path.exists(stored_path):
+            def write(temporary_path: str) -> None:
+                with open(temporary_path, 'wb') as file:
+                    file.write(data)
+            self.place(stored_path, write)
+        return stored_path
+
+    def place(self, stored_path: str, create) -> None:
+        """Creates a stored file via a temporary name, so a half-written file is never seen under its digest."""
+        os.makedirs(os.path.dirname(stored_path), exist_ok=True)
+        temporary_path = f'{stored_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        create(temporary_path)
+        os.replace(temporary_path, stored_path)
+
+    def link_out(self, stored_path: str, destination: str) -> str:
+        # Stores written by earlier versions made their files read-only, which links out to exports would share.
+        make_writable(stored_path)
+        return clone_file(stored_path, destination)
+
+    def export_file(self, path: str, destination: str) -> str:
+        """Stores a file and links (or copies) it to destination, returning destination."""
+        method = self.link_out(self.add_file(path), destination)
+        LOG_ASSETS.debug(f"Exported {path} to {destination} ({method})")
+        return destination
+
+    def export_audio(self, sound_file: EncodedAudio, destination: str) -> str:
+        """Stores encoded audio and links (or copies) it to destination, returning destination."""
+        self.link_out(self.add_bytes(sound_file.data, f'.{sound_file.extension}'), destination)
+        return destination
+
+
+def export_file(path: str, destination: str, store: Union[None, AssetStore] = None) -> str:
+    """Copies a file to destination, through the asset store when there is one."""
+    if store:
+        return store.export_file(path, destination)
+    clone_file(path, destination, allow_hard_link=False)
+    return destination
+
+
+def export_audio(sound_file: EncodedAudio, destination: str, store: Union[None, AssetStore] = None) -> str:
+    """Writes encoded audio to destination, through the asset store when there is one."""
+    if store:
+        return store.export_audio(sound_file, destination)
+    if os.path.lexists(destination):
+        # Never write through an existing file, it may be a hard link into an asset store.
+        make_writable(destination)
+        os.remove(destination)
+    sound_file.save(destination)
+    return destination
@@ -0,0 +1,191 @@
+import importlib.util
+import json
+import os
+from abc import abstractmethod
+from typing import BinaryIO, List, Union
+from audio.encode import EncodedAudio
+from datatypes import ConverterData, OutputMode, Transcription
+from .exporters import Exporter, register_exporter
+
+
+# Rows are buffered and written out as a row group (record batch) once either limit is reached.
+ROW_GROUP_ROWS = 1024
+ROW_GROUP_BYTES = 64 * 1024 * 1024
+# A new shard file is started once a shard holds this many bytes of audio and images.
+SHARD_BYTES = 1024 * 1024 * 1024
+
+
+def pyarrow_available() -> bool:
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def get_source_media(data: ConverterData) -> Union[None, str]:
+    """:return: the media file linked from the ELAN file, if any."""
+    if data.eaf_object is None:
+        return None
+    linked_files = data.eaf_object.get_linked_files()
+    return linked_files[0]['MEDIA_URL'] if linked_files else None
+
+
+def transcription_record(row: int, transcription: Transcription, source_media: str = None) -> dict:
+    """
+    :param source_media: the media file ELAN samples are cut from (see get_source_media).
+    :return: the text, timings (in milliseconds, None for recorded samples) and source media of a transcription.
+    """
+    sample = transcription.sample
+    recorded = sample is not None and sample.recorded
+    return {
+        'id': str(transcription.id),
+        'row': row,
+        'transcription': transcription.transcription,
+        'translation': transcription.translation,
+        'start': sample.start if sample and not recorded else None,
+        'end': sample.end if sample and not recorded else None,
+        'source_media': sample.sample_path if recorded else (source_media if sample else None),
+    }
+
+
+def dataset_schema(header: dict = None):
+    """
+    :param header: manifest fields (see create_lmf) stored as JSON in the schema metadata under 'hermes'.
+    :return: the pyarrow schema of exported datasets.
+    """
+    import pyarrow
+    return pyarrow.schema([
+        ('id', pyarrow.string()),
+        ('row', pyarrow.int32()),
+        ('transcription', pyarrow.string()),
+        ('translation', pyarrow.string()),
+        # Span of the sample in its source media, in milliseconds (null for recorded samples).
+        ('start', pyarrow.float64()),
+        ('end', pyarrow.float64()),
+        ('source_media', pyarrow.string()),
+        # The encoded audio file (in the output mode's audio profile) and its extension.
+        ('audio', pyarrow.binary()),
+        ('audio_format', pyarrow.string()),
+        ('image', pyarrow.binary()),
+        ('image_format', pyarrow.string()),
+    ], metadata={'hermes': json.dumps({key: value for key, value in (header or {}).items() if key != 'words'})})
+
+
+class DatasetExporter(Exporter):
+    """
+    Writes the export as a dataset for training pipelines: one row per transcription, holding its text, timings,
+    source media, audio and image, sharded into dataset/part-NNNNN files of row groups. Needs pyarrow.
+    """
+    requirement = 'the pyarrow package'
+    extension = ''
+    # The shard being written, None between shards (and if the export fails before one is opened).
+    shard_file = None
+    writer = None
+
+    @classmethod
+    def available(cls) -> bool:
+        return pyarrow_available()
+
+    def plan(self, rows: List[int]) -> None:
+        super().plan(rows)
+        import pyarrow
+        self.pyarrow = pyarrow
+        self.target.make_dir('dataset')
+        # Shards of a previous export would otherwise be read as part of this one.
+        self.target.clear('dataset', 'part-')
+        self.schema = dataset_schema(self.data.lmf)
+        self.source_media = get_source_media(self.data)
+        self.columns = {name: [] for name in self.schema.names}
+        self.buffered_bytes = 0
+        self.shard_count = 0
+        self.shard_bytes = 0
+        self.writer = None
+
+    def emit_transcription(self,
+                           row: int,
+                           transcription: Transcription,
+                           sound_file: Union[None, EncodedAudio]) -> None:
+        values = {
+            **transcription_record(row, transcription, self.source_media),
+            'audio': sound_file.data if sound_file is not None else None,
+            'audio_format': sound_file.extension if sound_file is not None else None,
+            'image': None,
+            'image_format': None,
+        }
+        if transcription.image:
+            with open(transcription.image, 'rb') as file:
+                values['image'] = file.read()
+            values['image_format'] = os.path.splitext(transcription.image)[1].lstrip('.').lower()
+        for name, value in values.items():
+            self.columns[name].append(value)
+        self.buffered_bytes += len(values['audio'] or b'') + len(values['image'] or b'')
+        if len(self.columns['id']) >= ROW_GROUP_ROWS or self.buffered_bytes >= ROW_GROUP_BYTES:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the buffered rows out as a row group."""
+        batch = self.pyarrow.record_batch([self.pyarrow.array(self.columns[field.name], type=field.type)
+                                           for field in self.schema], schema=self.schema)
+        if self.writer is None:
+            self.shard_file = self.target.open_stream(f'dataset/part-{self.shard_count:05d}.{self.extension}')
+            self.writer = self.open_shard(self.shard_file)
+            self.shard_count += 1
+        self.write_batch(batch)
+        self.shard_bytes += self.buffered_bytes
+        self.columns = {name: [] for name in self.schema.names}
+        self.buffered_bytes = 0
+        if self.shard_bytes >= SHARD_BYTES:
+            self.close_shard()
+
+    @abstractmethod
+    def open_shard(self, file: BinaryIO):
+        """:return: a writer of record batches to file."""
+
+    def close_shard(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        if self.shard_file is not None:
+            self.shard_file.close()
+            self.shard_file = None
+        self.shard_bytes = 0
+
+    def write_batch(self, batch) -> None:
+        self.writer.write_batch(batch)
+
+    def finalise(self) -> None:
+        # Always write at least one shard, so an empty export is still a readable dataset.
+        if self.columns['id'] or self.shard_count == 0:
+            self.flush()
+        self.close_shard()
+
+    def abort(self) -> None:
+        self.close_shard()
+
+
+@register_exporter
+class ParquetExporter(DatasetExporter):
+    """
+    Parquet shards, compact and readable by most data tools (pandas, Hugging Face datasets, Spark).
+    """
+    mode = OutputMode.PARQUET
+    name = "Dataset (Parquet)"
+    extension = 'parquet'
+
+    def open_shard(self, file: BinaryIO):
+        import pyarrow.parquet
+        return pyarrow.parquet.ParquetWriter(file, self.schema)
+
+    def write_batch(self, batch) -> None:
+        self.writer.write_table(self.pyarrow.Table.from_batches([batch]))
+
+
+@register_exporter
+class ArrowExporter(DatasetExporter):
+    """
+    Uncompressed Arrow IPC shards, which load without copying through pyarrow.memory_map and pyarrow.ipc.open_file.
+    """
+    mode = OutputMode.ARROW
+    name = "Dataset (Arrow)"
+    extension = 'arrow'
+
+    def open_shard(self, file: BinaryIO):
+        import pyarrow.ipc
+        return pyarrow.ipc.new_file(file, self.schema)
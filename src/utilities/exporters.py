@@ -0,0 +1,98 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Type, Union
+from audio.encode import EncodedAudio
+from datatypes import AppSettings, ConverterData, OutputMode, Transcription
+from .assets import AssetStore
+from .targets import DirectoryTarget, ExportTarget
+
+
+class Exporter(ABC):
+    """
+    Streaming interface of an output format. For each export the converter:
+        plan(rows)               once, before any audio is encoded (create folders, open files),
+        emit(row, sound_file)    for each exported row, in order, as its audio becomes ready,
+        finalise()               once, after the last row (close files off),
+    or abort() in place of finalise() if the export fails part way, which may be part way through plan().
+
+    Files are written through the target (see ExportTarget), so every format can be exported to a folder or a zip.
+    Output formats are registered against their OutputMode with register_exporter, and are then offered in the
+    settings window and used by the converter.
+    """
+    mode = None  # The OutputMode the exporter writes.
+    name = ''  # Name shown in the settings window.
+    requires_manifest = False  # Ask for the language metadata (see ManifestWindow) before exporting.
+    requirement = ''  # What available() needs, shown if it is missing.
+
+    def __init__(self,
+                 data: ConverterData,
+                 settings: AppSettings,
+                 store: AssetStore = None,
+                 target: ExportTarget = None) -> None:
+        """
+        :param data: the converter data, giving the transcriptions and export location.
+        :param settings: the application settings.
+        :param store: the project's asset store, audio and images are linked out of it where possible.
+        :param target: where to write the export (defaults to the export location, see DirectoryTarget).
+        """
+        self.data = data
+        self.settings = settings
+        self.target = target or DirectoryTarget(data.export_location, store)
+        self.rows = []
+        self.row_count = 0
+
+    @classmethod
+    def available(cls) -> bool:
+        """:return: whether the exporter's optional dependencies are installed."""
+        return True
+
+    def plan(self, rows: List[int]) -> None:
+        """:param rows: the rows to be exported, in order."""
+        self.rows = rows
+        self.row_count = 0
+
+    def emit(self, row: int, sound_file: Union[None, EncodedAudio] = None) -> None:
+        """
+        :param row: the row of the transcription to write.
+        :param sound_file: the row's audio, ready encoded (see iter_export_audio), if it has any.
+        """
+        self.emit_transcription(row, self.data.transcriptions[row], sound_file)
+        self.row_count += 1
+
+    @abstractmethod
+    def emit_transcription(self,
+                           row: int,
+                           transcription: Transcription,
+                           sound_file: Union[None, EncodedAudio]) -> None:
+        pass
+
+    def finalise(self) -> None:
+        pass
+
+    def abort(self) -> None:
+        """Releases whatever plan() and emit() have opened, without completing the export."""
+        pass
+
+
+EXPORTERS: Dict[OutputMode, Type[Exporter]] = dict()
+
+
+def register_exporter(exporter_class: Type[Exporter]) -> Type[Exporter]:
+    """Class decorator adding an Exporter to the registry, replacing any registered for the same mode."""
+    EXPORTERS[exporter_class.mode] = exporter_class
+    return exporter_class
+
+
+def load_built_in_exporters() -> None:
+    # Importing the built in formats registers them.
+    from . import dataset, output, package, shards
+
+
+def get_exporter(mode: OutputMode) -> Type[Exporter]:
+    """:raises KeyError: if no exporter is registered for mode."""
+    load_built_in_exporters()
+    return EXPORTERS[mode]
+
+
+def exporter_names() -> Dict[OutputMode, str]:
+    load_built_in_exporters()
+    return {mode: EXPORTERS[mode].name for mode in OutputMode if mode in EXPORTERS}
@@ -1,6 +1,8 @@
 import os
 import sys
+from pathlib import Path
 from PyQt5.QtWidgets import QFileDialog
+from datatypes import get_default_project_dir
 
 
 def resource_path(relative_path) -> str:
@@ -62,3 +64,11 @@ def make_file_if_not_extant(path: str) -> str:
     if not os.path.exists(path):
         os.makedirs(path)
     return path
+
+
+def get_cache_path(name: str) -> str:
+    """
+    :param name: the kind of data cached (e.g. 'peaks').
+    :return: a folder for cached data of that kind alongside the logs, created if need be.
+    """
+    return make_file_if_not_extant(os.path.join(Path(get_default_project_dir()).parent, "cache", name))
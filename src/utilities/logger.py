@@ -1,27 +1,98 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import reprlib
 import sys
-from datatypes import AppSettings
-from datetime import datetime
+from datatypes import get_default_project_dir
 from pathlib import Path
+from typing import Any, Union
 
 
-def setup_custom_logger(name):
-    app_settings = AppSettings()
-    log_path = os.path.join(Path(app_settings.default_project_dir).parent, "logs")
+# The log file rolls over to log_hermes.log.1 (up to .5) at this size, so it stops growing once there are 30 MiB.
+LOG_FILE_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUPS = 5
+
+# Level of each component's logger (by name, see setup_custom_logger), others log everything. Components logging
+# once per row of an export are held to INFO.
+LOG_LEVELS = {
+    "Asset Store": logging.INFO,
+}
+DEFAULT_LOG_LEVEL = logging.DEBUG
+
+# Records are put on LOG_QUEUE by the calling thread and written out by the listener's thread.
+LOG_QUEUE = queue.Queue(-1)
+LOG_QUEUE_HANDLER = logging.handlers.QueueHandler(LOG_QUEUE)
+LOG_LISTENER = None
+
+# Bounds the size of payloads (e.g. project save data) logged with log_payload.
+PAYLOAD_REPR = reprlib.Repr()
+PAYLOAD_REPR.maxlevel = 3
+PAYLOAD_REPR.maxdict = 8
+PAYLOAD_REPR.maxlist = 4
+PAYLOAD_REPR.maxstring = 60
+PAYLOAD_REPR.maxother = 60
+
+
+def get_log_path() -> str:
+    return os.path.join(Path(get_default_project_dir()).parent, "logs")
+
+
+def start_logging() -> None:
+    """
+    Starts the listener writing queued records to the rotating log file and the console, on first use. The log file
+    is opened when the first record is written to it.
+    """
+    global LOG_LISTENER
+    if LOG_LISTENER is not None:
+        return
+    log_path = get_log_path()
     if not os.path.exists(log_path):
         os.makedirs(log_path)
-    date = datetime.now().strftime("%Y-%b-%d")
-    log_name = os.path.join(log_path, f"log_hermes_{date}.log")
     formatter = logging.Formatter(fmt='%(asctime)s %(levelname)-s [%(name)-s] %(message)s',
                                   datefmt='%Y-%m-%d %H:%M:%S')
-    handler = logging.FileHandler(log_name, mode="a")
-    # handler = logging.handlers.TimedRotatingFileHandler(log_name, when="d", interval=1, backupCount=90)
-    handler.setFormatter(formatter)
+    file_handler = logging.handlers.RotatingFileHandler(os.path.join(log_path, "log_hermes.log"),
+                                                        maxBytes=LOG_FILE_BYTES,
+                                                        backupCount=LOG_FILE_BACKUPS,
+                                                        encoding='utf-8',
+                                                        delay=True)
+    file_handler.setFormatter(formatter)
     screen_handler = logging.StreamHandler(stream=sys.stdout)
     screen_handler.setFormatter(formatter)
+    LOG_LISTENER = logging.handlers.QueueListener(LOG_QUEUE, file_handler, screen_handler)
+    LOG_LISTENER.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Writes out any queued records and stops the listener."""
+    global LOG_LISTENER
+    if LOG_LISTENER is not None:
+        LOG_LISTENER.stop()
+        for handler in LOG_LISTENER.handlers:
+            handler.close()
+        LOG_LISTENER = None
+
+
+def set_log_level(name: str, level: Union[int, str]) -> None:
+    """Sets the level of the component's logger, including loggers already set up."""
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    LOG_LEVELS[name] = logger.level
+
+
+def log_payload(value: Any) -> str:
+    """:return: a representation of value for logging, cut short for large structures and strings."""
+    return PAYLOAD_REPR.repr(value)
+
+
+def setup_custom_logger(name):
     logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
-    logger.addHandler(handler)
-    logger.addHandler(screen_handler)
+    if LOG_QUEUE_HANDLER not in logger.handlers:
+        start_logging()
+        logger.setLevel(LOG_LEVELS.get(name, DEFAULT_LOG_LEVEL))
+        logger.addHandler(LOG_QUEUE_HANDLER)
+        # Records reach the log once, through the queue, rather than again through any root handlers.
+        logger.propagate = False
     return logger
@@ -0,0 +1,125 @@
+import json
+import os
+import re
+import textwrap
+from typing import TextIO, Union
+
+
+# Bytes of manifest buffered before being written out.
+MANIFEST_BUFFER = 64 * 1024
+MANIFEST_INDENT = 4
+ENTRIES_KEY = re.compile(r'"words"\s*:\s*\[')
+
+
+class ManifestWriter(object):
+    """
+    Writes an LMF manifest (see create_lmf) one word entry at a time, so memory use does not grow with the size of
+    the export. The header is written on open and the JSON closed off on close.
+
+    The output of the indented mode is identical to json.dump(manifest, indent=4). The compact mode has no
+    indentation and puts each entry on its own line. If the export is interrupted, the entries written so far can be
+    recovered with recover_manifest.
+    """
+    def __init__(self, path: str, header: dict, compact: bool = False, file: TextIO = None) -> None:
+        """
+        :param path: the manifest file to write.
+        :param header: the manifest fields other than 'words' (any 'words' given are ignored).
+        :param compact: leave out indentation.
+        :param file: an open file to write the manifest to in place of path.
+        """
+        self.path = path
+        self.header = {key: value for key, value in header.items() if key != 'words'}
+        self.compact = compact
+        self.target_file = file
+        self.file = None
+        self.entry_count = 0
+
+    def __enter__(self) -> 'ManifestWriter':
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def dumps(self, value: Union[dict, list]) -> str:
+        if self.compact:
+            return json.dumps(value, separators=(',', ':'))
+        return json.dumps(value, indent=MANIFEST_INDENT)
+
+    def open(self) -> None:
+        self.file = self.target_file or open(self.path, 'w', buffering=MANIFEST_BUFFER)
+        self.entry_count = 0
+        # Everything up to the opening bracket of the (empty) list of words.
+        envelope = self.dumps({**self.header, 'words': []})
+        self.file.write(envelope[:envelope.rindex('[]') + 1])
+
+    def write_entry(self, entry: dict) -> None:
+        separator = ',' if self.entry_count else ''
+        entry_text = self.dumps(entry)
+        if not self.compact:
+            # Entries sit two levels deep, in the list of words in the manifest object.
+            entry_text = textwrap.indent(entry_text, ' ' * MANIFEST_INDENT * 2)
+        self.file.write(f'{separator}\n{entry_text}')
+        self.entry_count += 1
+
+    def close(self) -> None:
+        if self.file is None:
+            return
+        if self.entry_count and not self.compact:
+            self.file.write(f'\n{" " * MANIFEST_INDENT}]\n}}')
+        elif self.entry_count:
+            self.file.write('\n]}')
+        else:
+            envelope = self.dumps({**self.header, 'words': []})
+            self.file.write(envelope[envelope.rindex('[]') + 1:])
+        self.file.close()
+        self.file = None
+
+    def abort(self) -> None:
+        """Closes the file as it stands, leaving the entries written so far to recover_manifest."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def manifest_complete(path: str) -> bool:
+    try:
+        with open(path, 'r') as file:
+            json.load(file)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def recover_manifest(path: str, recovered_path: str = None, compact: bool = False) -> int:
+    """
+    Rebuilds a manifest left incomplete by an interrupted export, keeping every whole entry.
+    :param path: the partial manifest.
+    :param recovered_path: where to write the recovered manifest (defaults to replacing path).
+    :return: the number of entries recovered.
+    :raises ValueError: if not even the manifest header can be read.
+    """
+    with open(path, 'r') as file:
+        text = file.read()
+    match = ENTRIES_KEY.search(text)
+    if not match:
+        raise ValueError(f'No manifest header in {path}')
+    header = json.loads(text[:match.start()] + '"words": []}')
+    decoder = json.JSONDecoder()
+    entries = []
+    position = match.end()
+    while True:
+        while position < len(text) and text[position] in ' \t\r\n,':
+            position += 1
+        try:
+            entry, position = decoder.raw_decode(text, position)
+        except ValueError:
+            break
+        entries.append(entry)
+    recovered_path = recovered_path or path
+    temporary_path = f'{recovered_path}.tmp'
+    with ManifestWriter(temporary_path, header, compact=compact) as writer:
+        for entry in entries:
+            writer.write_entry(entry)
+    os.replace(temporary_path, recovered_path)
+    return len(entries)
@@ -1,91 +1,158 @@
 import os
-import shutil
 import csv
 from box import Box
-from datatypes import ConverterData, ConverterComponents
-from widgets.table import TABLE_COLUMNS
-from .files import make_file_if_not_extant
+from typing import List, Union
+from audio.encode import EncodedAudio
+from datatypes import OutputMode, Transcription
+from .exporters import Exporter, register_exporter
+from .logger import setup_custom_logger
+from .manifest import ManifestWriter, manifest_complete, recover_manifest
+from .targets import DirectoryTarget, ExportTarget
 
 
-def get_opie_paths(base_export_location: str) -> Box:
-    return Box({
-        'transcription': make_file_if_not_extant(os.path.join(base_export_location, 'words')),
-        'translation': make_file_if_not_extant(os.path.join(base_export_location, 'translations')),
-        'sound': make_file_if_not_extant(os.path.join(base_export_location, 'sounds')),
-        'image': make_file_if_not_extant(os.path.join(base_export_location, 'pictures')),
+LOG_OUTPUT = setup_custom_logger("Output")
+
+
+def get_opie_paths(target: ExportTarget) -> Box:
+    paths = Box({
+        'transcription': 'words',
+        'translation': 'translations',
+        'sound': 'sounds',
+        'image': 'pictures',
     })
+    for path in paths.values():
+        target.make_dir(path)
+    return paths
+
 
+@register_exporter
+class OpieExporter(Exporter):
+    """
+    The original OPIE structure: numbered .txt transcriptions and translations with sound and picture folders.
+    """
+    mode = OutputMode.OPIE
+    name = "OPIE File Structure"
 
-def create_opie_files(row: int,
-                      data: ConverterData,
-                      components: ConverterComponents,
-                      index: int) -> None:
-    export_paths = get_opie_paths(data.export_location)
-    if data.transcriptions[row].sample:
-        sound_file = data.transcriptions[row].sample.get_sample_file_object()
-        sound_file.export(f'{export_paths.sound}/word{index}.wav', format='wav')
-    image_path = data.transcriptions[row].image
-    if image_path:
-        image_name, image_extension = os.path.splitext(image_path)
-        shutil.copy(image_path, f'{export_paths.image}/pic{index}{image_extension}')
-    with open(f'{export_paths.transcription}/word{index}.txt', 'w') as file:
-        file.write(f'{components.table.get_cell_value(row, TABLE_COLUMNS["Transcription"])}')
-    with open(f'{export_paths.translation}/word{index}.txt', 'w') as file:
-        file.write(f'{components.table.get_cell_value(row, TABLE_COLUMNS["Translation"])}')
-
-
-def create_dict_files(row: int,
-                      data: ConverterData) -> None:
-    transcription = data.transcriptions[row]
-    with open(os.path.join(data.export_location, 'dictionary.csv'), 'a') as file:
-        writer = csv.writer(file)
+    def plan(self, rows: List[int]) -> None:
+        super().plan(rows)
+        self.paths = get_opie_paths(self.target)
+
+    def emit_transcription(self,
+                           row: int,
+                           transcription: Transcription,
+                           sound_file: Union[None, EncodedAudio]) -> None:
+        # Files are numbered by export order rather than by row.
+        index = self.row_count
+        if sound_file is not None:
+            self.target.write_audio(f'{self.paths.sound}/word{index}.{sound_file.extension}', sound_file)
+        if transcription.image:
+            _, image_extension = os.path.splitext(transcription.image)
+            self.target.write_file(transcription.image, f'{self.paths.image}/pic{index}{image_extension}')
+        self.target.write_text(f'{self.paths.transcription}/word{index}.txt', transcription.transcription)
+        self.target.write_text(f'{self.paths.translation}/word{index}.txt', transcription.translation or '')
+
+
+@register_exporter
+class DictExporter(Exporter):
+    """
+    Generic dictionary: dictionary.csv (transcription, translation, audio path, image path) with sound and image
+    folders.
+    """
+    mode = OutputMode.DICT
+    name = "Generic Dictionary (CSV)"
+    file = None  # dictionary.csv, open between plan() and finalise().
+
+    def plan(self, rows: List[int]) -> None:
+        super().plan(rows)
+        self.target.make_dir('sounds')
+        self.target.make_dir('images')
+        self.file = self.target.open('dictionary.csv', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(['Transcription', 'Translation', 'Audio', 'Image'])
+
+    def emit_transcription(self,
+                           row: int,
+                           transcription: Transcription,
+                           sound_file: Union[None, EncodedAudio]) -> None:
         row_data = [
             transcription.transcription,
             transcription.translation
         ]
-        if transcription.sample:
-            sound_export_path = make_file_if_not_extant(os.path.join(data.export_location, 'sounds'))
-            sound_file = data.transcriptions[row].sample.get_sample_file_object()
-            sound_file_path = f'{sound_export_path}/{transcription.transcription}-{row}.wav'
-            sound_file.export(sound_file_path, format='wav')
-            row_data.append(sound_file_path)
+        if sound_file is not None:
+            sound_file_path = f'sounds/{transcription.transcription}-{row}.{sound_file.extension}'
+            row_data.append(self.target.write_audio(sound_file_path, sound_file))
         else:
             row_data.append('')
         if transcription.image:
-            image_export_path = make_file_if_not_extant(os.path.join(data.export_location, 'images'))
             _, image_extension = os.path.splitext(transcription.image)
-            image_file_path = os.path.join(image_export_path,
-                                           f'{transcription.transcription}-{row}{image_extension}')
-            shutil.copy(transcription.image, image_file_path)
-            row_data.append(image_file_path)
+            image_file_path = f'images/{transcription.transcription}-{row}{image_extension}'
+            row_data.append(self.target.write_file(transcription.image, image_file_path))
         else:
             row_data.append('')
-        writer.writerow(row_data)
-
-
-def create_lmf_files(row: int,
-                     data: ConverterData) -> None:
-    lmf = data.lmf
-    transcription = data.transcriptions[row]
-    json_entry = {
-        "id": str(transcription.id),
-        "transcription": transcription.transcription,
-        "translation": [transcription.translation, ],
-    }
-    if transcription.sample:
-        sound_export_path = make_file_if_not_extant(os.path.join(data.export_location, 'sounds'))
-        sound_file = data.transcriptions[row].sample.get_sample_file_object()
-        sound_file_path = f'{sound_export_path}/{transcription.transcription}-{row}.wav'
-        sound_file.export(sound_file_path, format='wav')
-        json_entry['audio'] = [sound_file_path, ]
-    if transcription.image:
-        image_export_path = make_file_if_not_extant(os.path.join(data.export_location, 'images'))
-        _, image_extension = os.path.splitext(transcription.image)
-        image_file_path = os.path.join(image_export_path,
-                                       f'{transcription.transcription}-{row}{image_extension}')
+        self.writer.writerow(row_data)
+
+    def finalise(self) -> None:
+        self.file.close()
+
+    def abort(self) -> None:
+        if self.file is not None:
+            self.file.close()
+
+
+@register_exporter
+class LMFExporter(Exporter):
+    """
+    Language Manifest File: manifest.json (see create_lmf) with sound and image folders, the manifest streamed out
+    as rows are written (see ManifestWriter).
+    """
+    mode = OutputMode.LMF
+    name = "Language Manifest File (JSON)"
+    requires_manifest = True
+    manifest = None  # Open between plan() and finalise().
+
+    def plan(self, rows: List[int]) -> None:
+        super().plan(rows)
+        self.target.make_dir('sounds')
+        self.target.make_dir('images')
+        if isinstance(self.target, DirectoryTarget):
+            self.keep_partial_manifest(self.target.full_path('manifest.json'))
+        self.manifest = ManifestWriter('manifest.json', self.data.lmf, compact=self.settings.compact_manifest,
+                                       file=self.target.open('manifest.json'))
+        self.manifest.open()
+
+    def keep_partial_manifest(self, manifest_file_path: str) -> None:
+        """Before a manifest is overwritten, recovers it to manifest.recovered.json if an export was interrupted."""
+        if not os.path.isfile(manifest_file_path) or manifest_complete(manifest_file_path):
+            return
+        recovered_path = os.path.join(os.path.dirname(manifest_file_path), 'manifest.recovered.json')
         try:
-            shutil.copy(transcription.image, image_file_path)
-        except shutil.SameFileError:
-            pass
-        json_entry['image'] = [image_file_path, ]
-    lmf['words'].append(json_entry)
+            entry_count = recover_manifest(manifest_file_path, recovered_path, self.settings.compact_manifest)
+            LOG_OUTPUT.warning(f"Recovered {entry_count} entries of an interrupted export to {recovered_path}")
+        except ValueError as error:
+            LOG_OUTPUT.error(f"Could not recover interrupted manifest {manifest_file_path}: {error}")
+
+    def emit_transcription(self,
+                           row: int,
+                           transcription: Transcription,
+                           sound_file: Union[None, EncodedAudio]) -> None:
+        json_entry = {
+            "id": str(transcription.id),
+            "transcription": transcription.transcription,
+            "translation": [transcription.translation, ],
+        }
+        if sound_file is not None:
+            sound_file_path = f'sounds/{transcription.transcription}-{row}.{sound_file.extension}'
+            json_entry['audio'] = [self.target.write_audio(sound_file_path, sound_file), ]
+        if transcription.image:
+            _, image_extension = os.path.splitext(transcription.image)
+            image_file_path = f'images/{transcription.transcription}-{row}{image_extension}'
+            json_entry['image'] = [self.target.write_file(transcription.image, image_file_path), ]
+        self.manifest.write_entry(json_entry)
+
+    def finalise(self) -> None:
+        self.manifest.close()
+
+    def abort(self) -> None:
+        # Leave the manifest unterminated, so the next export recovers it (see recover_manifest).
+        if self.manifest is not None:
+            self.manifest.abort()
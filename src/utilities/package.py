@@ -0,0 +1,147 @@
+import json
+import os
+import sqlite3
+from typing import List, Union
+from audio.encode import EncodedAudio
+from datatypes import OutputMode, Transcription
+from .dataset import get_source_media, transcription_record
+from .exporters import Exporter, register_exporter
+
+
+PACKAGE_FILE = 'dictionary.sqlite'
+# Rows inserted per statement batch.
+PACKAGE_BATCH_ROWS = 1000
+
+PACKAGE_SCHEMA = '''
+CREATE TABLE metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE words (
+    id INTEGER PRIMARY KEY,
+    uuid TEXT NOT NULL UNIQUE,
+    transcription TEXT NOT NULL,
+    translation TEXT,
+    start REAL,
+    end REAL,
+    source_media TEXT,
+    audio BLOB,
+    audio_format TEXT,
+    image BLOB,
+    image_format TEXT
+);
+CREATE VIRTUAL TABLE words_fts USING fts5(
+    transcription,
+    translation,
+    content='words',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+'''
+
+INSERT_WORD = '''
+INSERT INTO words (id, uuid, transcription, translation, start, end, source_media, audio, audio_format, image,
+                   image_format)
+VALUES (:row, :id, :transcription, :translation, :start, :end, :source_media, :audio, :audio_format, :image,
+        :image_format)
+'''
+
+
+def fts5_available() -> bool:
+    connection = sqlite3.connect(':memory:')
+    try:
+        connection.execute('CREATE VIRTUAL TABLE test USING fts5(text)')
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        connection.close()
+
+
+def search_package(connection: sqlite3.Connection, query: str, limit: int = 50) -> List[sqlite3.Row]:
+    """
+    :param query: an FTS5 query, matched against transcriptions and translations.
+    :return: the matching words (without their audio and images), best matches first.
+    """
+    return connection.execute('''
+        SELECT words.id, words.transcription, words.translation
+        FROM words_fts JOIN words ON words.id = words_fts.rowid
+        WHERE words_fts MATCH ? ORDER BY rank LIMIT ?
+    ''', (query, limit)).fetchall()
+
+
+@register_exporter
+class SQLitePackageExporter(Exporter):
+    """
+    A single file dictionary package, dictionary.sqlite: the words with their audio and images as BLOBs, the
+    manifest fields (see create_lmf) in metadata, and an FTS5 index (words_fts) over transcription and translation.
+
+    The database is built in a temporary file with journaling off, inserting in batches within one transaction, and
+    the full text index is built in one pass at the end. It only replaces dictionary.sqlite (or is added to the
+    archive) once complete.
+    """
+    mode = OutputMode.SQLITE
+    name = "Dictionary Package (SQLite)"
+    requirement = 'SQLite with FTS5 support'
+    # The package being built, None until plan() creates it.
+    temporary_path = None
+    connection = None
+
+    @classmethod
+    def available(cls) -> bool:
+        return fts5_available()
+
+    def plan(self, rows: List[int]) -> None:
+        super().plan(rows)
+        self.temporary_path = self.target.temporary_path(PACKAGE_FILE)
+        self.source_media = get_source_media(self.data)
+        self.connection = sqlite3.connect(self.temporary_path)
+        # Nothing needs to survive a crash part way, the temporary file is simply rebuilt.
+        self.connection.execute('PRAGMA journal_mode = OFF')
+        self.connection.execute('PRAGMA synchronous = OFF')
+        self.connection.executescript(PACKAGE_SCHEMA)
+        self.connection.execute('BEGIN')
+        self.connection.executemany('INSERT INTO metadata (key, value) VALUES (?, ?)',
+                                    [(key, json.dumps(value)) for key, value in self.data.lmf.items()
+                                     if key != 'words'])
+        self.pending = []
+
+    def emit_transcription(self,
+                           row: int,
+                           transcription: Transcription,
+                           sound_file: Union[None, EncodedAudio]) -> None:
+        values = {
+            **transcription_record(row, transcription, self.source_media),
+            'audio': sound_file.data if sound_file is not None else None,
+            'audio_format': sound_file.extension if sound_file is not None else None,
+            'image': None,
+            'image_format': None,
+        }
+        if transcription.image:
+            with open(transcription.image, 'rb') as file:
+                values['image'] = file.read()
+            values['image_format'] = os.path.splitext(transcription.image)[1].lstrip('.').lower()
+        self.pending.append(values)
+        if len(self.pending) >= PACKAGE_BATCH_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        self.connection.executemany(INSERT_WORD, self.pending)
+        self.pending = []
+
+    def finalise(self) -> None:
+        self.flush()
+        self.connection.execute('INSERT INTO words_fts (rowid, transcription, translation) '
+                                'SELECT id, transcription, translation FROM words')
+        self.connection.execute("INSERT INTO words_fts (words_fts) VALUES ('optimize')")
+        self.connection.commit()
+        # Leave a normal rollback journal for the app that opens the package.
+        self.connection.execute('PRAGMA journal_mode = DELETE')
+        self.connection.close()
+        self.target.move_file(self.temporary_path, PACKAGE_FILE)
+
+    def abort(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+        if self.temporary_path is not None and os.path.exists(self.temporary_path):
+            os.remove(self.temporary_path)
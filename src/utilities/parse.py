@@ -1,10 +1,12 @@
 import os
-from typing import List, Union
-from pydub import AudioSegment
-from urllib.request import url2pathname
+from typing import Iterator, List, Union
+from PyQt5.QtCore import QThread, pyqtSignal
 from PyQt5.QtWidgets import QMessageBox
 from utilities import open_audio_dialogue
-from datatypes import Translation, Transcription, ConverterComponents, ConverterData
+from utilities.progress import ProgressThrottle
+from audio import load_audio
+from datatypes import AudioClip, Translation, Transcription, ConverterData
+from perf import perf_count, perf_span, perf_timer
 from widgets.warning import WarningMessage
 
 
@@ -17,75 +19,119 @@ def match_translations(transcription: Transcription,
 
 
 def extract_translations(translation_tier: str,
-                         components: ConverterComponents,
                          data: ConverterData) -> List[Translation]:
     elan_translations = data.eaf_object.get_annotation_data_for_tier(translation_tier)
-    components.progress_bar.show()
-    components.status_bar.showMessage('Processing translations...')
     translations = []
-    translation_count = len(elan_translations)
-    completed_count = 0
-    for index in range(translation_count):
-        components.progress_bar.update_progress(completed_count / translation_count)
+    for index in range(len(elan_translations)):
         translation = Translation(index=index,
                                   start=int(elan_translations[index][0]),
                                   end=int(elan_translations[index][1]),
                                   translation=elan_translations[index][2])
         translations.append(translation)
-        completed_count += 1
-    components.progress_bar.hide()
     return translations
 
 
-def extract_transcriptions(transcription_tier: str,
-                           components: ConverterComponents,
-                           data: ConverterData,
-                           audio_file) -> List[Transcription]:
-    completed_count = 0
+def iter_transcriptions(transcription_tier: str,
+                        data: ConverterData,
+                        audio_file) -> Iterator[Transcription]:
     elan_transcriptions = data.eaf_object.get_annotation_data_for_tier(transcription_tier)
-    components.status_bar.showMessage('Processing transcriptions...')
-    transcription_count = len(elan_transcriptions)
-    transcriptions = []
-    for index in range(transcription_count):
-        components.progress_bar.update_progress(completed_count / transcription_count)
+    for index in range(len(elan_transcriptions)):
         transcription = Transcription(index=index,
                                       transcription=elan_transcriptions[index][2],
                                       start=int(elan_transcriptions[index][0]),
                                       end=int(elan_transcriptions[index][1]),
                                       media=audio_file)
-        transcription.translation = match_translations(transcription, data.translations)
-        transcriptions.append(transcription)
-        completed_count += 1
-    components.progress_bar.hide()
-    return transcriptions
+        with perf_timer('Translation matching'):
+            transcription.translation = match_translations(transcription, data.translations)
+        yield transcription
+
+
+def extract_transcriptions(transcription_tier: str,
+                           data: ConverterData,
+                           audio_file) -> List[Transcription]:
+    return list(iter_transcriptions(transcription_tier, data, audio_file))
 
 
 def extract_elan_data(transcription_tier: str,
                       translation_tier: str,
-                      data: ConverterData,
-                      components: ConverterComponents) -> None:
+                      data: ConverterData) -> None:
     if translation_tier != 'None':
-        data.translations = extract_translations(translation_tier, components, data)
+        data.translations = extract_translations(translation_tier, data)
     else:
         data.translations = []
     audio_file = get_audio_file(data)
-    data.transcriptions = extract_transcriptions(transcription_tier, components, data, audio_file)
+    data.transcriptions = extract_transcriptions(transcription_tier, data, audio_file)
+
+
+class ELANImportWorker(QThread):
+    """
+    Runs the ELAN import off the GUI thread.
+
+    Transcriptions are streamed back in batches through rows_ready, and progress is reported through progress, both
+    at most MAX_PROGRESS_RATE times a second. The import stops early if requestInterruption() is called, keeping the
+    rows emitted so far. The media file must already be loaded (see get_audio_file) as locating it may need a dialog.
+    """
+
+    progress = pyqtSignal(float)
+    rows_ready = pyqtSignal(list)
+    message = pyqtSignal(str)
+
+    def __init__(self,
+                 transcription_tier: str,
+                 translation_tier: str,
+                 data: ConverterData) -> None:
+        QThread.__init__(self)
+        self.transcription_tier = transcription_tier
+        self.translation_tier = translation_tier
+        self.data = data
+        self.imported_count = 0
+
+    def run(self) -> None:
+        with perf_span('ELAN import'):
+            self.import_transcriptions()
+        perf_count('Rows imported', self.imported_count)
+
+    def import_transcriptions(self) -> None:
+        if self.translation_tier != 'None':
+            self.message.emit('Processing translations...')
+            self.data.translations = extract_translations(self.translation_tier, self.data)
+        else:
+            self.data.translations = []
+        self.message.emit('Processing transcriptions...')
+        transcription_count = len(self.data.eaf_object.get_annotation_data_for_tier(self.transcription_tier))
+        throttle = ProgressThrottle()
+        batch = []
+        for transcription in iter_transcriptions(self.transcription_tier, self.data, self.data.audio_file):
+            if self.isInterruptionRequested():
+                break
+            batch.append(transcription)
+            if throttle.ready():
+                self.emit_batch(batch, transcription_count)
+                batch = []
+        self.emit_batch(batch, transcription_count)
+
+    def emit_batch(self, batch: List[Transcription], transcription_count: int) -> None:
+        if batch:
+            self.imported_count += len(batch)
+            self.rows_ready.emit(batch)
+        self.progress.emit(self.imported_count / max(transcription_count, 1))
 
 
-def get_audio_file(data: ConverterData) -> AudioSegment:
+def get_audio_file(data: ConverterData) -> AudioClip:
     if data.audio_file:
         return data.audio_file
+    from urllib.request import url2pathname
     linked_files = data.eaf_object.get_linked_files()
     absolute_path_media_file = url2pathname(linked_files[0]['MEDIA_URL'])
     relative_path_media_file = os.path.join('/'.join(data.elan_file.split('/')[:-1]),
                                             linked_files[0]['RELATIVE_MEDIA_URL'])
 
-    # TODO: Change all of this to AudioSegment.from_file(path, format)
+    # WAV files are memory-mapped by the NumPy backend, other formats fall back to pydub.
 
     if os.path.isfile(absolute_path_media_file):
-        audio_data = AudioSegment.from_wav(absolute_path_media_file)
+        audio_data = load_audio(absolute_path_media_file, mmap=True)
     elif os.path.isfile(relative_path_media_file):
-        audio_data = AudioSegment.from_wav(relative_path_media_file)
+        audio_data = load_audio(relative_path_media_file, mmap=True)
     else:
         warning_message = WarningMessage()
         choice = warning_message.warning(warning_message, 'Warning',
@@ -96,7 +142,7 @@ def get_audio_file(data: ConverterData) -> AudioSegment:
         if choice == QMessageBox.Yes:
             found_path_audio_file = open_audio_dialogue()
         if found_path_audio_file:
-            audio_data = AudioSegment.from_wav(found_path_audio_file)
+            audio_data = load_audio(found_path_audio_file, mmap=True)
         else:
             audio_data = None
     return audio_data
@@ -0,0 +1,59 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Tuple, Union
+from audio.encode import AudioProfile, EncodedAudio, encode_clip
+from audio.processing import ProcessingOptions, process_clip
+from datatypes import Transcription
+from perf import perf_timer
+
+
+# Clips encoded ahead of the writer per worker, bounds memory use on large exports.
+PENDING_PER_WORKER = 4
+
+
+def prepare_export_audio(transcription: Transcription,
+                         profile: AudioProfile,
+                         processing: ProcessingOptions = None) -> Union[None, EncodedAudio]:
+    """
+    Cuts, optionally post-processes, and encodes the audio for a transcription ready to be written out.
+    :return: the encoded audio, or None if the transcription has no audio.
+    """
+    if not transcription.sample:
+        return None
+    clip = transcription.sample.get_clip()
+    if clip is None:
+        return None
+    if processing and processing.enabled:
+        with perf_timer('Audio processing'):
+            clip = process_clip(clip, processing)
+    with perf_timer('Audio encode'):
+        return encode_clip(clip, profile)
+
+
+def iter_export_audio(transcriptions: List[Transcription],
+                      rows: List[int],
+                      profile: AudioProfile,
+                      processing: ProcessingOptions = None,
+                      workers: int = None) -> Iterator[Tuple[int, Union[None, EncodedAudio]]]:
+    """
+    Prepares the audio for the given rows on a pool of worker threads (NumPy and ffmpeg do the heavy lifting outside
+    the GIL), yielding it in row order as it completes.
+    :param transcriptions: the transcriptions, indexed by row.
+    :param rows: the rows being exported.
+    :param profile: the format to encode the audio in.
+    :param processing: optional post-processing applied to each clip.
+    :param workers: number of worker threads (defaults to the CPU count).
+    :return: an iterator of (row, encoded audio or None) pairs.
+    """
+    workers = workers or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for row in rows:
+            pending.append((row, executor.submit(prepare_export_audio, transcriptions[row], profile, processing)))
+            if len(pending) >= workers * PENDING_PER_WORKER:
+                next_row, future = pending.popleft()
+                yield next_row, future.result()
+        while pending:
+            next_row, future = pending.popleft()
+            yield next_row, future.result()
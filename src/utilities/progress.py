@@ -0,0 +1,24 @@
+import time
+
+
+MAX_PROGRESS_RATE = 30  # Updates per second
+
+
+class ProgressThrottle(object):
+    """
+    Rate limiter for progress reporting from long running loops, so that reporting costs scale with time taken
+    rather than with the number of items processed.
+    """
+    def __init__(self, max_rate: float = MAX_PROGRESS_RATE) -> None:
+        self.interval = 1 / max_rate
+        self.last_report = 0.0
+
+    def ready(self) -> bool:
+        """
+        :return: True (and resets the timer) if at least one interval has passed since the last report.
+        """
+        now = time.monotonic()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            return True
+        return False
@@ -0,0 +1,82 @@
+import csv
+import os
+from typing import Dict, List
+from PyQt5.QtCore import QThread, pyqtSignal
+from audio.qc import ClipReport, load_qc_cache, run_qc, save_qc_cache
+from datatypes import Transcription
+from utilities.files import get_cache_path
+from utilities.logger import setup_custom_logger
+from utilities.progress import ProgressThrottle
+
+
+LOG_QC = setup_custom_logger("Audio QC")
+
+QC_REPORT_COLUMNS = ['Row', 'Transcription', 'Duration (s)', 'Peak (dBFS)', 'RMS (dBFS)', 'Clipping (%)',
+                     'DC Offset (%)', 'SNR (dB)', 'Leading Silence (ms)', 'Trailing Silence (ms)', 'Issues']
+
+
+def get_qc_cache_path() -> str:
+    return os.path.join(get_cache_path('qc'), 'qc.json')
+
+
+def qc_report_values(row: int, transcription: Transcription, report: ClipReport) -> List:
+    """:return: the values of a row of the QC report, in the order of QC_REPORT_COLUMNS."""
+    return [row,
+            transcription.transcription,
+            round(report.duration, 3),
+            round(report.peak, 1),
+            round(report.rms, 1),
+            round(report.clipping * 100, 3),
+            round(report.dc_offset * 100, 2),
+            round(report.snr, 1),
+            round(report.leading_silence),
+            round(report.trailing_silence),
+            ', '.join(report.issues)]
+
+
+def write_qc_report(path: str, transcriptions: List[Transcription], reports: Dict[int, ClipReport]) -> None:
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(QC_REPORT_COLUMNS)
+        for row in sorted(reports):
+            writer.writerow(qc_report_values(row, transcriptions[row], reports[row]))
+
+
+class AudioQCWorker(QThread):
+    """
+    Runs the audio QC pass (see audio.qc.run_qc) over every transcription with a sample, off the GUI thread.
+    Reports are cached by clip contents, so only new or changed audio is analysed on later runs.
+    """
+
+    progress = pyqtSignal(float)
+    message = pyqtSignal(str)
+    reports_ready = pyqtSignal(dict)
+
+    def __init__(self, transcriptions: List[Transcription]) -> None:
+        QThread.__init__(self)
+        self.transcriptions = transcriptions
+        self.throttle = ProgressThrottle()
+
+    def run(self) -> None:
+        self.message.emit('Checking audio...')
+        cache_path = get_qc_cache_path()
+        cache = load_qc_cache(cache_path)
+        clips = []
+        for row, transcription in enumerate(self.transcriptions):
+            clip = transcription.sample.get_clip() if transcription.sample else None
+            if clip is not None:
+                clips.append((row, clip))
+        reports = run_qc(clips, cache, progress=self.report_progress, cancelled=self.isInterruptionRequested)
+        try:
+            save_qc_cache(cache_path, cache)
+        except OSError as error:
+            LOG_QC.error(f"Could not save QC cache: {error}")
+        issue_count = sum(1 for report in reports.values() if report.issues)
+        LOG_QC.info(f"Checked {len(reports)} clips, {issue_count} with issues.")
+        self.message.emit(f'Checked {len(reports)} clips, {issue_count} with issues.')
+        self.progress.emit(1)
+        self.reports_ready.emit(reports)
+
+    def report_progress(self, value: float) -> None:
+        if self.throttle.ready():
+            self.progress.emit(value)
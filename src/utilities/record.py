@@ -1,13 +1,26 @@
 import os
+import numpy as np
 from typing import Union
-from PyQt5.QtCore import QUrl
-from PyQt5.QtMultimedia import QMultimedia, QAudioEncoderSettings, QVideoEncoderSettings, QAudioRecorder
+from PyQt5.QtCore import QObject, QUrl, pyqtSignal
+from PyQt5.QtMultimedia import QMultimedia, QAudioEncoderSettings, QVideoEncoderSettings, QAudioRecorder, \
+    QAudio, QAudioBuffer, QAudioDeviceInfo, QAudioFormat, QAudioInput
+from audio.pcm import SAMPLE_TYPES, PCMClip
+from audio.processing import SILENCE_FLOOR, peak_level
+from audio.ring import RingBuffer
+from audio.segment import SegmentationOptions, StreamingSegmenter
 from datatypes import AppSettings, Transcription, ConverterData
 from utilities.logger import setup_custom_logger
 
 
 LOG_RECORDER = setup_custom_logger("Audio Recorder")
 
+# Continuous recording format and buffering.
+RECORD_FRAME_RATE = 44100
+RECORD_SAMPLE_WIDTH = 2
+RING_SECONDS = 60
+# Audio kept from before the detected start of speech so soft onsets are not clipped.
+PRE_ROLL = 200
+
 
 class SimpleAudioRecorder(QAudioRecorder):
     def __init__(self,
@@ -39,3 +52,132 @@ class SimpleAudioRecorder(QAudioRecorder):
         LOG_RECORDER.info(f"Audio file: {self.file_path}")
         self.stop()
         return self.file_path
+
+
+def audio_buffer_level(buffer: QAudioBuffer) -> float:
+    """:return: the peak level in dBFS of a buffer from a QAudioProbe."""
+    audio_format = buffer.format()
+    data = buffer.constData().asstring(buffer.byteCount())
+    width = audio_format.sampleSize() // 8
+    if audio_format.sampleType() == QAudioFormat.Float and width == 4:
+        samples = np.frombuffer(data, dtype=np.float32)
+    elif audio_format.sampleType() == QAudioFormat.SignedInt and width in (2, 4) \
+            or audio_format.sampleType() == QAudioFormat.UnSignedInt and width == 1:
+        samples = PCMClip(np.frombuffer(data, dtype=SAMPLE_TYPES[width]), audio_format.sampleRate(), width).to_float()
+    else:
+        return SILENCE_FLOOR
+    return peak_level(samples)
+
+
+def get_audio_input_device(name: str) -> QAudioDeviceInfo:
+    """:return: the input device with the given name (see AppSettings.microphone), or the system default."""
+    for device in QAudioDeviceInfo.availableDevices(QAudio.AudioInput):
+        if device.deviceName() == name:
+            return device
+    return QAudioDeviceInfo.defaultInputDevice()
+
+
+class ContinuousRecorder(QObject):
+    """
+    Keeps the input device open for a whole recording session, capturing into a ring buffer. Clips are cut from the
+    buffer when speech is followed by silence (if split_on_silence is set) or when split() is called, with a little
+    pre-roll, and handed over through the clip_ready signal.
+    """
+
+    clip_ready = pyqtSignal(object)
+    level = pyqtSignal(float)
+
+    def __init__(self,
+                 app_settings: AppSettings,
+                 split_on_silence: bool = True,
+                 options: SegmentationOptions = None) -> None:
+        super().__init__()
+        self.split_on_silence = split_on_silence
+        self.options = options or SegmentationOptions()
+        self.format = QAudioFormat()
+        self.format.setSampleRate(RECORD_FRAME_RATE)
+        self.format.setChannelCount(1)
+        self.format.setSampleSize(RECORD_SAMPLE_WIDTH * 8)
+        self.format.setSampleType(QAudioFormat.SignedInt)
+        self.format.setByteOrder(QAudioFormat.LittleEndian)
+        self.format.setCodec('audio/pcm')
+        device = get_audio_input_device(app_settings.microphone)
+        if not device.isFormatSupported(self.format):
+            LOG_RECORDER.warning(f"Device {device.deviceName()} may not support 16 bit mono {RECORD_FRAME_RATE} Hz.")
+        self.input = QAudioInput(device, self.format, self)
+        self.ring = RingBuffer(RECORD_FRAME_RATE * RING_SECONDS)
+        self.segmenter = StreamingSegmenter(RECORD_FRAME_RATE, self.options)
+        self.pre_roll_frames = RECORD_FRAME_RATE * PRE_ROLL // 1000
+        self.post_roll_frames = RECORD_FRAME_RATE * self.options.padding // 1000
+        # Absolute frame position of the start of the current take, nothing before it belongs to the next clip.
+        self.take_start = 0
+        # Absolute frame position of the first frame given to the segmenter (its frame 0).
+        self.segmenter_origin = 0
+        self.source = None
+
+    @property
+    def recording(self) -> bool:
+        return self.source is not None and self.input.state() in (QAudio.ActiveState, QAudio.IdleState)
+
+    def start(self) -> None:
+        LOG_RECORDER.info("Continuous recording started.")
+        self.source = self.input.start()
+        self.source.readyRead.connect(self.on_ready_read)
+        self.restart_take()
+
+    def pause(self) -> None:
+        if self.source:
+            self.on_ready_read()
+            self.input.suspend()
+
+    def resume(self) -> None:
+        if self.source:
+            self.input.resume()
+            self.restart_take()
+
+    def stop(self) -> None:
+        if self.source:
+            LOG_RECORDER.info("Continuous recording finished.")
+            self.source.readyRead.disconnect(self.on_ready_read)
+            self.input.stop()
+            self.source = None
+
+    def restart_take(self) -> None:
+        """Discards anything captured but not yet cut, e.g. talking while paused or between rows."""
+        noise_floor = self.segmenter.noise_floor
+        self.take_start = self.ring.written
+        self.segmenter = StreamingSegmenter(RECORD_FRAME_RATE, self.options)
+        self.segmenter.noise_floor = noise_floor
+        self.segmenter_origin = self.ring.written
+
+    def split(self) -> None:
+        """Cuts the current take now (the manual alternative to waiting for silence)."""
+        start = self.take_start
+        if self.split_on_silence and self.segmenter.in_speech:
+            start = max(self.segmenter_origin + self.segmenter.speech_start - self.pre_roll_frames, start)
+        self.emit_clip(start, self.ring.written)
+        self.segmenter.reset()
+
+    def on_ready_read(self) -> None:
+        data = bytes(self.source.readAll())
+        data = data[:len(data) - len(data) % RECORD_SAMPLE_WIDTH]
+        if not data:
+            return
+        frames = np.frombuffer(data, dtype=np.int16)
+        self.ring.write(frames)
+        samples = frames.astype(np.float32) / 32768
+        self.level.emit(peak_level(samples))
+        if not self.split_on_silence:
+            return
+        origin = self.segmenter_origin
+        for start, end in self.segmenter.feed(samples):
+            start = max(origin + start - self.pre_roll_frames, self.take_start)
+            self.emit_clip(start, origin + end + self.post_roll_frames)
+
+    def emit_clip(self, start: int, end: int) -> None:
+        end = min(end, self.ring.written)
+        samples = self.ring.read(start, end)
+        self.take_start = max(end, self.take_start)
+        if samples.shape[0] == 0:
+            return
+        self.clip_ready.emit(PCMClip(samples, RECORD_FRAME_RATE, RECORD_SAMPLE_WIDTH))
@@ -0,0 +1,235 @@
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Callable, Dict, List, Union
+from PyQt5.QtCore import QThread, pyqtSignal
+from utilities.files import get_cache_path
+from utilities.logger import setup_custom_logger
+from utilities.package import fts5_available
+
+
+LOG_SEARCH = setup_custom_logger("Search Index")
+
+# Bump when SEARCH_SCHEMA changes, existing indexes are then rebuilt from the save files.
+SEARCH_INDEX_VERSION = 1
+# Hits returned by a search.
+SEARCH_LIMIT = 200
+
+SEARCH_SCHEMA = '''
+CREATE TABLE saves (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    project TEXT NOT NULL,
+    modified INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE words (
+    id INTEGER PRIMARY KEY,
+    save_id INTEGER NOT NULL,
+    uuid TEXT,
+    transcription TEXT,
+    translation TEXT
+);
+CREATE INDEX words_save ON words (save_id);
+CREATE VIRTUAL TABLE words_fts USING fts5(
+    transcription,
+    translation,
+    content='words',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+'''
+
+DROP_SCHEMA = '''
+DROP TABLE IF EXISTS words_fts;
+DROP TABLE IF EXISTS words;
+DROP TABLE IF EXISTS saves;
+'''
+
+
+def get_search_index_path(root_dir: str) -> str:
+    """:return: the index of the projects under root_dir, one per root so changing root doesn't mix projects."""
+    root_hash = hashlib.sha1(os.path.abspath(root_dir).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(get_cache_path('search'), f'projects_{root_hash}.sqlite')
+
+
+def search_query(text: str) -> Union[None, str]:
+    """
+    :param text: words as typed, e.g. into a search field.
+    :return: an FTS5 query matching entries containing words starting with each of them, or None if there are none.
+    """
+    terms = text.split()
+    if not terms:
+        return None
+    # Quoting each word keeps FTS5 syntax (e.g. -, *, AND) typed by the user from being read as operators.
+    return ' '.join('"' + term.replace('"', '""') + '"*' for term in terms)
+
+
+class ProjectSearchIndex(object):
+    """
+    A full text index of the transcriptions and translations in the save file of every project under the project
+    root (<root>/<project>/saves/<project>.hermes), so words can be found across projects without opening each.
+
+    The index is a cache in SQLite with FTS5 (as used by dictionary packages, see utilities.package), built from
+    the save files. Each save's modified time and size are kept, so refresh() only re-reads the saves that have
+    changed since it last ran, and save_project() updates the index with the save it has just written.
+
+    A connection is opened per index object, create one per thread that uses it.
+    """
+    def __init__(self, root_dir: str, path: str = None) -> None:
+        """
+        :param root_dir: the project root, see AppSettings.project_root_dir.
+        :param path: where to keep the index, by default in the cache (see get_search_index_path).
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.path = path or get_search_index_path(self.root_dir)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.row_factory = sqlite3.Row
+        # Searches can read while a save or refresh on another connection writes.
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        if self.connection.execute('PRAGMA user_version').fetchone()[0] != SEARCH_INDEX_VERSION:
+            LOG_SEARCH.info(f"Creating search index at {self.path}")
+            with self.connection:
+                self.connection.executescript(DROP_SCHEMA + SEARCH_SCHEMA +
+                                              f'PRAGMA user_version = {SEARCH_INDEX_VERSION};')
+
+    @classmethod
+    def available(cls) -> bool:
+        return fts5_available()
+
+    def __enter__(self) -> 'ProjectSearchIndex':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def find_saves(self) -> Dict[str, str]:
+        """:return: the path of each project's save file under the root, by project name."""
+        saves = dict()
+        try:
+            entries = list(os.scandir(self.root_dir))
+        except OSError as error:
+            LOG_SEARCH.warning(f"Unable to list projects in {self.root_dir}: {error}")
+            return saves
+        for entry in entries:
+            save_path = os.path.join(entry.path, 'saves', f'{entry.name}.hermes')
+            if entry.is_dir() and os.path.isfile(save_path):
+                saves[entry.name] = save_path
+        return saves
+
+    def refresh(self, cancelled: Callable[[], bool] = None) -> int:
+        """
+        Brings the index up to date with the save files under the root, re-reading only those added or changed
+        since it was last updated and dropping those removed.
+        :param cancelled: called between saves, stops the refresh when it returns True.
+        :return: the number of saves (re)indexed.
+        """
+        saves = set(self.find_saves().values())
+        indexed = {row['path']: (row['modified'], row['size'])
+                   for row in self.connection.execute('SELECT path, modified, size FROM saves')}
+        for path in indexed.keys() - saves:
+            self.remove_save(path)
+        updated = 0
+        for path in sorted(saves):
+            if cancelled and cancelled():
+                break
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if indexed.get(path) != (stat.st_mtime_ns, stat.st_size):
+                if self.update_save(path):
+                    updated += 1
+        LOG_SEARCH.info(f"Search index refreshed, {updated} of {len(saves)} project saves updated.")
+        return updated
+
+    def update_save(self, path: str, save_data: dict = None) -> bool:
+        """
+        Replaces the words indexed for a project's save file.
+        :param path: the save file.
+        :param save_data: its contents if already in memory (e.g. just saved), otherwise the file is read.
+        :return: True if the save was indexed, False if it could not be read.
+        """
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+            if save_data is None:
+                with open(path, 'r', encoding='utf-8') as file:
+                    save_data = json.load(file)
+            words = [(word.get('id'),
+                      word.get('transcription') or '',
+                      ' '.join(translation for translation in word.get('translation') or [] if translation))
+                     for word in save_data['words']]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as error:
+            LOG_SEARCH.warning(f"Unable to index {path}: {error}")
+            return False
+        project = os.path.basename(os.path.dirname(os.path.dirname(path)))
+        with self.connection:
+            self.delete_words(path)
+            save_id = self.connection.execute(
+                'INSERT OR REPLACE INTO saves (path, project, modified, size) VALUES (?, ?, ?, ?)',
+                (path, project, stat.st_mtime_ns, stat.st_size)).lastrowid
+            self.connection.executemany('INSERT INTO words (save_id, uuid, transcription, translation) '
+                                        'VALUES (?, ?, ?, ?)', [(save_id, *word) for word in words])
+            # Indexing a save's words in one statement is several times faster than a trigger per word.
+            self.connection.execute('INSERT INTO words_fts (rowid, transcription, translation) '
+                                    'SELECT id, transcription, translation FROM words WHERE save_id = ?', (save_id,))
+        LOG_SEARCH.debug(f"Indexed {len(words)} words from {path}")
+        return True
+
+    def remove_save(self, path: str) -> None:
+        with self.connection:
+            self.delete_words(path)
+            self.connection.execute('DELETE FROM saves WHERE path = ?', (path,))
+
+    def delete_words(self, path: str) -> None:
+        save_ids = '(SELECT id FROM saves WHERE path = ?)'
+        # The full text index holds no copy of the words (content='words'), it is told what to remove.
+        self.connection.execute(f"INSERT INTO words_fts (words_fts, rowid, transcription, translation) "
+                                f"SELECT 'delete', id, transcription, translation FROM words "
+                                f"WHERE save_id IN {save_ids}", (path,))
+        self.connection.execute(f'DELETE FROM words WHERE save_id IN {save_ids}', (path,))
+
+    def search(self, text: str, limit: int = SEARCH_LIMIT) -> List[sqlite3.Row]:
+        """
+        :param text: words to find (see search_query), matched against transcriptions and translations.
+        :return: the matching words with their project and save file, best matches first.
+        """
+        query = search_query(text)
+        if query is None:
+            return []
+        return self.connection.execute('''
+            SELECT saves.project, saves.path, words.uuid, words.transcription, words.translation
+            FROM words_fts
+            JOIN words ON words.id = words_fts.rowid
+            JOIN saves ON saves.id = words.save_id
+            WHERE words_fts MATCH ? ORDER BY rank LIMIT ?
+        ''', (query, limit)).fetchall()
+
+    def word_count(self) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM words').fetchone()[0]
+
+
+class SearchIndexWorker(QThread):
+    """Refreshes the search index of the projects under a root (see ProjectSearchIndex.refresh) off the GUI thread."""
+
+    message = pyqtSignal(str)
+
+    def __init__(self, root_dir: str) -> None:
+        QThread.__init__(self)
+        self.root_dir = root_dir
+
+    def run(self) -> None:
+        try:
+            with ProjectSearchIndex(self.root_dir) as index:
+                updated = index.refresh(cancelled=self.isInterruptionRequested)
+                self.message.emit(f'{index.word_count()} words indexed across {len(index.find_saves())} projects'
+                                  + (f', {updated} updated' if updated else ''))
+        except sqlite3.Error as error:
+            LOG_SEARCH.error(f"Unable to refresh search index: {error}")
+            self.message.emit('Unable to update the search index, see the log for details')
@@ -0,0 +1,47 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+from audio.segment import SegmentationOptions, detect_segments
+from datatypes import AudioClip, Transcription
+from utilities.progress import ProgressThrottle
+
+
+class AutoSegmentWorker(QThread):
+    """
+    Finds the spoken segments of a long recording off the GUI thread, proposing a blank transcription with a sample
+    for each (users then only need to type the text). Has the same signals as ELANImportWorker.
+    """
+
+    progress = pyqtSignal(float)
+    rows_ready = pyqtSignal(list)
+    message = pyqtSignal(str)
+
+    def __init__(self,
+                 media: AudioClip,
+                 first_index: int,
+                 options: SegmentationOptions = None) -> None:
+        QThread.__init__(self)
+        self.media = media
+        self.first_index = first_index
+        self.options = options or SegmentationOptions()
+        self.throttle = ProgressThrottle()
+        self.imported_count = 0
+
+    def run(self) -> None:
+        self.message.emit('Finding words in recording...')
+        spans = detect_segments(self.media,
+                                self.options,
+                                progress=self.report_progress,
+                                cancelled=self.isInterruptionRequested)
+        transcriptions = [Transcription(index=self.first_index + index,
+                                        transcription='',
+                                        start=start,
+                                        end=end,
+                                        media=self.media)
+                          for index, (start, end) in enumerate(spans)]
+        self.imported_count = len(transcriptions)
+        if transcriptions:
+            self.rows_ready.emit(transcriptions)
+        self.progress.emit(1)
+
+    def report_progress(self, value: float) -> None:
+        if self.throttle.ready():
+            self.progress.emit(value)
@@ -1,7 +1,9 @@
 import os
-import pydub
 from PyQt5.QtCore import QSettings
-from datatypes import AppSettings, AUDIO_QUALITY, AUDIO_QUALITY_REV, OutputMode, OUTPUT_MODE_NAMES
+from audio.encode import AudioProfile, set_ffmpeg
+from audio.processing import ProcessingOptions
+from datatypes import AppSettings, AUDIO_QUALITY, AUDIO_QUALITY_REV, OutputMode
+from utilities.exporters import exporter_names
 from utilities.logger import setup_custom_logger
 
 
@@ -20,7 +22,7 @@ def system_settings_exist() -> bool:
 def print_system_settings() -> None:
     system_settings = get_settings()
     print(f'Audio Quality: {system_settings.value("Audio Quality")}\n'
-          f'Output Format: {OUTPUT_MODE_NAMES[system_settings.value("Output Format")]}\n'
+          f'Output Format: {exporter_names()[OutputMode(int(system_settings.value("Output Format")))]}\n'
           f'Microphone: {system_settings.value("Microphone")}\n'
           f'Projects Directory: {system_settings.value("Project Root Dir")}'
           )
@@ -30,7 +32,7 @@ def load_system_settings() -> AppSettings:
     app_settings = AppSettings()
     system_settings = get_settings()
     app_settings.audio_quality = AUDIO_QUALITY[system_settings.value('Audio Quality')]
-    app_settings.output_format = list(OutputMode)[int(system_settings.value('Output Format'))]
+    app_settings.output_format = OutputMode(int(system_settings.value('Output Format')))
     app_settings.microphone = system_settings.value('Microphone')
     app_settings.project_root_dir = system_settings.value('Project Root Dir')
     if system_settings.contains('FFMPEG Location'):
@@ -40,9 +42,54 @@ def load_system_settings() -> AppSettings:
         else:
             # Test if exists?
             app_settings.ffmpeg_location = location
+    app_settings.export_processing = load_export_processing(system_settings)
+    app_settings.audio_profiles = {output_mode: load_audio_profile(system_settings, output_mode)
+                                   for output_mode in OutputMode}
+    app_settings.compact_manifest = system_settings.value('Compact Manifest', False, type=bool)
+    app_settings.shard_size = system_settings.value('Shard Size', app_settings.shard_size, type=int)
+    app_settings.shard_compression = system_settings.value('Shard Compression', app_settings.shard_compression)
+    app_settings.export_archive = system_settings.value('Export Archive', False, type=bool)
+    app_settings.archive_compression = system_settings.value('Archive Compression', app_settings.archive_compression,
+                                                             type=int)
     return app_settings
 
 
+def load_audio_profile(system_settings: QSettings, output_mode: OutputMode) -> AudioProfile:
+    defaults = AudioProfile()
+    system_settings.beginGroup(f'Audio Profile {output_mode.value}')
+    profile = AudioProfile(
+        codec=system_settings.value('Codec', defaults.codec),
+        frame_rate=system_settings.value('Sample Rate', 0, type=int) or None,
+        channels=system_settings.value('Channels', 0, type=int) or None,
+        bit_depth=system_settings.value('Bit Depth', 0, type=int) or None,
+        bitrate=system_settings.value('Bitrate', defaults.bitrate)
+    )
+    system_settings.endGroup()
+    return profile
+
+
+def save_audio_profile(system_settings: QSettings, output_mode: OutputMode, profile: AudioProfile) -> None:
+    system_settings.beginGroup(f'Audio Profile {output_mode.value}')
+    system_settings.setValue('Codec', profile.codec)
+    system_settings.setValue('Sample Rate', profile.frame_rate or 0)
+    system_settings.setValue('Channels', profile.channels or 0)
+    system_settings.setValue('Bit Depth', profile.bit_depth or 0)
+    system_settings.setValue('Bitrate', profile.bitrate)
+    system_settings.endGroup()
+
+
+def load_export_processing(system_settings: QSettings) -> ProcessingOptions:
+    defaults = ProcessingOptions()
+    normalisation = system_settings.value('Normalisation', 'None')
+    return ProcessingOptions(
+        trim_silence=system_settings.value('Trim Silence', defaults.trim_silence, type=bool),
+        normalisation=None if normalisation == 'None' else normalisation,
+        target_peak=system_settings.value('Target Peak', defaults.target_peak, type=float),
+        target_loudness=system_settings.value('Target Loudness', defaults.target_loudness, type=float),
+        fade_length=system_settings.value('Fade Length', defaults.fade_length, type=int)
+    )
+
+
 def save_system_settings(app_settings: AppSettings) -> None:
     system_settings = get_settings()
     system_settings.setValue('Audio Quality', AUDIO_QUALITY_REV[app_settings.audio_quality])
@@ -50,6 +97,18 @@ def save_system_settings(app_settings: AppSettings) -> None:
     system_settings.setValue('Microphone', app_settings.microphone)
     system_settings.setValue('FFMPEG Location', str(app_settings.ffmpeg_location))
     system_settings.setValue('Project Root Dir', str(app_settings.project_root_dir))
+    system_settings.setValue('Trim Silence', app_settings.export_processing.trim_silence)
+    system_settings.setValue('Normalisation', str(app_settings.export_processing.normalisation))
+    system_settings.setValue('Target Peak', app_settings.export_processing.target_peak)
+    system_settings.setValue('Target Loudness', app_settings.export_processing.target_loudness)
+    system_settings.setValue('Fade Length', app_settings.export_processing.fade_length)
+    for output_mode, profile in app_settings.audio_profiles.items():
+        save_audio_profile(system_settings, output_mode, profile)
+    system_settings.setValue('Compact Manifest', app_settings.compact_manifest)
+    system_settings.setValue('Shard Size', app_settings.shard_size)
+    system_settings.setValue('Shard Compression', app_settings.shard_compression)
+    system_settings.setValue('Export Archive', app_settings.export_archive)
+    system_settings.setValue('Archive Compression', app_settings.archive_compression)
     system_settings.sync()
     print_system_settings()
 
@@ -57,7 +116,7 @@ def save_system_settings(app_settings: AppSettings) -> None:
 def set_ffmpeg_location(app_settings: AppSettings, path: str) -> None:
     app_settings.ffmpeg_location = path
     save_system_settings(app_settings)
-    pydub.AudioSegment.converter = path
+    set_ffmpeg(path)
 
 
 LOG_SETTINGS = setup_custom_logger("SettingsUtil")
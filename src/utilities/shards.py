@@ -0,0 +1,116 @@
+import io
+import json
+import os
+import tarfile
+import time
+from typing import BinaryIO, List, Union
+from audio.encode import EncodedAudio
+from datatypes import OutputMode, Transcription
+from .dataset import get_source_media, transcription_record
+from .exporters import Exporter, register_exporter
+
+
+# Mapping of compression names (as shown in the settings window) to tarfile compression modes.
+TAR_COMPRESSION = {
+    'None': '',
+    'gzip': 'gz',
+    'bzip2': 'bz2',
+    'xz': 'xz',
+}
+TAR_COMPRESSION_REV = {v: k for k, v in TAR_COMPRESSION.items()}
+
+SHARD_INDEX = 'index.jsonl'
+
+
+@register_exporter
+class TarShardExporter(Exporter):
+    """
+    Streams the export into WebDataset style tar shards (shards/shard-NNNNN.tar[.gz|.bz2|.xz]), each sample stored
+    as {key}.txt (transcription), {key}.json (see transcription_record), {key}.<audio extension> and
+    {key}.<image extension>, written straight from memory.
+
+    A new shard is started once a shard file reaches settings.shard_size megabytes on disk (after any compression).
+    shards/index.jsonl has a line per sample giving its key, shard and, for each member, its [offset, size] of data
+    in the shard. The offsets allow random access (seek and read) into uncompressed shards only.
+    """
+    mode = OutputMode.TAR
+    name = "Dataset (Tar Shards)"
+    # Files open between plan() and finalise(), None until opened.
+    index = None
+    shard_file = None
+    shard = None
+
+    def plan(self, rows: List[int]) -> None:
+        super().plan(rows)
+        self.target.make_dir('shards')
+        # Shards of a previous export would otherwise be read as part of this one.
+        self.target.clear('shards', 'shard-')
+        self.compression = self.settings.shard_compression
+        self.shard_limit = self.settings.shard_size * 1024 * 1024
+        self.source_media = get_source_media(self.data)
+        self.modified_time = int(time.time())
+        self.index = self.target.open(f'shards/{SHARD_INDEX}')
+        self.shard_count = 0
+        self.shard_name = None
+        self.shard_file = None
+        self.shard = None
+
+    def open_shard(self) -> None:
+        extension = f'.{self.compression}' if self.compression else ''
+        self.shard_name = f'shard-{self.shard_count:05d}.tar{extension}'
+        self.shard_file = self.target.open_stream(f'shards/{self.shard_name}')
+        self.shard = tarfile.open(fileobj=self.shard_file, mode=f'w:{self.compression}')
+        self.shard_count += 1
+
+    def close_shard(self) -> None:
+        if self.shard is not None:
+            self.shard.close()
+            self.shard = None
+        if self.shard_file is not None:
+            self.shard_file.close()
+            self.shard_file = None
+
+    def add_member(self, name: str, file: BinaryIO, size: int) -> List[int]:
+        """:return: the [offset, size] of the member's data in the (uncompressed) shard."""
+        member = tarfile.TarInfo(name)
+        member.size = size
+        member.mtime = self.modified_time
+        self.shard.addfile(member, file)
+        # The data ends the member, padded out to a whole block.
+        blocks = -(-size // tarfile.BLOCKSIZE)
+        return [self.shard.offset - blocks * tarfile.BLOCKSIZE, size]
+
+    def emit_transcription(self,
+                           row: int,
+                           transcription: Transcription,
+                           sound_file: Union[None, EncodedAudio]) -> None:
+        if self.shard is None:
+            self.open_shard()
+        # Keys number the samples in export order, WebDataset keys cannot contain dots.
+        key = f'{self.row_count:08d}'
+        record = transcription_record(row, transcription, self.source_media)
+        members = dict()
+        for extension, data in (('txt', transcription.transcription.encode('utf-8')),
+                                ('json', json.dumps(record).encode('utf-8'))):
+            members[extension] = self.add_member(f'{key}.{extension}', io.BytesIO(data), len(data))
+        if sound_file is not None:
+            members[sound_file.extension] = self.add_member(f'{key}.{sound_file.extension}',
+                                                            io.BytesIO(sound_file.data), len(sound_file.data))
+        if transcription.image:
+            extension = os.path.splitext(transcription.image)[1].lstrip('.').lower()
+            with open(transcription.image, 'rb') as file:
+                members[extension] = self.add_member(f'{key}.{extension}', file, os.fstat(file.fileno()).st_size)
+        self.index.write(json.dumps({'key': key, 'id': record['id'], 'shard': self.shard_name,
+                                     'members': members}) + '\n')
+        # The shard file's position is the compressed size written so far, which is what the size limit is for.
+        if self.shard_file.tell() >= self.shard_limit:
+            self.close_shard()
+
+    def finalise(self) -> None:
+        self.close_shard()
+        self.index.close()
+
+    def abort(self) -> None:
+        self.close_shard()
+        if self.index is not None:
+            self.index.close()
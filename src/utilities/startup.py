@@ -0,0 +1,38 @@
+import sys
+import time
+from perf import PERF
+from .logger import setup_custom_logger
+
+
+LOG_STARTUP = setup_custom_logger("Startup")
+
+
+class StartupTimer(object):
+    """
+    Times the phases of start up, from the first line of main.py to the first pass of the event loop (once the
+    primary window has been painted), and logs a one line report.
+    """
+    def __init__(self, started: float) -> None:
+        """:param started: time.perf_counter() at the first line of main.py."""
+        self.started = started
+        self.marks = []
+
+    def mark(self, phase: str) -> None:
+        """Ends the phase named, which started at the previous mark."""
+        marked = time.perf_counter()
+        PERF.record(f'Startup: {phase}', marked - (self.marks[-1][1] if self.marks else self.started))
+        self.marks.append((phase, marked))
+
+    def report(self) -> str:
+        phases = []
+        previous = self.started
+        for phase, marked in self.marks:
+            phases.append(f'{phase} {(marked - previous) * 1000:.0f} ms')
+            previous = marked
+        build = ' (frozen build)' if getattr(sys, 'frozen', False) else ''
+        return f'Startup took {(previous - self.started) * 1000:.0f} ms{build}: {", ".join(phases)}, ' \
+               f'{len(sys.modules)} modules loaded'
+
+    def finish(self) -> None:
+        self.mark('First paint')
+        LOG_STARTUP.info(self.report())
@@ -0,0 +1,238 @@
+import io
+from abc import ABC, abstractmethod
+import os
+import tempfile
+import time
+import zipfile
+from typing import BinaryIO, IO
+from audio.encode import EncodedAudio
+from .assets import AssetStore, export_audio, export_file
+from .files import make_file_if_not_extant
+
+
+# Bytes of file output buffered before being written out.
+OUTPUT_BUFFER = 64 * 1024
+
+# Mapping of compression names (as shown in the settings window) to zipfile compression of archived audio and images.
+ARCHIVE_COMPRESSION = {
+    'Stored': zipfile.ZIP_STORED,
+    'Deflate': zipfile.ZIP_DEFLATED,
+    'bzip2': zipfile.ZIP_BZIP2,
+    'LZMA': zipfile.ZIP_LZMA,
+}
+ARCHIVE_COMPRESSION_REV = {v: k for k, v in ARCHIVE_COMPRESSION.items()}
+
+
+class ExportTarget(ABC):
+    """
+    Where an exporter writes its files: a folder (DirectoryTarget) or a single zip archive (ZipTarget), with the same
+    layout either way. Paths are relative to the root of the export and use '/' separators.
+
+    The write_ methods return the reference to record for a file (e.g. in a manifest or CSV).
+    """
+    def make_dir(self, path: str) -> None:
+        pass
+
+    def clear(self, path: str, prefix: str) -> None:
+        """Removes the files in the folder path starting with prefix (left from a previous export)."""
+        pass
+
+    def reference(self, path: str) -> str:
+        return path
+
+    @abstractmethod
+    def open(self, path: str, binary: bool = False, newline: str = None) -> IO:
+        """Opens a file for writing, which may be kept open while other files are written."""
+
+    @abstractmethod
+    def open_stream(self, path: str) -> BinaryIO:
+        """Opens a large binary file for writing. No other file may be written until it is closed."""
+
+    @abstractmethod
+    def write_text(self, path: str, text: str) -> str:
+        pass
+
+    @abstractmethod
+    def write_audio(self, path: str, sound_file: EncodedAudio) -> str:
+        pass
+
+    @abstractmethod
+    def write_file(self, source: str, path: str) -> str:
+        """Copies the existing file source to path."""
+
+    @abstractmethod
+    def temporary_path(self, path: str) -> str:
+        """:return: a local file that can be built in place of path, then moved there with move_file."""
+
+    @abstractmethod
+    def move_file(self, temporary_path: str, path: str) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def abort(self) -> None:
+        """Called instead of close if the export fails part way through."""
+        self.close()
+
+
+class DirectoryTarget(ExportTarget):
+    """
+    Writes into a folder, linking audio and images out of the project's asset store where it can.
+    """
+    def __init__(self, root: str, store: AssetStore = None) -> None:
+        self.root = root
+        self.store = store
+
+    def full_path(self, path: str) -> str:
+        return os.path.join(self.root, *path.split('/'))
+
+    def make_dir(self, path: str) -> None:
+        make_file_if_not_extant(self.full_path(path))
+
+    def clear(self, path: str, prefix: str) -> None:
+        directory = self.full_path(path)
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                if name.startswith(prefix):
+                    os.remove(os.path.join(directory, name))
+
+    def reference(self, path: str) -> str:
+        return self.full_path(path)
+
+    def open(self, path: str, binary: bool = False, newline: str = None) -> IO:
+        if binary:
+            return open(self.full_path(path), 'wb', buffering=OUTPUT_BUFFER)
+        return open(self.full_path(path), 'w', buffering=OUTPUT_BUFFER, newline=newline)
+
+    def open_stream(self, path: str) -> BinaryIO:
+        return self.open(path, binary=True)
+
+    def write_text(self, path: str, text: str) -> str:
+        with open(self.full_path(path), 'w') as file:
+            file.write(text)
+        return self.reference(path)
+
+    def write_audio(self, path: str, sound_file: EncodedAudio) -> str:
+        return export_audio(sound_file, self.full_path(path), self.store)
+
+    def write_file(self, source: str, path: str) -> str:
+        return export_file(source, self.full_path(path), self.store)
+
+    def temporary_path(self, path: str) -> str:
+        temporary_path = f'{self.full_path(path)}.tmp'
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        return temporary_path
+
+    def move_file(self, temporary_path: str, path: str) -> None:
+        os.replace(temporary_path, self.full_path(path))
+
+
+class ArchiveMember(io.BytesIO):
+    """
+    A file being written into a ZipTarget, held in memory and added to the archive when closed, so it can be kept
+    open while other files are written.
+    """
+    def __init__(self, target: 'ZipTarget', path: str) -> None:
+        super().__init__()
+        self.target = target
+        self.path = path
+
+    def close(self) -> None:
+        if not self.closed:
+            self.target.write_bytes(self.path, self.getvalue(), zipfile.ZIP_DEFLATED)
+        super().close()
+
+
+class ArchiveStream(io.RawIOBase):
+    """
+    A member being streamed into a ZipTarget. Zip member handles can't tell() their position, which writers such as
+    tarfile ask for, so the bytes written are counted here.
+    """
+    def __init__(self, member: BinaryIO) -> None:
+        super().__init__()
+        self.member = member
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        written = self.member.write(data)
+        self.position += written
+        return written
+
+    def tell(self) -> int:
+        return self.position
+
+    def close(self) -> None:
+        if not self.closed:
+            self.member.close()
+        super().close()
+
+
+class ZipTarget(ExportTarget):
+    """
+    Streams the export into a single zip archive. Audio is written straight from memory and nothing is staged in the
+    export folder. Text files are always deflated, audio and images (which barely compress) are compressed as chosen.
+    The archive is written under a temporary name and only takes its own once complete.
+    """
+    def __init__(self, path: str, compression: int = zipfile.ZIP_STORED) -> None:
+        """
+        :param path: the archive to write.
+        :param compression: zipfile compression of audio, images and other binary files.
+        """
+        self.path = path
+        self.compression = compression
+        self.archive_path = f'{path}.tmp'
+        self.archive = zipfile.ZipFile(self.archive_path, 'w', zipfile.ZIP_DEFLATED, allowZip64=True)
+        self.date_time = time.localtime()[:6]
+
+    def member_info(self, path: str, compression: int) -> zipfile.ZipInfo:
+        member = zipfile.ZipInfo(path, self.date_time)
+        member.compress_type = compression
+        member.external_attr = 0o644 << 16
+        return member
+
+    def open(self, path: str, binary: bool = False, newline: str = None) -> IO:
+        member = ArchiveMember(self, path)
+        if binary:
+            return member
+        return io.TextIOWrapper(member, encoding='utf-8', newline=newline)
+
+    def open_stream(self, path: str) -> BinaryIO:
+        return ArchiveStream(self.archive.open(self.member_info(path, self.compression), 'w', force_zip64=True))
+
+    def write_bytes(self, path: str, data: bytes, compression: int = None) -> str:
+        self.archive.writestr(self.member_info(path, self.compression if compression is None else compression), data)
+        return path
+
+    def write_text(self, path: str, text: str) -> str:
+        return self.write_bytes(path, text.encode('utf-8'), zipfile.ZIP_DEFLATED)
+
+    def write_audio(self, path: str, sound_file: EncodedAudio) -> str:
+        return self.write_bytes(path, sound_file.data)
+
+    def write_file(self, source: str, path: str) -> str:
+        self.archive.write(source, path, self.compression)
+        return path
+
+    def temporary_path(self, path: str) -> str:
+        handle, temporary_path = tempfile.mkstemp(suffix=os.path.splitext(path)[1])
+        os.close(handle)
+        return temporary_path
+
+    def move_file(self, temporary_path: str, path: str) -> None:
+        self.write_file(temporary_path, path)
+        os.remove(temporary_path)
+
+    def close(self) -> None:
+        self.archive.close()
+        os.replace(self.archive_path, self.path)
+
+    def abort(self) -> None:
+        try:
+            self.archive.close()
+        finally:
+            os.remove(self.archive_path)
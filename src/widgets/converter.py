@@ -1,19 +1,26 @@
 import os
-import csv
-import pympi
-import json
-from PyQt5.QtWidgets import QWidget, QGridLayout, QLabel, QFrame, QLineEdit
+from PyQt5.QtWidgets import QWidget, QGridLayout, QLabel, QFrame, QLineEdit, QMessageBox
 from PyQt5.QtGui import QDesktopServices, QFont
-from PyQt5.QtCore import QUrl
-from datatypes import OperationMode, Transcription, ConverterData, AppSettings, OutputMode, ConverterComponents
-from utilities.output import create_opie_files, create_dict_files, create_lmf_files
-from utilities.parse import get_audio_file, extract_elan_data
+from PyQt5.QtCore import QUrl, QThread
+from audio import load_audio
+from audio.encode import encoder_available
+from datatypes import OperationMode, Transcription, ConverterData, AppSettings, ConverterComponents
+from perf import perf_count, perf_span, perf_timer
+from utilities.exporters import get_exporter
+from utilities.parse import get_audio_file, ELANImportWorker
+from utilities.pipeline import iter_export_audio
+from utilities.progress import ProgressThrottle
+from utilities.qc import AudioQCWorker
+from utilities.segment import AutoSegmentWorker
+from utilities.targets import DirectoryTarget, ZipTarget
 from utilities.logger import setup_custom_logger
 from widgets.mode import MainProjectSelection, ModeSelection
 from widgets.elan_import import ELANFileField, TierSelector
 from widgets.table import TABLE_COLUMNS, FilterTable
 from widgets.export import ExportLocationField, ExportButton
+from widgets.warning import WarningMessage
 from windows.manifest import ManifestWindow
+from windows.qc import QCReportWindow
 
 
 LOG_CONVERTER = setup_custom_logger("Converter Widget")
@@ -37,9 +44,12 @@ class ConverterWidget(QWidget):
         self.session = parent.session
         self.components = ConverterComponents(
             progress_bar=self.parent.progress_bar,
-            status_bar=self.parent.statusBar()
+            status_bar=self.parent.statusBar(),
+            cancel_button=self.parent.cancel_button
         )
         self.data = ConverterData()
+        self.import_worker = None
+        self.qc_worker = None
         self.layout = QGridLayout()
         self.init_ui()
 
@@ -81,8 +91,10 @@ class ConverterWidget(QWidget):
                                   components: ConverterComponents,
                                   data: ConverterData) -> None:
         """Elan Import Mode: user to select tiers to import into Hermes"""
+        import pympi
         components.status_bar.showMessage('Select transcription and translation tiers, then click import')
-        data.eaf_object = pympi.Elan.Eaf(data.elan_file)
+        with perf_span('EAF parse'):
+            data.eaf_object = pympi.Elan.Eaf(data.elan_file)
         components.tier_selector = TierSelector(self)
         components.tier_selector.populate_tiers(list(data.eaf_object.get_tier_names()))
         self.layout.addWidget(components.tier_selector, 1, 0, 1, 8)
@@ -99,9 +111,9 @@ class ConverterWidget(QWidget):
         """
         if self.data.mode == OperationMode.ELAN:
             data.audio_file = get_audio_file(self.data)
-            transcription_tier = components.tier_selector.get_transcription_tier()
-            translation_tier = components.tier_selector.get_translation_tier()
-            extract_elan_data(transcription_tier, translation_tier, self.data, components)
+            # Rows are streamed into the table by the import worker once the table exists.
+            data.transcriptions = []
+            data.translations = []
         else:
             if self.components.project_mode_select:
                 self.components.project_mode_select.hide()
@@ -151,6 +163,86 @@ class ConverterWidget(QWidget):
         self.parent.init_menu(True)
         self.parent.session.start_autosave()
 
+        if self.data.mode == OperationMode.ELAN:
+            self.start_elan_import(components, data)
+
+    def start_elan_import(self,
+                          components: ConverterComponents,
+                          data: ConverterData) -> None:
+        """Elan Import Mode: import the selected tiers in the background, filling the table as rows arrive."""
+        components.tier_selector.set_importing(True)
+        self.start_import(ELANImportWorker(components.tier_selector.get_transcription_tier(),
+                                           components.tier_selector.get_translation_tier(),
+                                           data))
+
+    def start_auto_segment(self, audio_path: str) -> None:
+        """Adds a row with a sample for each word found in a long recording, leaving the text for the user."""
+        media = load_audio(audio_path, mmap=True)
+        LOG_CONVERTER.info(f"Auto-segmenting recording: {audio_path}")
+        self.start_import(AutoSegmentWorker(media, first_index=self.components.table.rowCount()))
+
+    def start_import(self, worker: QThread) -> None:
+        """Runs an import worker (see ELANImportWorker), streaming its rows into the table."""
+        self.import_worker = worker
+        self.import_worker.progress.connect(self.components.progress_bar.set_progress)
+        self.import_worker.message.connect(self.components.status_bar.showMessage)
+        self.import_worker.rows_ready.connect(self.components.filter_table.append_transcriptions)
+        self.import_worker.finished.connect(self.on_import_finished)
+        self.components.progress_bar.set_progress(0)
+        self.components.progress_bar.show()
+        self.components.cancel_button.show()
+        self.import_worker.start()
+
+    def cancel_import(self, wait: bool = True) -> None:
+        """Asks a running import to stop, rows already imported are kept."""
+        if self.import_worker:
+            self.import_worker.requestInterruption()
+            if wait:
+                self.import_worker.wait()
+
+    def on_import_finished(self) -> None:
+        worker = self.import_worker
+        self.import_worker = None
+        self.components.progress_bar.hide()
+        self.components.cancel_button.hide()
+        if self.components.tier_selector:
+            self.components.tier_selector.set_importing(False)
+        self.components.table.sort_by_index()
+        if worker.isInterruptionRequested():
+            self.components.status_bar.showMessage(f'Import cancelled after {worker.imported_count} transcriptions')
+            LOG_CONVERTER.info(f"Import cancelled after {worker.imported_count} transcriptions.")
+        else:
+            self.enable_export_button()
+            LOG_CONVERTER.info(f"Import finished with {worker.imported_count} transcriptions.")
+
+    def start_audio_qc(self) -> None:
+        """Checks the audio of every row in the background, opening the QC report when done."""
+        self.qc_worker = AudioQCWorker(self.data.transcriptions)
+        self.qc_worker.progress.connect(self.components.progress_bar.set_progress)
+        self.qc_worker.message.connect(self.components.status_bar.showMessage)
+        self.qc_worker.reports_ready.connect(self.show_qc_report)
+        self.qc_worker.finished.connect(self.on_audio_qc_finished)
+        self.components.progress_bar.set_progress(0)
+        self.components.progress_bar.show()
+        self.components.cancel_button.show()
+        self.qc_worker.start()
+
+    def cancel_audio_qc(self, wait: bool = True) -> None:
+        if self.qc_worker:
+            self.qc_worker.requestInterruption()
+            if wait:
+                self.qc_worker.wait()
+
+    def show_qc_report(self, reports: dict) -> None:
+        if self.qc_worker and self.qc_worker.isInterruptionRequested():
+            return
+        QCReportWindow(self.parent, self.components.filter_table, reports).show()
+
+    def on_audio_qc_finished(self) -> None:
+        self.qc_worker = None
+        self.components.progress_bar.hide()
+        self.components.cancel_button.hide()
+
     def enable_export_button(self) -> None:
         """Allow final export step, which enables the export button."""
         self.components.status_bar.showMessage('Press the export button to begin the process')
@@ -188,36 +280,63 @@ class ConverterWidget(QWidget):
             os.makedirs(self.session.saves_path)
 
     def export_resources(self) -> None:
+        audio_profile = self.settings.audio_profiles[self.settings.output_format]
+        if not encoder_available(audio_profile):
+            warning_message = WarningMessage()
+            warning_message.warning(warning_message, 'Warning',
+                                    f'Exporting {audio_profile.codec.upper()} audio needs the FFMPEG plugin.\n'
+                                    f'Install it from the settings window or choose WAV export audio.',
+                                    QMessageBox.Ok)
+            return
+        exporter_class = get_exporter(self.settings.output_format)
+        if not exporter_class.available():
+            warning_message = WarningMessage()
+            warning_message.warning(warning_message, 'Warning',
+                                    f'Exporting {exporter_class.name} needs {exporter_class.requirement}.\n'
+                                    f'Install it or choose another export mode in the settings window.',
+                                    QMessageBox.Ok)
+            return
         self.components.status_bar.clearMessage()
         self.components.progress_bar.show()
         export_count = self.components.table.get_selected_count()
         completed_count = 0
-        if self.settings.output_format == OutputMode.DICT:
-            with open(os.path.join(self.data.export_location, 'dictionary.csv'), 'w') as file:
-                writer = csv.writer(file)
-                writer.writerow(['Transcription', 'Translation', 'Audio', 'Image'])
-        elif self.settings.output_format == OutputMode.LMF:
+        if self.settings.export_archive:
+            archive_name = f'{os.path.basename(os.path.normpath(self.data.export_location))}.zip'
+            target = ZipTarget(os.path.join(self.data.export_location, archive_name), self.settings.archive_compression)
+        else:
+            target = DirectoryTarget(self.data.export_location, self.session.asset_store)
+        exporter = exporter_class(self.data, self.settings, target=target)
+        if exporter.requires_manifest:
             lmf_manifest_window = ManifestWindow(self.parent, self.data)
             _ = lmf_manifest_window.exec()
-        opie_index = 0
-        for row in range(self.components.table.rowCount()):
-            if self.components.table.row_is_checked(row) and \
-                    self.components.table.get_cell_value(row, TABLE_COLUMNS["Transcription"]):
-                self.components.status_bar.showMessage(f'Exporting file {completed_count + 1} of {export_count}')
-                if self.settings.output_format == OutputMode.OPIE:
-                    create_opie_files(row, self.data, self.components, opie_index)
-                    opie_index += 1
-                elif self.settings.output_format == OutputMode.DICT:
-                    create_dict_files(row, self.data)
-                elif self.settings.output_format == OutputMode.LMF:
-                    create_lmf_files(row, self.data)
-                completed_count += 1
-                self.components.progress_bar.update_progress(completed_count / export_count)
+        export_rows = [row for row in range(self.components.table.rowCount())
+                       if self.components.table.row_is_checked(row) and
+                       self.components.table.get_cell_value(row, TABLE_COLUMNS["Transcription"])]
+        LOG_CONVERTER.debug(f"Export processing: {self.settings.export_processing}")
+        LOG_CONVERTER.debug(f"Export audio: {audio_profile}")
+        throttle = ProgressThrottle()
+        with perf_span('Export'):
+            try:
+                exporter.plan(export_rows)
+                for row, sound_file in iter_export_audio(self.data.transcriptions, export_rows, audio_profile,
+                                                         self.settings.export_processing):
+                    with perf_timer('Export write'):
+                        exporter.emit(row, sound_file)
+                    completed_count += 1
+                    if throttle.ready():
+                        self.components.status_bar.showMessage(f'Exporting file {completed_count} of {export_count}')
+                        self.components.progress_bar.update_progress(completed_count / export_count)
+            except Exception:
+                try:
+                    exporter.abort()
+                finally:
+                    target.abort()
+                raise
+            with perf_span('Export finalise'):
+                exporter.finalise()
+                target.close()
+        perf_count('Rows exported', completed_count)
         self.components.progress_bar.hide()
-        if self.settings.output_format == OutputMode.LMF:
-            manifest_file_path = os.path.join(self.data.export_location, 'manifest.json')
-            with open(manifest_file_path, 'w') as manifest_file:
-                json.dump(self.data.lmf, manifest_file, indent=4)
         self.components.status_bar.showMessage(f'Exported {str(completed_count)} valid words to '
                                                f'{self.data.export_location}')
         QDesktopServices().openUrl(QUrl().fromLocalFile(self.data.export_location))
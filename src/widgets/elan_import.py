@@ -41,6 +41,7 @@ class TierSelector(QWidget):
         self.layout = QGridLayout()
         self.transcription_menu = None
         self.translation_menu = None
+        self.import_button = None
         self.init_ui()
 
     def init_ui(self):
@@ -53,9 +54,9 @@ class TierSelector(QWidget):
         self.layout.addWidget(translation_label, 1, 4, 1, 2)
         self.translation_menu = QComboBox()
         self.layout.addWidget(self.translation_menu, 1, 6, 1, 2)
-        import_button = QPushButton('Import')
-        import_button.clicked.connect(self.on_click_import)
-        self.layout.addWidget(import_button, 2, 0, 1, 8)
+        self.import_button = QPushButton('Import')
+        self.import_button.clicked.connect(self.on_click_import)
+        self.layout.addWidget(self.import_button, 2, 0, 1, 8)
         self.setLayout(self.layout)
 
     def populate_tiers(self, tiers: List[str]) -> None:
@@ -68,7 +69,16 @@ class TierSelector(QWidget):
     def get_translation_tier(self) -> None:
         return self.translation_menu.currentText()
 
+    def set_importing(self, importing: bool) -> None:
+        """While an import is running the import button doubles as a cancel button."""
+        self.import_button.setText('Cancel Import' if importing else 'Import')
+        self.transcription_menu.setEnabled(not importing)
+        self.translation_menu.setEnabled(not importing)
+
     def on_click_import(self) -> None:
+        if self.parent.import_worker:
+            self.parent.cancel_import(wait=False)
+            return
         if self.parent.components.table:
             warning_message = WarningMessage()
             choice = warning_message.warning(warning_message, 'Warning',
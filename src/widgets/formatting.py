@@ -1,4 +1,6 @@
-from PyQt5.QtWidgets import QFrame
+from PyQt5.QtWidgets import QFrame, QTableWidgetItem
+from PyQt5.QtCore import Qt
+from typing import Union
 
 
 class HorizontalLineWidget(QFrame):
@@ -10,3 +12,13 @@ class HorizontalLineWidget(QFrame):
         super().__init__()
         self.setFrameShape(QFrame.HLine)
         self.setFrameShadow(QFrame.Sunken)
+
+
+def numeric_item(value: Union[int, float, str]) -> QTableWidgetItem:
+    """
+    :param value: the cell's value, numbers are shown as they are.
+    :return: a table item holding value as data rather than text, so numeric columns sort by value.
+    """
+    item = QTableWidgetItem()
+    item.setData(Qt.DisplayRole, value)
+    return item
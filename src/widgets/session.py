@@ -1,16 +1,20 @@
-import copy
 import json
 import os
-import shutil
+import sqlite3
 from PyQt5.QtWidgets import QCheckBox, QDialog, QFileDialog, QGridLayout, QLabel, QMainWindow, QMessageBox, \
     QPushButton, QLineEdit
 from PyQt5.QtCore import QThread, QTimer, QEventLoop
 from PyQt5.QtGui import QFont
 from box import Box
-from datatypes import create_lmf, ConverterData, Transcription
+from datatypes import create_lmf, Transcription
 from datetime import datetime
 from enum import Enum
-from utilities.logger import setup_custom_logger
+from typing import Iterator
+from utilities.assets import AssetStore
+from perf import perf_spanned
+from utilities.logger import log_payload, setup_custom_logger
+from utilities.manifest import ManifestWriter
+from utilities.search import ProjectSearchIndex
 from widgets.table import TABLE_COLUMNS
 from widgets.warning import WarningMessage
 
@@ -41,6 +45,8 @@ class SessionManager(object):
         self.project_path = ""
         self.assets_audio_path = ""
         self.assets_images_path = ""
+        self.assets_store_path = ""
+        self.asset_store = None
         self.export_path = ""
         self.templates_path = ""
         self.saves_path = ""
@@ -63,6 +69,9 @@ class SessionManager(object):
         self.autosave_fp = None
         self.autosave_interval = 120  # Seconds
 
+        # Index of every project's words, for searching across projects, opened on the first save.
+        self.search_index = None
+
         # Session Parameters
         self.save_mode = SaveMode.MANUAL
 
@@ -71,6 +80,8 @@ class SessionManager(object):
         self.project_path = os.path.join(self.parent.settings.project_root_dir, self.project_name)
         self.assets_audio_path = os.path.join(self.project_path, "assets", "audio")
         self.assets_images_path = os.path.join(self.project_path, "assets", "images")
+        self.assets_store_path = os.path.join(self.project_path, "assets", "store")
+        self.asset_store = AssetStore(self.assets_store_path)
         self.export_path = os.path.join(self.project_path, "export")
         self.templates_path = os.path.join(self.project_path, "templates")
         self.saves_path = os.path.join(self.project_path, "saves")
@@ -125,7 +136,7 @@ class SessionManager(object):
         """
         with open(self.save_fp, 'r') as f:
             self.save_data = json.loads(f.read())
-            LOG_SESSION.debug(f"Data loaded: {self.save_data}")
+            LOG_SESSION.debug(f"Data loaded: {log_payload(self.save_data)}")
         # Populate Language and Author details
         self.data_author = self.save_data['author']
         self.data_transcription_language = self.save_data['transcription-language']
@@ -157,6 +168,7 @@ class SessionManager(object):
         self.converter.components.status_bar.showMessage(f"Project loaded: {self.project_name}", 10000)
         LOG_SESSION.info(f"Table populated with {len(self.save_data['words'])} transcriptions.")
 
+    @perf_spanned(lambda self: 'Autosave' if self.save_mode is SaveMode.AUTOSAVE else 'Save')
     def save_project(self):
         """Saves data from table into the project's json based save file.
 
@@ -191,6 +203,25 @@ class SessionManager(object):
         except Exception as e:
             LOG_SESSION.warn(f"Error -  {e}: Unable to save file to {save}")
             save_fail_warn()
+            return
+        # Autosaves (on their own thread) aren't searched, the project's save is indexed when next saved.
+        if self.save_mode is not SaveMode.AUTOSAVE:
+            self.update_search_index(save)
+
+    def update_search_index(self, save: str) -> None:
+        """Updates the words indexed for this project in the search index with those just saved."""
+        if not ProjectSearchIndex.available():
+            return
+        try:
+            root_dir = self.parent.settings.project_root_dir
+            if self.search_index is None or self.search_index.root_dir != os.path.abspath(root_dir):
+                if self.search_index:
+                    self.search_index.close()
+                self.search_index = ProjectSearchIndex(root_dir)
+            self.search_index.update_save(save, self.save_data)
+        except sqlite3.Error as e:
+            # The index is rebuilt from the save files, so failing to update it doesn't lose anything.
+            LOG_SESSION.warn(f"Error - {e}: Unable to update search index for {save}")
 
     def data_exists(self, row: int):
         return self.converter.components.table.get_cell_value(row, TABLE_COLUMNS["Transcription"]) \
@@ -215,20 +246,11 @@ class SessionManager(object):
             "transcription": transcription.transcription,
             "translation": [transcription.translation, ],
         }
+        # Assets are saved once each in the content-addressed store, unchanged ones cost nothing to save again.
         if transcription.sample:
-            sound_file = transcription.sample.get_sample_file_object()
-            sound_file_path = f'{self.assets_audio_path}/{transcription.transcription}-{row}.wav'
-            sound_file.export(sound_file_path, format='wav')
-            word_entry['audio'] = [sound_file_path, ]
+            word_entry['audio'] = [self.asset_store.add_file(transcription.sample.get_sample_file_path()), ]
         if transcription.image:
-            _, image_extension = os.path.splitext(transcription.image)
-            image_file_path = os.path.join(self.assets_images_path,
-                                           f'{transcription.transcription}-{row}{image_extension}')
-            try:
-                shutil.copy(transcription.image, image_file_path)
-            except shutil.SameFileError:
-                pass
-            word_entry['image'] = [image_file_path, ]
+            word_entry['image'] = [self.asset_store.add_file(transcription.image), ]
         self.save_data['words'].append(word_entry)
 
     def create_template(self) -> None:
@@ -249,29 +271,22 @@ class SessionManager(object):
             LOG_SESSION.info("Template creation cancelled.")
             return
 
-        # Make Template Data
-        self.create_template_data()
-        temp_data = self.get_data_for_template()
-
         # Progress Bar
         self.converter.components.status_bar.clearMessage()
         complete_count = 0
         to_save_count = self.converter.components.table.rowCount()
 
-        # Add data to template for saving
-        for row in range(self.converter.components.table.rowCount()):
-            if self.data_exists(row):
-                self.prepare_template_data(row, temp_data)
-                complete_count += 1
-                self.converter.components.progress_bar.update_progress(complete_count / to_save_count)
-
-        # Write Template File
+        # Stream the template's words straight to the template file
+        self.create_template_data()
         template_fp = os.path.join(self.templates_path, self.template_name + '.htemp')
         try:
-            with open(template_fp, 'w') as f:
-                json.dump(self.template_data, f, indent=4)
-                self.converter.components.status_bar.showMessage(f"Template {self.template_name} saved at {template_fp}", 10000)
-                LOG_SESSION.info(f"Template saved at {template_fp}")
+            with ManifestWriter(template_fp, self.template_data) as template_writer:
+                for word_entry in self.iter_template_words():
+                    template_writer.write_entry(word_entry)
+                    complete_count += 1
+                    self.converter.components.progress_bar.update_progress(complete_count / to_save_count)
+            self.converter.components.status_bar.showMessage(f"Template {self.template_name} saved at {template_fp}", 10000)
+            LOG_SESSION.info(f"Template saved at {template_fp}")
         except Exception as e:
             LOG_SESSION.warn(f"Error -  {e}: Unable to save template to {template_fp}")
             template_fail_warn()
@@ -287,8 +302,8 @@ class SessionManager(object):
             author=self.data_author
         )
 
-    def get_data_for_template(self) -> ConverterData:
-        """Prepares template files based on user selection.
+    def iter_template_words(self) -> Iterator[dict]:
+        """Yields the template word entry for each valid table row, based on user selection.
 
         Template files can have the following fields prepared:
         - Transcription
@@ -299,41 +314,23 @@ class SessionManager(object):
         session as opposed to fixed with template to allow for transferal of
         templates to other users and/or computers.
 
+        Entries are read from the session's transcriptions as they are written, rather than from a copy, so the
+        session's data is never modified and no audio or images are copied.
+
         Returns:
-            ConverterData with only relevant information as requested by user.
-        """
-        # Prepare custom converter data to save
-        data = ConverterData()
-        data.transcriptions = copy.deepcopy(self.converter.data.transcriptions)
-
-        for i in range(len(data.transcriptions)):
-            # Clear transcription or translation if only one type wanted.
-            if self.template_type is TemplateType.TRANSCRIPTION:
-                data.transcriptions[i].translation = ""
-            elif self.template_type is TemplateType.TRANSLATION:
-                data.transcriptions[i].transcription = ""
-
-            # Clear images and sounds
-            data.transcriptions[i].image = None
-            data.transcriptions[i].sample = None
-
-        return data
-
-    def prepare_template_data(self, row: int, data: ConverterData) -> None:
-        """Creates word entry for template for valid table rows.
-
-        Args:
-            row: The table row corresponding to a word to be saved.
-            data: Prepared Converter Data for word entry. Note that this is a deep copy of the session's main
-                  Converter Data to avoid mutating data unintentionally.
+            An iterator of word entries.
         """
-        transcription = data.transcriptions[row]
-        word_entry = {
-            "id": str(transcription.id),
-            "transcription": transcription.transcription,
-            "translation": [transcription.translation, ],
-        }
-        self.template_data['words'].append(word_entry)
+        for row in range(self.converter.components.table.rowCount()):
+            if not self.data_exists(row):
+                continue
+            transcription = self.converter.data.transcriptions[row]
+            yield {
+                "id": str(transcription.id),
+                "transcription": "" if self.template_type is TemplateType.TRANSLATION
+                else transcription.transcription,
+                "translation": ["" if self.template_type is TemplateType.TRANSCRIPTION
+                                else transcription.translation, ],
+            }
 
     def get_template_option(self, template_dialog):
         """Retrieve template option from user choice.
@@ -363,7 +360,7 @@ class SessionManager(object):
                                                            "Hermes Template (*.htemp)")
         with open(template_fp, 'r') as f:
             self.save_data = json.loads(f.read())
-            LOG_SESSION.debug(f"Data loaded: {self.save_data}")
+            LOG_SESSION.debug(f"Data loaded: {log_payload(self.save_data)}")
         # Populate Language and Author details
         self.data_author = self.save_data['author']
         self.data_transcription_language = self.save_data['transcription-language']
@@ -1,14 +1,14 @@
 import logging
-import PIL
 import os
 from PyQt5.QtWidgets import QTableWidget, QWidget, QGridLayout, QTableWidgetItem, QPushButton, \
     QHeaderView, QLabel, QStatusBar, QHBoxLayout, QCheckBox, QLineEdit, QSizePolicy
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QIcon, QMouseEvent
-from typing import List
-from pygame import mixer
+from typing import Iterable, List, Tuple, Union
 from functools import partial
-from datatypes import OperationMode, Transcription, ConverterData, AppSettings
+from audio.intervals import IntervalIndex, format_time, parse_time_range
+from datatypes import AudioClip, OperationMode, Transcription, ConverterData, AppSettings
+from perf import perf_count, perf_span
 from utilities import open_image_dialogue, resource_path
 from widgets.formatting import HorizontalLineWidget
 from windows.record import RecordWindow
@@ -24,6 +24,9 @@ TABLE_COLUMNS = {
 
 TABLE_LOGGER = logging.getLogger("TranscriptionTranslationTable")
 
+# Milliseconds of the source media played either side of a row by Play Context.
+CONTEXT_MS = 2000
+
 class TranslationTableWidget(QTableWidget):
     """
     A table containing transcriptions, translations and buttons for live previews, adding images and selectors for
@@ -54,13 +57,20 @@ class TranslationTableWidget(QTableWidget):
         for row in range(self.rowCount()):
             self.showRow(row)
 
+    def show_only_rows(self, rows: Iterable[int]) -> None:
+        """Hides every row but those given, e.g. the rows flagged by the audio QC report."""
+        rows = set(rows)
+        for row in range(self.rowCount()):
+            self.setRowHidden(row, row not in rows)
+
     def filter_rows(self, string: str) -> None:
         # self.setSortingEnabled(False)
-        self.show_all_rows()
-        for row in range(self.rowCount()):
-            if string.lower() not in self.get_cell_value(row, TABLE_COLUMNS['Transcription']).lower() and \
-                    string.lower() not in self.get_cell_value(row, TABLE_COLUMNS['Translation']).lower():
-                self.hideRow(row)
+        with perf_span('Filter'):
+            self.show_all_rows()
+            for row in range(self.rowCount()):
+                if string.lower() not in self.get_cell_value(row, TABLE_COLUMNS['Transcription']).lower() and \
+                        string.lower() not in self.get_cell_value(row, TABLE_COLUMNS['Translation']).lower():
+                    self.hideRow(row)
 
     def get_cell_value(self, row: int, column: int) -> str:
         return self.item(row, column).text()
@@ -94,6 +104,8 @@ class FilterTable(QWidget):
         self.table = TranslationTableWidget(max(len(data.transcriptions),
                                                 len(data.translations)),
                                             self.data)
+        # Index of the rows' clips within the source media, built when first needed (see get_time_index).
+        self.time_index = None
         self.init_ui()
 
     def init_ui(self) -> None:
@@ -106,6 +118,17 @@ class FilterTable(QWidget):
         self.layout.addWidget(self.filter_field, 1, 1, 1, 2)
         filter_clear_button = FilterClearButtonWidget('Clear', self.filter_field)
         self.layout.addWidget(filter_clear_button, 1, 3, 1, 1)
+        self.time_field = QLineEdit()
+        self.time_field.setPlaceholderText('Go to time, e.g. 12:30')
+        self.time_field.setToolTip('Enter a time in the source media to find the row heard then (e.g. 12:30),\n'
+                                   'or a range to show only the rows within it (e.g. 12:30-13:10)')
+        self.time_field.returnPressed.connect(self.on_time_entered)
+        self.layout.addWidget(self.time_field, 1, 4, 1, 1)
+        play_context_button = QPushButton('Play Context')
+        play_context_button.setToolTip(f'Play the selected row with {CONTEXT_MS // 1000} seconds of the source media '
+                                       f'either side')
+        play_context_button.clicked.connect(self.on_click_play_context)
+        self.layout.addWidget(play_context_button, 1, 5, 1, 1)
         add_row_button = QPushButton('Add Row')
         add_row_button.setToolTip('Left click to add a new blank row to the table')
         add_row_button.clicked.connect(self.add_blank_row)
@@ -134,12 +157,28 @@ class FilterTable(QWidget):
         SelectorCellWidget(row, self.status_bar, self.table)
 
     def populate_table(self, transcriptions: List[Transcription]) -> None:
-        for row in range(len(transcriptions)):
-            self.populate_table_row(row)
-            # Update image preview buttons if needed
-            if transcriptions[row].image:
-                self.table.cellWidget(row, TABLE_COLUMNS['Image']).swap_icon_yes()
-        self.table.sort_by_index()
+        self.time_index = None
+        with perf_span('Table populate'):
+            for row in range(len(transcriptions)):
+                self.populate_table_row(row)
+                # Update image preview buttons if needed
+                if transcriptions[row].image:
+                    self.table.cellWidget(row, TABLE_COLUMNS['Image']).swap_icon_yes()
+            self.table.sort_by_index()
+        perf_count('Rows populated', len(transcriptions))
+
+    def append_transcriptions(self, transcriptions: List[Transcription]) -> None:
+        """Adds a batch of new transcriptions (e.g. streamed from an import) to the end of the data and table."""
+        first_row = self.table.rowCount()
+        self.data.transcriptions.extend(transcriptions)
+        self.time_index = None
+        with perf_span('Table populate'):
+            self.table.setUpdatesEnabled(False)
+            self.table.setRowCount(first_row + len(transcriptions))
+            for row in range(first_row, self.table.rowCount()):
+                self.populate_table_row(row)
+            self.table.setUpdatesEnabled(True)
+        perf_count('Rows populated', len(transcriptions))
 
     def on_click_select_all(self) -> None:
         if self.all_selected():
@@ -158,6 +197,78 @@ class FilterTable(QWidget):
                 return False
         return True
 
+    def source_span(self, row: int) -> Union[None, Tuple[float, float]]:
+        """:return: the start and end of the row's clip of the source media, None if it has none (e.g. recorded)."""
+        sample = self.data.transcriptions[row].sample
+        if not sample or sample.audio_file is None or sample.start is None or sample.end is None:
+            return None
+        return sample.start, sample.end
+
+    def get_time_index(self) -> IntervalIndex:
+        """Indexes the clip of each row cut from the source media (rather than recorded) by its time."""
+        if self.time_index is None:
+            spans = {row: self.source_span(row) for row in range(len(self.data.transcriptions))}
+            rows = [row for row, span in spans.items() if span is not None]
+            self.time_index = IntervalIndex([spans[row] for row in rows], rows)
+        return self.time_index
+
+    def invalidate_time_index(self) -> None:
+        """Drops the time index, to be rebuilt when next used. Call whenever a row's sample is replaced."""
+        self.time_index = None
+
+    def show_row(self, row: int) -> None:
+        self.table.setRowHidden(row, False)
+        self.table.selectRow(row)
+        self.table.scrollToItem(self.table.item(row, TABLE_COLUMNS['Transcription']))
+
+    def on_time_entered(self) -> None:
+        text = self.time_field.text()
+        if not text.strip():
+            self.table.show_all_rows()
+            return
+        try:
+            start, end = parse_time_range(text)
+        except ValueError as error:
+            self.status_bar.showMessage(str(error), 5000)
+            return
+        time_index = self.get_time_index()
+        if not len(time_index):
+            self.status_bar.showMessage('No rows have audio from the source media', 5000)
+        elif start == end:
+            row = time_index.nearest(start)
+            self.show_row(row)
+            span = self.source_span(row)
+            if span is not None:
+                self.status_bar.showMessage(f'Row {row} at {format_time(span[0])}-{format_time(span[1])}', 5000)
+        else:
+            rows = [row for row in time_index.overlapping(start, end) if self.source_span(row) is not None]
+            self.table.show_only_rows(rows)
+            if rows:
+                self.show_row(rows[0])
+            self.status_bar.showMessage(f'{len(rows)} rows between {format_time(start)} and {format_time(end)}, '
+                                        f'clear the time to show all rows')
+
+    def get_context_clip(self, row: int) -> Union[None, AudioClip]:
+        """:return: the row's clip of the source media with CONTEXT_MS either side, or None if it has none."""
+        span = self.source_span(row)
+        if span is None:
+            return None
+        start, end = span
+        return self.data.transcriptions[row].sample.audio_file[max(start - CONTEXT_MS, 0):end + CONTEXT_MS]
+
+    def on_click_play_context(self) -> None:
+        from pygame import mixer
+        row = self.table.currentRow()
+        clip = self.get_context_clip(row) if 0 <= row < len(self.data.transcriptions) else None
+        if clip is None:
+            self.status_bar.showMessage('Select a row with audio from the source media to play its context', 5000)
+            return
+        context_path = os.path.join(self.data.get_temp_file(), 'context.wav')
+        clip.export(context_path, format='wav')
+        mixer.init()
+        # Sound reads the file in full, so it can be overwritten by the next context played.
+        mixer.Sound(context_path).play()
+
     def add_blank_row(self):
         new_row_index = self.table.rowCount()
         self.table.insertRow(new_row_index)
@@ -167,6 +278,7 @@ class FilterTable(QWidget):
 
     def clear_table(self):
         self.table.setRowCount(0)
+        self.time_index = None
 
 
 class SelectorCellWidget(QWidget):
@@ -224,6 +336,7 @@ class PreviewButtonWidget(QPushButton):
         self.right_click.connect(self.open_record_window)
 
     def play_sample(self, transcription: Transcription) -> None:
+        from pygame import mixer
         if transcription.sample:
             sample_file_path = transcription.sample.get_sample_file_path()
             mixer.init()
@@ -242,10 +355,14 @@ class PreviewButtonWidget(QPushButton):
         record_window = RecordWindow(self.parent,
                                      self.transcription,
                                      self.parent.data,
-                                     self.update_icon,
+                                     self.on_sample_changed,
                                      self.parent.settings)
         record_window.show()
 
+    def on_sample_changed(self):
+        self.update_icon()
+        self.parent.invalidate_time_index()
+
     def update_icon(self):
         if self.transcription and self.transcription.sample:
             image_icon = QIcon(resource_path('./img/play.png'))
@@ -305,15 +422,16 @@ class ImageButtonWidget(QPushButton):
         self.swap_icon_no()
 
     def on_click_image(self, row: int) -> None:
+        from PIL import Image
         image_path = open_image_dialogue()
         if image_path:
             TABLE_LOGGER.info(f"Image Path Loaded: {image_path}")
             # Resize Image to 400x300 for OPIE.
-            with PIL.Image.open(image_path) as image:
+            with Image.open(image_path) as image:
                 width, height = image.size
                 if width != 400 or height != 300:
                     image = image.resize((400, 300),
-                                         resample=PIL.Image.ANTIALIAS)
+                                         resample=Image.ANTIALIAS)
                     image_path = self.save_resized_image(image_path, image)
             self.transcription.image = image_path
             TABLE_LOGGER.info(f"Image Path Saved for Transcription: {self.transcription.image}")
@@ -323,7 +441,7 @@ class ImageButtonWidget(QPushButton):
         else:
             self.table.cellWidget(row, TABLE_COLUMNS['Image']).swap_icon_no()
 
-    def save_resized_image(self, path: str, image: PIL.Image) -> str:
+    def save_resized_image(self, path: str, image: 'PIL.Image.Image') -> str:
         image_dir = os.path.dirname(path)
         image_name = os.path.splitext(os.path.basename(path))
         new_image_name = image_name[0] + "_resized" + image_name[1]
@@ -365,6 +483,8 @@ class FilterClearButtonWidget(QPushButton):
 
     def clear_filter(self) -> None:
         self.field.setText('')
+        # Rows may also be hidden by other filters (see show_only_rows), which leave the field empty.
+        self.field.table.show_all_rows()
 
 
 class TableIndexCell(QTableWidgetItem):
@@ -0,0 +1,198 @@
+import time
+import numpy as np
+from PyQt5.QtWidgets import QSizePolicy, QWidget
+from PyQt5.QtGui import QColor, QMouseEvent, QPainter, QPaintEvent, QWheelEvent
+from PyQt5.QtCore import QLineF, QRectF, QSize, Qt, QThread, pyqtSignal
+from typing import Union
+from audio.pcm import PCMClip
+from audio.peaks import PeakPyramid, clip_peaks
+from audio.processing import SILENCE_FLOOR
+from audio.qc import CLIP_LEVEL
+
+
+# Zoom factor applied per wheel step.
+ZOOM_STEP = 1.25
+# Range of the level meter in dBFS.
+METER_FLOOR = -60
+METER_WARNING = -6
+# How long the level meter holds its peak, in seconds.
+PEAK_HOLD = 1.5
+
+WAVEFORM_COLOUR = QColor(60, 110, 180)
+CLIPPED_COLOUR = QColor(200, 40, 40)
+SELECTION_COLOUR = QColor(255, 210, 60, 90)
+
+
+class WaveformWidget(QWidget):
+    """
+    Draws a clip from its PeakPyramid. Scroll to zoom around the cursor, drag to pan and double click to show the
+    whole clip. A selection (e.g. the sample's span of its source media) can be highlighted.
+    """
+
+    def __init__(self, parent: QWidget = None) -> None:
+        super().__init__(parent)
+        self.pyramid = None
+        self.clip = None
+        self.view_start = 0
+        self.view_end = 0
+        self.selection = None
+        self.drag_x = None
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.setMinimumHeight(60)
+
+    def sizeHint(self) -> QSize:
+        return QSize(400, 80)
+
+    def set_source(self, pyramid: Union[None, PeakPyramid], clip: PCMClip = None) -> None:
+        """
+        :param pyramid: peaks of the clip to show, or None to clear the view.
+        :param clip: the clip itself, if to hand, for sample accurate drawing when zoomed right in.
+        """
+        self.pyramid = pyramid
+        self.clip = clip if isinstance(clip, PCMClip) else None
+        self.selection = None
+        self.show_all()
+
+    def millisecond_to_frame(self, millisecond: float) -> int:
+        return int(round(millisecond * self.pyramid.frame_rate / 1000))
+
+    def set_selection(self, start: float, end: float) -> None:
+        """Highlights [start, end), in milliseconds."""
+        if self.pyramid:
+            self.selection = (self.millisecond_to_frame(start), self.millisecond_to_frame(end))
+            self.update()
+
+    def set_view(self, start: float, end: float) -> None:
+        """Shows [start, end), in milliseconds."""
+        if self.pyramid:
+            self.set_view_frames(self.millisecond_to_frame(start), self.millisecond_to_frame(end))
+
+    def set_view_frames(self, start: int, end: int) -> None:
+        # Zoom in no further than a frame per pixel.
+        length = min(max(end - start, self.width(), 1), self.pyramid.frame_count)
+        start = min(max(start, 0), self.pyramid.frame_count - length)
+        self.view_start, self.view_end = start, start + length
+        self.update()
+
+    def show_all(self) -> None:
+        if self.pyramid:
+            self.set_view_frames(0, self.pyramid.frame_count)
+        else:
+            self.update()
+
+    def x_to_frame(self, x: float) -> float:
+        return self.view_start + x * (self.view_end - self.view_start) / max(self.width(), 1)
+
+    def frame_to_x(self, frame: float) -> float:
+        return (frame - self.view_start) * self.width() / max(self.view_end - self.view_start, 1)
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.white)
+        middle = self.height() / 2
+        painter.setPen(Qt.lightGray)
+        painter.drawLine(QLineF(0, middle, self.width(), middle))
+        if not self.pyramid or self.pyramid.frame_count == 0:
+            return
+        if self.selection:
+            left = self.frame_to_x(self.selection[0])
+            painter.fillRect(QRectF(left, 0, self.frame_to_x(self.selection[1]) - left, self.height()),
+                             SELECTION_COLOUR)
+        peaks = self.pyramid.peaks(self.view_start, self.view_end, self.width(), self.clip)
+        tops = middle - peaks[:, 1] * middle
+        bottoms = middle - peaks[:, 0] * middle
+        clipped = np.maximum(-peaks[:, 0], peaks[:, 1]) >= CLIP_LEVEL
+        for colour, columns in ((WAVEFORM_COLOUR, np.flatnonzero(~clipped)), (CLIPPED_COLOUR, np.flatnonzero(clipped))):
+            painter.setPen(colour)
+            painter.drawLines([QLineF(x, tops[x], x, bottoms[x] + 1) for x in columns.tolist()])
+
+    def wheelEvent(self, event: QWheelEvent) -> None:
+        if not self.pyramid:
+            return
+        scale = ZOOM_STEP ** (-event.angleDelta().y() / 120)
+        anchor = self.x_to_frame(event.pos().x())
+        self.set_view_frames(int(anchor - (anchor - self.view_start) * scale),
+                             int(anchor + (self.view_end - anchor) * scale))
+
+    def mousePressEvent(self, event: QMouseEvent) -> None:
+        if event.button() == Qt.LeftButton:
+            self.drag_x = event.pos().x()
+
+    def mouseMoveEvent(self, event: QMouseEvent) -> None:
+        if self.drag_x is None or not self.pyramid:
+            return
+        shift = int(self.x_to_frame(self.drag_x) - self.x_to_frame(event.pos().x()))
+        self.drag_x = event.pos().x()
+        self.set_view_frames(self.view_start + shift, self.view_end + shift)
+
+    def mouseReleaseEvent(self, event: QMouseEvent) -> None:
+        self.drag_x = None
+
+    def mouseDoubleClickEvent(self, event: QMouseEvent) -> None:
+        self.show_all()
+
+
+class PeakWorker(QThread):
+    """
+    Builds the peak pyramid of an in-memory clip (see clip_peaks) off the GUI thread, as for long source media it
+    takes a while. Later requests for the same clip are then answered from the cache straight away.
+    """
+
+    pyramid_ready = pyqtSignal(object)
+
+    def __init__(self, clip) -> None:
+        QThread.__init__(self)
+        self.clip = clip
+
+    def run(self) -> None:
+        self.pyramid_ready.emit(clip_peaks(self.clip))
+
+
+class LevelMeterWidget(QWidget):
+    """
+    Horizontal input level meter (dBFS) with a peak hold marker, which turns red if the input clips.
+    """
+
+    def __init__(self, parent: QWidget = None) -> None:
+        super().__init__(parent)
+        self.level = SILENCE_FLOOR
+        self.peak = SILENCE_FLOOR
+        self.peak_time = 0
+        self.clipped = False
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.setMinimumHeight(12)
+
+    def sizeHint(self) -> QSize:
+        return QSize(200, 14)
+
+    def set_level(self, level: float) -> None:
+        """:param level: peak level in dBFS of the latest buffer of input."""
+        now = time.monotonic()
+        self.level = level
+        if level >= self.peak or now - self.peak_time > PEAK_HOLD:
+            self.peak = level
+            self.peak_time = now
+        self.clipped = self.clipped or level >= 20 * np.log10(CLIP_LEVEL)
+        self.update()
+
+    def reset(self) -> None:
+        self.level = self.peak = SILENCE_FLOOR
+        self.clipped = False
+        self.update()
+
+    def level_to_x(self, level: float) -> float:
+        return (min(max(level, METER_FLOOR), 0) - METER_FLOOR) / -METER_FLOOR * self.width()
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.darkGray)
+        warning_x = self.level_to_x(METER_WARNING)
+        level_x = self.level_to_x(self.level)
+        painter.fillRect(QRectF(0, 0, min(level_x, warning_x), self.height()), Qt.green)
+        if level_x > warning_x:
+            painter.fillRect(QRectF(warning_x, 0, level_x - warning_x, self.height()), Qt.yellow)
+        painter.setPen(CLIPPED_COLOUR if self.clipped else Qt.white)
+        peak_x = self.level_to_x(self.peak)
+        painter.drawLine(QLineF(peak_x, 0, peak_x, self.height()))
+        if self.clipped:
+            painter.fillRect(QRectF(self.width() - 6, 0, 6, self.height()), CLIPPED_COLOUR)
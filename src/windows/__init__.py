@@ -1,5 +1,9 @@
 from .about import *
 from .primary import *
 from .record import *
+from .batch_record import *
+from .qc import *
 from .settings import *
 from .manifest import *
+from .performance import *
+from .search import *
@@ -0,0 +1,193 @@
+import os
+from PyQt5.QtWidgets import QCheckBox, QDialog, QGridLayout, QLabel, QPushButton, QShortcut, QWidget
+from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtGui import QCloseEvent, QIcon, QKeySequence
+from typing import Union
+from audio.pcm import PCMClip
+from audio.peaks import PeakPyramid
+from datatypes import AppSettings
+from utilities.files import resource_path
+from utilities.logger import setup_custom_logger
+from utilities.record import ContinuousRecorder
+from widgets.table import FilterTable, TABLE_COLUMNS
+from widgets.waveform import LevelMeterWidget, WaveformWidget
+
+
+LOG_BATCH_RECORD = setup_custom_logger("Batch Record Window")
+
+
+class BatchRecordWindow(QDialog):
+    """
+    Records audio for many rows in one session, keeping the microphone open and moving to the next row as each clip
+    is cut (on silence or with the split hotkey). Clips are written straight into the project's audio assets.
+    """
+
+    def __init__(self,
+                 parent: QWidget,
+                 filter_table: FilterTable,
+                 assets_audio_path: str,
+                 settings: AppSettings) -> None:
+        super().__init__(parent)
+        self.filter_table = filter_table
+        self.table = filter_table.table
+        self.transcriptions = filter_table.data.transcriptions
+        self.assets_audio_path = assets_audio_path
+        self.settings = settings
+        self.layout = QGridLayout()
+        self.position_label = QLabel()
+        self.transcription_label = QLabel()
+        self.translation_label = QLabel()
+        self.level_meter = LevelMeterWidget()
+        self.last_clip_waveform = WaveformWidget()
+        self.split_on_silence = QCheckBox('Split on silence')
+        self.skip_recorded = QCheckBox('Skip rows with audio')
+        self.record_button = QPushButton('Start')
+        self.previous_button = QPushButton('Previous')
+        self.next_button = QPushButton('Next')
+        self.split_button = QPushButton('Split (Space)')
+        # Only rows shown by the current table filter are recorded.
+        self.rows = [row for row in range(self.table.rowCount()) if not self.table.isRowHidden(row)]
+        self.position = 0
+        self.recorder = None
+        self.init_ui()
+        self.skip_to_unrecorded(1)
+        self.show_row()
+
+    def init_ui(self) -> None:
+        self.setWindowTitle('Batch Record')
+        self.setMinimumWidth(400)
+
+        self.position_label.setAlignment(Qt.AlignCenter)
+        self.layout.addWidget(self.position_label, 0, 0, 1, 4)
+        self.transcription_label.setAlignment(Qt.AlignCenter)
+        self.layout.addWidget(self.transcription_label, 1, 0, 1, 4)
+        self.translation_label.setAlignment(Qt.AlignCenter)
+        self.layout.addWidget(self.translation_label, 2, 0, 1, 4)
+
+        self.layout.addWidget(self.level_meter, 3, 0, 1, 4)
+
+        self.split_on_silence.setChecked(True)
+        self.split_on_silence.setToolTip('Cut each clip and move on automatically when you stop speaking.\n'
+                                         'When unticked, press Space to finish each clip.')
+        self.split_on_silence.stateChanged.connect(self.on_toggle_split_on_silence)
+        self.layout.addWidget(self.split_on_silence, 4, 0, 1, 2)
+        self.skip_recorded.setChecked(True)
+        self.skip_recorded.setToolTip('Step over rows which already have audio.')
+        self.layout.addWidget(self.skip_recorded, 4, 2, 1, 2)
+
+        self.record_button.setIcon(QIcon(resource_path('./img/icon-record-96.png')))
+        self.record_button.setIconSize(QSize(32, 32))
+        self.record_button.setToolTip('Start or pause the recording session.')
+        self.record_button.clicked.connect(self.on_click_record)
+        self.previous_button.clicked.connect(lambda: self.step_row(-1))
+        self.next_button.clicked.connect(lambda: self.step_row(1))
+        self.split_button.setToolTip('Finish the current clip now.')
+        self.split_button.clicked.connect(self.on_click_split)
+        for column, button in enumerate([self.record_button, self.previous_button,
+                                         self.next_button, self.split_button]):
+            # Keep focus off the buttons so Space always splits rather than pressing the focused button.
+            button.setFocusPolicy(Qt.NoFocus)
+            self.layout.addWidget(button, 5, column, 1, 1)
+        self.last_clip_waveform.setToolTip('The last clip recorded.')
+        self.layout.addWidget(self.last_clip_waveform, 6, 0, 1, 4)
+        QShortcut(QKeySequence(Qt.Key_Space), self, self.on_click_split)
+
+        self.setLayout(self.layout)
+        LOG_BATCH_RECORD.debug("Batch Record Window initialised.")
+
+    @property
+    def current_row(self) -> Union[int, None]:
+        if self.position < len(self.rows):
+            return self.rows[self.position]
+        return None
+
+    def has_audio(self, row: int) -> bool:
+        return bool(self.transcriptions[row].sample)
+
+    def skip_to_unrecorded(self, step: int) -> None:
+        """Moves (from the current row) in the direction of step past rows with audio, if those are skipped."""
+        if not self.skip_recorded.isChecked():
+            return
+        while 0 <= self.position < len(self.rows) and self.has_audio(self.rows[self.position]):
+            self.position += step
+        self.position = max(self.position, 0)
+
+    def step_row(self, step: int) -> None:
+        self.position = min(max(self.position + step, 0), len(self.rows))
+        self.skip_to_unrecorded(step)
+        self.show_row()
+        if self.recorder:
+            self.recorder.restart_take()
+
+    def show_row(self) -> None:
+        row = self.current_row
+        self.previous_button.setEnabled(self.position > 0)
+        self.next_button.setEnabled(row is not None)
+        self.split_button.setEnabled(row is not None)
+        if row is None:
+            self.position_label.setText(f'All {len(self.rows)} rows done.')
+            self.transcription_label.setText('')
+            self.translation_label.setText('')
+            if self.recorder and self.recorder.recording:
+                self.on_click_record()
+            return
+        transcription = self.transcriptions[row]
+        recorded = ' (has audio)' if self.has_audio(row) else ''
+        self.position_label.setText(f'Row {self.position + 1} of {len(self.rows)}{recorded}')
+        self.transcription_label.setText(f'<h2>{transcription.transcription}</h2>')
+        self.translation_label.setText(transcription.translation or '')
+        self.table.selectRow(row)
+
+    def on_click_record(self) -> None:
+        if not self.recorder:
+            self.recorder = ContinuousRecorder(self.settings, self.split_on_silence.isChecked())
+            self.recorder.clip_ready.connect(self.on_clip_ready)
+            self.recorder.level.connect(self.on_level)
+            self.recorder.start()
+        elif self.recorder.recording:
+            self.recorder.pause()
+            self.level_meter.reset()
+        else:
+            self.recorder.resume()
+        recording = self.recorder.recording
+        self.record_button.setText('Pause' if recording else 'Resume')
+
+    def on_click_split(self) -> None:
+        if self.recorder and self.recorder.recording and self.current_row is not None:
+            self.recorder.split()
+
+    def on_toggle_split_on_silence(self) -> None:
+        if self.recorder:
+            self.recorder.split_on_silence = self.split_on_silence.isChecked()
+            self.recorder.restart_take()
+
+    def on_level(self, level: float) -> None:
+        self.level_meter.set_level(level)
+
+    def on_clip_ready(self, clip: PCMClip) -> None:
+        row = self.current_row
+        if row is None:
+            return
+        transcription = self.transcriptions[row]
+        # Named by id as utilities.record does, transcriptions may hold characters that can't go in a file name.
+        path = os.path.join(self.assets_audio_path, f'{transcription.id}.wav')
+        # The row's sample is replaced by the recording, and no longer has a time in the source media.
+        self.filter_table.invalidate_time_index()
+        try:
+            clip.export(path, format='wav')
+            transcription.set_blank_sample()
+            transcription.sample.set_sample(path)
+        except OSError as error:
+            transcription.sample = None
+            LOG_BATCH_RECORD.error(f"Could not save audio for row {row}: {error}")
+            return
+        LOG_BATCH_RECORD.info(f"Recorded {clip.duration_seconds:.2f}s for row {row}: {path}")
+        self.table.cellWidget(row, TABLE_COLUMNS['Audio']).update_icon()
+        self.last_clip_waveform.set_source(PeakPyramid.from_clip(clip), clip)
+        self.step_row(1)
+
+    def closeEvent(self, event: QCloseEvent) -> None:
+        if self.recorder:
+            self.recorder.stop()
+            self.recorder = None
+        event.accept()
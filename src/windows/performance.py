@@ -0,0 +1,94 @@
+from PyQt5.QtWidgets import QDialog, QFileDialog, QGridLayout, QHeaderView, QLabel, QPushButton, QTableWidget, \
+    QWidget
+from perf import PERF
+from utilities.logger import setup_custom_logger
+from widgets.formatting import numeric_item
+from windows.about import VERSION
+
+
+LOG_PERFORMANCE_WINDOW = setup_custom_logger("Performance Window")
+
+TIMER_COLUMNS = ['Operation', 'Count', 'Total (ms)', 'Mean (ms)', 'Max (ms)']
+SPAN_COLUMNS = ['Span', 'Within', 'Thread', 'Start (ms)', 'Duration (ms)']
+
+
+def set_row(table: QTableWidget, row: int, values: list) -> None:
+    for column, value in enumerate(values):
+        table.setItem(row, column, numeric_item(round(value, 1) if isinstance(value, float) else value))
+
+
+class PerformanceWindow(QDialog):
+    """
+    Where the time has gone this session: the timers and counters of the instrumented operations (import, table,
+    save and export) and the latest spans. The report can be saved as JSON to attach to a bug report.
+    """
+
+    def __init__(self, parent: QWidget) -> None:
+        super().__init__(parent)
+        self.layout = QGridLayout()
+        self.summary = QLabel()
+        self.timer_table = QTableWidget(0, len(TIMER_COLUMNS))
+        self.span_table = QTableWidget(0, len(SPAN_COLUMNS))
+        self.init_ui()
+
+    def init_ui(self) -> None:
+        self.setWindowTitle('Performance')
+        self.setMinimumSize(800, 500)
+        self.layout.addWidget(self.summary, 0, 0, 1, 4)
+        for row, (table, columns) in enumerate(((self.timer_table, TIMER_COLUMNS),
+                                                (self.span_table, SPAN_COLUMNS)), start=1):
+            table.setHorizontalHeaderLabels(columns)
+            table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+            table.verticalHeader().hide()
+            table.setEditTriggers(QTableWidget.NoEditTriggers)
+            self.layout.addWidget(table, row, 0, 1, 4)
+        refresh_button = QPushButton('Refresh')
+        refresh_button.clicked.connect(self.populate)
+        self.layout.addWidget(refresh_button, 3, 0, 1, 1)
+        reset_button = QPushButton('Reset')
+        reset_button.setToolTip('Clear the timings so far, e.g. before repeating a slow operation')
+        reset_button.clicked.connect(self.on_click_reset)
+        self.layout.addWidget(reset_button, 3, 1, 1, 1)
+        save_button = QPushButton('Save Report')
+        save_button.setToolTip('Save the report as a .json file to attach to a bug report')
+        save_button.clicked.connect(self.on_click_save)
+        self.layout.addWidget(save_button, 3, 2, 1, 1)
+        close_button = QPushButton('Close')
+        close_button.clicked.connect(self.close)
+        self.layout.addWidget(close_button, 3, 3, 1, 1)
+        self.setLayout(self.layout)
+        self.populate()
+
+    def populate(self) -> None:
+        report = PERF.report(VERSION)
+        self.summary.setText(f'Session started {report["started"]}, {report["duration_s"]:.0f} s ago. '
+                             f'Showing the latest {len(report["spans"])} spans.')
+        timers = report['timers']
+        counters = report['counters']
+        self.timer_table.setSortingEnabled(False)
+        self.timer_table.setRowCount(len(timers) + len(counters))
+        for row, (name, timer) in enumerate(timers.items()):
+            set_row(self.timer_table, row, [name, timer['count'], timer['total_ms'], timer['mean_ms'],
+                                            timer['max_ms']])
+        for row, (name, count) in enumerate(counters.items(), start=len(timers)):
+            set_row(self.timer_table, row, [name, count])
+        self.timer_table.setSortingEnabled(True)
+        self.timer_table.resizeColumnsToContents()
+
+        spans = report['spans'][::-1]
+        self.span_table.setRowCount(len(spans))
+        for row, span in enumerate(spans):
+            set_row(self.span_table, row, [span['name'], span['parent'] or '', span['thread'], span['start_ms'],
+                                           span['duration_ms']])
+        self.span_table.resizeColumnsToContents()
+
+    def on_click_reset(self) -> None:
+        PERF.reset()
+        self.populate()
+
+    def on_click_save(self) -> None:
+        path, _ = QFileDialog.getSaveFileName(self, 'Save Performance Report', 'hermes_performance.json',
+                                              'JSON Files (*.json)')
+        if path:
+            PERF.write_report(path, VERSION)
+            LOG_PERFORMANCE_WINDOW.info(f"Performance report saved: {path}")
@@ -1,15 +1,25 @@
 import math
-import pydub
+import os
+import sqlite3
 import webbrowser
-from PyQt5.QtWidgets import QProgressBar, QApplication, QMainWindow, QAction, QMessageBox
+from PyQt5.QtWidgets import QProgressBar, QApplication, QMainWindow, QAction, QMessageBox, QPushButton
+from PyQt5.QtGui import QCloseEvent
 from typing import Union
+from audio.encode import set_ffmpeg
 from datatypes import AppSettings, OperationMode
-from utilities.logger import setup_custom_logger
+from perf import ProfilerCapture
+from utilities import open_audio_dialogue
+from utilities.logger import get_log_path, setup_custom_logger
+from utilities.search import ProjectSearchIndex
 from utilities.settings import load_system_settings, system_settings_exist, save_system_settings
 from widgets.session import SessionManager
 from widgets.converter import ConverterWidget
+from widgets.warning import WarningMessage
 from windows.about import AboutWindow, ONLINE_DOCS
+from windows.batch_record import BatchRecordWindow
+from windows.performance import PerformanceWindow
 from windows.project import ProjectDetailsWindow
+from windows.search import SearchWindow
 from windows.settings import SettingsWindow
 
 
@@ -32,6 +42,10 @@ class ProgressBarWidget(QProgressBar):
         self.setValue(math.ceil(value * 100))
         self.app.processEvents()
 
+    def set_progress(self, value: Union[float, int]) -> None:
+        """Updates progress without pumping the event loop, for progress reported from worker threads."""
+        self.setValue(math.ceil(value * 100))
+
 
 class PrimaryWindow(QMainWindow):
     """
@@ -44,9 +58,11 @@ class PrimaryWindow(QMainWindow):
         self.title = 'Hermes: The Language Resource Creator'
         self.converter = None
         self.progress_bar = None
+        self.cancel_button = None
         self.table_menu = None
         self.settings = None
         self.session = None
+        self.profiler = ProfilerCapture()
         self.bar = self.menuBar()
         self.init_ui()
         self.init_menu()
@@ -54,10 +70,12 @@ class PrimaryWindow(QMainWindow):
     def init_ui(self) -> None:
         self.setWindowTitle(self.title)
         self.progress_bar = ProgressBarWidget(self.app)
+        self.cancel_button = QPushButton('Cancel')
+        self.cancel_button.setToolTip('Stop the running import or audio check, rows already imported are kept')
         if system_settings_exist():
             self.settings = load_system_settings()
             if self.settings.ffmpeg_location:
-                pydub.AudioSegment.converter = self.settings.ffmpeg_location
+                set_ffmpeg(self.settings.ffmpeg_location)
         else:
             self.settings = AppSettings()
         self.session = SessionManager(self)
@@ -67,6 +85,9 @@ class PrimaryWindow(QMainWindow):
         self.setCentralWidget(self.converter)
         self.statusBar().addPermanentWidget(self.progress_bar)
         self.progress_bar.hide()
+        self.cancel_button.clicked.connect(self.on_click_cancel_import)
+        self.statusBar().addPermanentWidget(self.cancel_button)
+        self.cancel_button.hide()
 
     def init_menu(self, save_flag: bool = False) -> None:
         LOG_PRIMARY.debug(f'Menu Bar initialised with save: {save_flag}')
@@ -79,6 +100,13 @@ class PrimaryWindow(QMainWindow):
         open_menu.setShortcut('Ctrl+O')
         file.addAction(open_menu)
 
+        search_menu = QAction('Search Projects', self)
+        search_menu.triggered.connect(self.on_click_search)
+        search_menu.setShortcut('Ctrl+Shift+F')
+        search_menu.setToolTip('Find words in the transcriptions and translations of every project')
+        file.addAction(search_menu)
+        search_menu.setEnabled(ProjectSearchIndex.available())
+
         save_menu = QAction('Save Project', self)
         save_menu.triggered.connect(self.on_click_save)
         save_menu.setShortcut('Ctrl+S')
@@ -126,6 +154,27 @@ class PrimaryWindow(QMainWindow):
         add_row_menu_item.triggered.connect(self.on_click_add_row)
         table_menu.addAction(add_row_menu_item)
 
+        auto_segment_menu_item = QAction('Auto-Segment Recording', self)
+        auto_segment_menu_item.setShortcut('Ctrl+Shift+A')
+        auto_segment_menu_item.setToolTip('Add a row for each word found in a long recording')
+        auto_segment_menu_item.triggered.connect(self.on_click_auto_segment)
+        table_menu.addAction(auto_segment_menu_item)
+        auto_segment_menu_item.setEnabled(save_flag and self.converter.data.mode == OperationMode.SCRATCH)
+
+        batch_record_menu_item = QAction('Batch Record', self)
+        batch_record_menu_item.setShortcut('Ctrl+Shift+R')
+        batch_record_menu_item.setToolTip('Record audio for each row in turn without reopening the recorder')
+        batch_record_menu_item.triggered.connect(self.on_click_batch_record)
+        table_menu.addAction(batch_record_menu_item)
+        batch_record_menu_item.setEnabled(save_flag)
+
+        audio_qc_menu_item = QAction('Audio QC Report', self)
+        audio_qc_menu_item.setShortcut('Ctrl+Shift+Q')
+        audio_qc_menu_item.setToolTip('Check every clip for clipping, noise, silence and level problems')
+        audio_qc_menu_item.triggered.connect(self.on_click_audio_qc)
+        table_menu.addAction(audio_qc_menu_item)
+        audio_qc_menu_item.setEnabled(save_flag)
+
         help_menu = self.bar.addMenu('Help')
         about_menu_item = QAction('About', self)
         about_menu_item.setShortcut('Ctrl+A')
@@ -137,16 +186,73 @@ class PrimaryWindow(QMainWindow):
         online_help_item.triggered.connect(self.on_click_online_help)
         help_menu.addAction(online_help_item)
 
+        performance_item = QAction('Performance', self)
+        performance_item.setToolTip('Show where time has gone this session, and save it for a bug report')
+        performance_item.triggered.connect(self.on_click_performance)
+        help_menu.addAction(performance_item)
+
+        profiler_item = QAction('Profiler', self)
+        profiler_item.setShortcut('Ctrl+Shift+P')
+        profiler_item.setToolTip('Profile the app (slowing it down) until unchecked, then save the profile to the '
+                                 'project\'s logs folder')
+        profiler_item.setCheckable(True)
+        profiler_item.setChecked(self.profiler.running)
+        profiler_item.toggled.connect(self.on_toggle_profiler)
+        help_menu.addAction(profiler_item)
+
     def on_click_quit(self) -> None:
         if self.converter.components.table:
             if not self.query_save_and_progress():
                 return
         self.close()
 
+    def closeEvent(self, event: QCloseEvent) -> None:
+        # Worker threads still running when the app exits would abort it, so stop them (keeping what they've done).
+        self.converter.cancel_import()
+        self.converter.cancel_audio_qc()
+        self.session.end_autosave()
+        event.accept()
+
     def on_click_about(self) -> None:
         about = AboutWindow(self)
         about.show()
 
+    def on_click_performance(self) -> None:
+        PerformanceWindow(self).show()
+
+    def on_toggle_profiler(self, checked: bool) -> None:
+        if checked:
+            self.profiler.start()
+            self.statusBar().showMessage('Profiling, press Ctrl+Shift+P again to stop and save the profile')
+            LOG_PRIMARY.info('Profiler started.')
+        else:
+            self.stop_profiler()
+
+    def stop_profiler(self) -> None:
+        """Stops a running profiler, saving the profile to the open project's logs folder (or else the app's)."""
+        if not self.profiler.running:
+            return
+        if self.session and self.session.project_path:
+            folder = os.path.join(self.session.project_path, 'logs')
+        else:
+            folder = os.path.join(get_log_path(), 'profiles')
+        paths = self.profiler.stop(folder)
+        self.statusBar().showMessage(f'Profile saved to {folder}', 10000)
+        LOG_PRIMARY.info(f'Profiler stopped, saved: {", ".join(paths)}')
+
+    def on_click_search(self) -> None:
+        try:
+            search_window = SearchWindow(self, self.settings.project_root_dir)
+        except sqlite3.Error as error:
+            # e.g. the index in the cache is locked by another instance, or corrupt.
+            LOG_PRIMARY.error(f'Unable to open the search index: {error}')
+            warning_message = WarningMessage()
+            warning_message.warning(warning_message, 'Warning',
+                                    'Unable to open the search index, see the log for details.\n',
+                                    QMessageBox.Ok)
+            return
+        search_window.show()
+
     def on_click_settings(self) -> None:
         settings = SettingsWindow(parent=self,
                                   converter=self.converter)
@@ -156,6 +262,8 @@ class PrimaryWindow(QMainWindow):
         if self.converter.components.table:
             if not self.query_save_and_progress():
                 return
+        self.converter.cancel_import()
+        self.converter.cancel_audio_qc()
         self.session.end_autosave()
         self.init_ui()
         self.init_menu()
@@ -165,6 +273,30 @@ class PrimaryWindow(QMainWindow):
         if self.converter.components.table:
             self.converter.components.filter_table.add_blank_row()
 
+    def on_click_auto_segment(self) -> None:
+        if not self.converter.components.table or self.converter.import_worker:
+            return
+        audio_path = open_audio_dialogue()
+        if audio_path:
+            self.converter.start_auto_segment(audio_path)
+
+    def on_click_batch_record(self) -> None:
+        if not self.converter.components.table:
+            return
+        BatchRecordWindow(self,
+                          self.converter.components.filter_table,
+                          self.session.assets_audio_path,
+                          self.settings).show()
+
+    def on_click_audio_qc(self) -> None:
+        if not self.converter.components.table or self.converter.import_worker or self.converter.qc_worker:
+            return
+        self.converter.start_audio_qc()
+
+    def on_click_cancel_import(self) -> None:
+        self.converter.cancel_import(wait=False)
+        self.converter.cancel_audio_qc(wait=False)
+
     def on_click_project_details(self) -> None:
         ProjectDetailsWindow(self, self.session).exec()
 
@@ -176,6 +308,8 @@ class PrimaryWindow(QMainWindow):
         if self.converter.components.table:
             if not self.query_save_and_progress():
                 return
+        self.converter.cancel_import()
+        self.converter.cancel_audio_qc()
         self.converter.data.mode = OperationMode.SCRATCH
         if self.session.open_project():
             self.converter.load_main_hermes_app(self.converter.components,
@@ -0,0 +1,96 @@
+from PyQt5.QtWidgets import QCheckBox, QDialog, QFileDialog, QGridLayout, QHeaderView, QLabel, QPushButton, \
+    QTableWidget, QWidget
+from PyQt5.QtCore import Qt
+from typing import Dict, List
+from audio.qc import ClipReport
+from utilities.logger import setup_custom_logger
+from utilities.qc import QC_REPORT_COLUMNS, qc_report_values, write_qc_report
+from widgets.formatting import numeric_item
+from widgets.table import FilterTable, TABLE_COLUMNS
+
+
+LOG_QC_WINDOW = setup_custom_logger("QC Report Window")
+
+
+class QCReportWindow(QDialog):
+    """
+    Sortable table of the audio QC results. Double click a clip to select its row in the main table, or filter the
+    main table down to the clips with issues.
+    """
+
+    def __init__(self,
+                 parent: QWidget,
+                 filter_table: FilterTable,
+                 reports: Dict[int, ClipReport]) -> None:
+        super().__init__(parent)
+        self.filter_table = filter_table
+        self.transcriptions = filter_table.data.transcriptions
+        self.reports = reports
+        self.layout = QGridLayout()
+        self.report_table = QTableWidget(0, len(QC_REPORT_COLUMNS))
+        self.issues_only = QCheckBox('Only show clips with issues')
+        self.init_ui()
+
+    def init_ui(self) -> None:
+        self.setWindowTitle('Audio QC Report')
+        self.setMinimumSize(900, 400)
+        issue_count = len(self.issue_rows())
+        summary = QLabel(f'{len(self.reports)} clips checked, {issue_count} with issues. '
+                         f'Click a column to sort, double click a clip to find it in the table.')
+        self.layout.addWidget(summary, 0, 0, 1, 4)
+
+        self.report_table.setHorizontalHeaderLabels(QC_REPORT_COLUMNS)
+        self.report_table.horizontalHeader().setSectionResizeMode(QC_REPORT_COLUMNS.index('Issues'),
+                                                                  QHeaderView.Stretch)
+        self.report_table.verticalHeader().hide()
+        self.report_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.report_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.report_table.cellDoubleClicked.connect(self.on_double_click_report)
+        self.populate_report()
+        self.layout.addWidget(self.report_table, 1, 0, 1, 4)
+
+        self.issues_only.stateChanged.connect(self.populate_report)
+        self.layout.addWidget(self.issues_only, 2, 0, 1, 1)
+        filter_button = QPushButton('Filter Table to Issues')
+        filter_button.setToolTip('Show only the rows with audio issues in the main table\n'
+                                 '(clear the table filter to show all rows again)')
+        filter_button.clicked.connect(self.on_click_filter_table)
+        filter_button.setEnabled(issue_count > 0)
+        self.layout.addWidget(filter_button, 2, 1, 1, 1)
+        save_button = QPushButton('Save Report')
+        save_button.setToolTip('Save the report as a .csv file')
+        save_button.clicked.connect(self.on_click_save)
+        self.layout.addWidget(save_button, 2, 2, 1, 1)
+        close_button = QPushButton('Close')
+        close_button.clicked.connect(self.close)
+        self.layout.addWidget(close_button, 2, 3, 1, 1)
+        self.setLayout(self.layout)
+
+    def issue_rows(self) -> List[int]:
+        return [row for row, report in self.reports.items() if report.issues]
+
+    def populate_report(self) -> None:
+        rows = self.issue_rows() if self.issues_only.isChecked() else list(self.reports)
+        self.report_table.setSortingEnabled(False)
+        self.report_table.setRowCount(len(rows))
+        for index, row in enumerate(sorted(rows)):
+            for column, value in enumerate(qc_report_values(row, self.transcriptions[row], self.reports[row])):
+                self.report_table.setItem(index, column, numeric_item(value))
+        self.report_table.setSortingEnabled(True)
+        self.report_table.resizeColumnsToContents()
+
+    def on_double_click_report(self, report_row: int, column: int) -> None:
+        row = self.report_table.item(report_row, QC_REPORT_COLUMNS.index('Row')).data(Qt.DisplayRole)
+        table = self.filter_table.table
+        table.setRowHidden(row, False)
+        table.selectRow(row)
+        table.scrollToItem(table.item(row, TABLE_COLUMNS['Transcription']))
+
+    def on_click_filter_table(self) -> None:
+        self.filter_table.table.show_only_rows(self.issue_rows())
+
+    def on_click_save(self) -> None:
+        path, _ = QFileDialog.getSaveFileName(self, 'Save QC Report', 'qc_report.csv', 'CSV Files (*.csv)')
+        if path:
+            write_qc_report(path, self.transcriptions, self.reports)
+            LOG_QC_WINDOW.info(f"QC report saved: {path}")
@@ -1,17 +1,22 @@
 from PyQt5.QtWidgets import QDialog, QFileDialog, QGridLayout, QLabel, QLayout, QPushButton, QWidget
 from PyQt5.QtCore import Qt, QSize
 from PyQt5.QtGui import QIcon
-from pygame import mixer
-from pygame import error as pygerror
-from utilities.files import resource_path
-from utilities.record import SimpleAudioRecorder
+from PyQt5.QtMultimedia import QAudioBuffer, QAudioProbe, QMediaRecorder
+from audio.peaks import PeakPyramid, load_peaks
+from utilities.files import get_cache_path, resource_path
+from utilities.record import SimpleAudioRecorder, audio_buffer_level
 from utilities.logger import setup_custom_logger
-from datatypes import Transcription, ConverterData, AppSettings
+from widgets.waveform import LevelMeterWidget, PeakWorker, WaveformWidget
+from datatypes import Sample, Transcription, ConverterData, AppSettings
+from functools import partial
 from typing import Callable
 
 
 LOG_RECORD_WINDOW = setup_custom_logger("Record Window")
 
+# Seconds of source media shown either side of an ELAN sample.
+SOURCE_CONTEXT = 2
+
 
 class RecordWindow(QDialog):
     def __init__(self,
@@ -28,12 +33,21 @@ class RecordWindow(QDialog):
         self.layout = QGridLayout()
         self.record_button = QPushButton()
         self.preview_button = QPushButton('Play Audio')
+        self.level_meter = LevelMeterWidget()
+        self.clip_waveform = WaveformWidget()
+        self.source_waveform = None
+        self.peak_worker = None
         self.recording = False
         self.output = None
         self.init_ui()
         self.recorder = SimpleAudioRecorder(self.data,
                                             self.transcription,
                                             self.settings)
+        self.recorder.stateChanged.connect(self.on_recorder_state_changed)
+        self.probe = QAudioProbe(self)
+        self.probe.audioBufferProbed.connect(self.on_audio_buffer)
+        if not self.probe.setSource(self.recorder):
+            LOG_RECORD_WINDOW.warning("Audio probe unavailable, no level meter while recording.")
 
     def init_ui(self) -> None:
         self.setWindowTitle('Record Audio')
@@ -64,6 +78,10 @@ class RecordWindow(QDialog):
         self.layout.addWidget(self.record_button, 1, 0, 1, 9)
         self.layout.setAlignment(self.record_button, Qt.AlignCenter)
 
+        # Live input level while recording
+        self.level_meter.setToolTip("Input level, turns red if the recording clips.")
+        self.layout.addWidget(self.level_meter, 2, 0, 1, 9)
+
         load_button = QPushButton('Load')
         load_button.setIcon(QIcon(resource_path('./img/icon-audio-file-32.png')))
         load_button.setIconSize(QSize(32, 32))
@@ -95,6 +113,22 @@ class RecordWindow(QDialog):
         cancel_button.clicked.connect(self.on_click_cancel)
         self.layout.addWidget(cancel_button, 3, 6, 1, 1)
 
+        # Waveform of the current clip, and of its source media when cut from an ELAN file
+        self.clip_waveform.setToolTip("Scroll to zoom, drag to pan, double click to show the whole clip.")
+        self.layout.addWidget(self.clip_waveform, 4, 0, 1, 9)
+        if self.output:
+            self.show_clip_waveform(self.output)
+        sample = self.transcription.sample
+        if sample and sample.audio_file is not None and sample.start is not None:
+            self.source_waveform = WaveformWidget()
+            self.source_waveform.setToolTip("Source media, with this sample highlighted.")
+            self.layout.addWidget(QLabel('Source media:'), 5, 0, 1, 9)
+            self.layout.addWidget(self.source_waveform, 6, 0, 1, 9)
+            # The waveform is drawn once its peaks are ready, the window is usable in the meantime.
+            self.peak_worker = PeakWorker(sample.audio_file)
+            self.peak_worker.pyramid_ready.connect(partial(self.on_source_peaks, sample))
+            self.peak_worker.start()
+
         self.layout.setSizeConstraint(QLayout.SetFixedSize)
         self.setLayout(self.layout)
 
@@ -104,6 +138,7 @@ class RecordWindow(QDialog):
         """Record after clicking record button once, again to stop."""
         if not self.recording:
             self.recording = True
+            self.level_meter.reset()
             self.recorder.start_recording()
             self.record_button.setIcon(QIcon(resource_path('./img/icon-stop-96_3.png')))
             self.record_button.setIconSize(QSize(96, 96))
@@ -139,8 +174,29 @@ class RecordWindow(QDialog):
             self.__set_audio_sample(self.output)
             self.update_button()
             self.preview_button.setEnabled(True)
+            self.show_clip_waveform(self.output)
             LOG_RECORD_WINDOW.info(f"Audio file loaded: {audio_path}")
 
+    def on_recorder_state_changed(self, state: QMediaRecorder.State) -> None:
+        # The recording is only complete on disk once the recorder has stopped.
+        if state == QMediaRecorder.StoppedState and self.output:
+            self.show_clip_waveform(self.output)
+
+    def on_source_peaks(self, sample: Sample, pyramid: PeakPyramid) -> None:
+        self.source_waveform.set_source(pyramid, sample.audio_file)
+        self.source_waveform.set_selection(sample.start, sample.end)
+        self.source_waveform.set_view(sample.start - SOURCE_CONTEXT * 1000, sample.end + SOURCE_CONTEXT * 1000)
+
+    def on_audio_buffer(self, buffer: QAudioBuffer) -> None:
+        self.level_meter.set_level(audio_buffer_level(buffer))
+
+    def show_clip_waveform(self, path: str) -> None:
+        try:
+            self.clip_waveform.set_source(load_peaks(path, get_cache_path('peaks')))
+        except (OSError, ValueError) as error:
+            self.clip_waveform.set_source(None)
+            LOG_RECORD_WINDOW.error(f"Could not draw waveform for {path}: {error}")
+
     def on_click_save(self) -> None:
         if self.output:
             self.__set_audio_sample(self.output)
@@ -157,6 +213,8 @@ class RecordWindow(QDialog):
             LOG_RECORD_WINDOW.error(f"Could not load audio: {path} / {FileNotFoundError}")
 
     def on_click_preview(self) -> None:
+        from pygame import mixer
+        from pygame import error as pygerror
         if self.output:
             try:
                 LOG_RECORD_WINDOW.debug(f"Previewing Audio: {self.output}")
@@ -168,3 +226,13 @@ class RecordWindow(QDialog):
 
     def on_click_cancel(self) -> None:
         self.close()
+
+    def done(self, result: int) -> None:
+        # The thread can't be stopped part way through, and mustn't outlive the window.
+        if self.peak_worker is not None:
+            self.peak_worker.wait()
+        super().done(result)
+
+    def closeEvent(self, event) -> None:
+        self.done(QDialog.Rejected)
+        super().closeEvent(event)
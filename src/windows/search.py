@@ -0,0 +1,83 @@
+import sqlite3
+import time
+from PyQt5.QtWidgets import QDialog, QGridLayout, QHeaderView, QLabel, QLineEdit, QPushButton, QTableWidget, \
+    QTableWidgetItem, QWidget
+from utilities.logger import setup_custom_logger
+from utilities.search import ProjectSearchIndex, SearchIndexWorker, SEARCH_LIMIT
+
+
+LOG_SEARCH_WINDOW = setup_custom_logger("Search Window")
+
+RESULT_COLUMNS = ['Project', 'Transcription', 'Translation']
+
+
+class SearchWindow(QDialog):
+    """
+    Finds words in every project under the project root, matching the start of words in transcriptions and
+    translations (ignoring case and diacritics) as they are typed. The index is brought up to date with saves made
+    outside this session in the background when the window opens, the results are refreshed once it is.
+    """
+
+    def __init__(self, parent: QWidget, root_dir: str) -> None:
+        super().__init__(parent)
+        self.layout = QGridLayout()
+        self.index = ProjectSearchIndex(root_dir)
+        self.search_field = QLineEdit()
+        self.results = QTableWidget(0, len(RESULT_COLUMNS))
+        self.summary = QLabel()
+        self.status = QLabel('Updating the search index...')
+        self.worker = SearchIndexWorker(root_dir)
+        self.init_ui()
+        self.worker.message.connect(self.status.setText)
+        self.worker.finished.connect(self.search)
+        self.worker.start()
+
+    def init_ui(self) -> None:
+        self.setWindowTitle('Search Projects')
+        self.setMinimumSize(700, 500)
+        self.search_field.setPlaceholderText('Search transcriptions and translations in all projects')
+        self.search_field.textChanged.connect(self.search)
+        self.layout.addWidget(self.search_field, 0, 0, 1, 2)
+        self.results.setHorizontalHeaderLabels(RESULT_COLUMNS)
+        self.results.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.results.verticalHeader().hide()
+        self.results.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.layout.addWidget(self.results, 1, 0, 1, 2)
+        self.layout.addWidget(self.summary, 2, 0, 1, 2)
+        self.layout.addWidget(self.status, 3, 0, 1, 1)
+        close_button = QPushButton('Close')
+        close_button.clicked.connect(self.close)
+        self.layout.addWidget(close_button, 3, 1, 1, 1)
+        self.setLayout(self.layout)
+
+    def search(self) -> None:
+        text = self.search_field.text()
+        start = time.perf_counter()
+        try:
+            hits = self.index.search(text)
+        except sqlite3.Error as error:
+            LOG_SEARCH_WINDOW.error(f"Search for {text!r} failed: {error}")
+            self.summary.setText('Search failed, see the log for details')
+            return
+        milliseconds = (time.perf_counter() - start) * 1000
+        self.results.setRowCount(len(hits))
+        for row, hit in enumerate(hits):
+            for column, value in enumerate((hit['project'], hit['transcription'], hit['translation'])):
+                item = QTableWidgetItem(value)
+                item.setToolTip(hit['path'])
+                self.results.setItem(row, column, item)
+        if text.strip():
+            more = f'first {SEARCH_LIMIT} ' if len(hits) == SEARCH_LIMIT else ''
+            self.summary.setText(f'Showing {more}{len(hits)} matches, found in {milliseconds:.1f} ms')
+        else:
+            self.summary.clear()
+
+    def done(self, result: int) -> None:
+        self.worker.requestInterruption()
+        self.worker.wait()
+        self.index.close()
+        super().done(result)
+
+    def closeEvent(self, event) -> None:
+        self.done(QDialog.Rejected)
+        super().closeEvent(event)
@@ -1,11 +1,16 @@
-import imageio
 from box import Box
-from PyQt5.QtWidgets import QDialog, QGridLayout, QLabel, QLineEdit, QPushButton, QComboBox, QMainWindow
+from PyQt5.QtWidgets import QDialog, QGridLayout, QLabel, QLineEdit, QPushButton, QComboBox, QMainWindow, \
+    QCheckBox, QDoubleSpinBox, QSpinBox
 from PyQt5.QtMultimedia import QAudioRecorder
+from audio.encode import AudioProfile, AUDIO_CODECS, PROFILE_BIT_DEPTHS, PROFILE_CHANNELS, PROFILE_FRAME_RATES
+from audio.processing import ProcessingOptions, NORMALISATION_MODES, NORMALISATION_MODES_REV
 from widgets.converter import ConverterWidget
-from datatypes import AppSettings, AUDIO_QUALITY_REV, AUDIO_QUALITY, OUTPUT_MODE_NAMES
+from datatypes import AppSettings, AUDIO_QUALITY_REV, AUDIO_QUALITY
+from utilities.exporters import exporter_names
 from utilities.files import open_folder_dialogue
 from utilities.settings import save_system_settings, set_ffmpeg_location
+from utilities.shards import TAR_COMPRESSION, TAR_COMPRESSION_REV
+from utilities.targets import ARCHIVE_COMPRESSION, ARCHIVE_COMPRESSION_REV
 
 
 class SettingsWindow(QDialog):
@@ -16,6 +21,10 @@ class SettingsWindow(QDialog):
         self.converter = converter
         self.layout = QGridLayout()
         self.widgets = Box()
+        # Audio profiles being edited, one per output mode, shown for the selected export mode.
+        self.audio_profiles = {output_mode: AudioProfile(**vars(profile))
+                               for output_mode, profile in self.converter.settings.audio_profiles.items()}
+        self.profile_mode = self.converter.settings.output_format
         self.init_ui()
 
     def init_ui(self) -> None:
@@ -25,8 +34,11 @@ class SettingsWindow(QDialog):
         export_mode_label = QLabel('Export Mode:')
         self.layout.addWidget(export_mode_label, 0, 0, 1, 1)
         self.widgets.export_mode_selector = QComboBox()
-        self.widgets.export_mode_selector.addItems([output_mode for output_mode in OUTPUT_MODE_NAMES.values()])
-        self.widgets.export_mode_selector.setCurrentIndex(self.converter.settings.output_format.value)
+        for output_mode, name in exporter_names().items():
+            self.widgets.export_mode_selector.addItem(name, output_mode)
+        self.widgets.export_mode_selector.setCurrentIndex(
+            self.widgets.export_mode_selector.findData(self.converter.settings.output_format))
+        self.widgets.export_mode_selector.currentIndexChanged.connect(self.on_change_export_mode)
         self.layout.addWidget(self.widgets.export_mode_selector, 0, 1, 1, 7)
 
         audio_device_label = QLabel('Audio Device')
@@ -49,36 +61,174 @@ class SettingsWindow(QDialog):
         self.widgets.project_root_selector.setText(self.converter.settings.project_root_dir)
         self.layout.addWidget(self.widgets.project_root_selector, 3, 1, 1, 7)
 
+        processing = self.converter.settings.export_processing
+        trim_silence_label = QLabel('Trim Silence:')
+        self.layout.addWidget(trim_silence_label, 4, 0, 1, 1)
+        self.widgets.trim_silence_check = QCheckBox()
+        self.widgets.trim_silence_check.setToolTip('Remove leading and trailing silence from exported audio')
+        self.widgets.trim_silence_check.setChecked(processing.trim_silence)
+        self.layout.addWidget(self.widgets.trim_silence_check, 4, 1, 1, 7)
+
+        normalisation_label = QLabel('Normalisation:')
+        self.layout.addWidget(normalisation_label, 5, 0, 1, 1)
+        self.widgets.normalisation_selector = QComboBox()
+        self.widgets.normalisation_selector.addItems([k for k in NORMALISATION_MODES.keys()])
+        self.widgets.normalisation_selector.setCurrentText(NORMALISATION_MODES_REV[processing.normalisation])
+        self.layout.addWidget(self.widgets.normalisation_selector, 5, 1, 1, 3)
+        self.widgets.target_peak_selector = QDoubleSpinBox()
+        self.widgets.target_peak_selector.setRange(-30, 0)
+        self.widgets.target_peak_selector.setSuffix(' dBFS peak')
+        self.widgets.target_peak_selector.setValue(processing.target_peak)
+        self.layout.addWidget(self.widgets.target_peak_selector, 5, 4, 1, 2)
+        self.widgets.target_loudness_selector = QDoubleSpinBox()
+        self.widgets.target_loudness_selector.setRange(-40, -5)
+        self.widgets.target_loudness_selector.setSuffix(' LUFS')
+        self.widgets.target_loudness_selector.setValue(processing.target_loudness)
+        self.layout.addWidget(self.widgets.target_loudness_selector, 5, 6, 1, 2)
+
+        fade_label = QLabel('Fade In/Out:')
+        self.layout.addWidget(fade_label, 6, 0, 1, 1)
+        self.widgets.fade_length_selector = QSpinBox()
+        self.widgets.fade_length_selector.setRange(0, 500)
+        self.widgets.fade_length_selector.setSuffix(' ms')
+        self.widgets.fade_length_selector.setValue(processing.fade_length)
+        self.layout.addWidget(self.widgets.fade_length_selector, 6, 1, 1, 7)
+
+        export_audio_label = QLabel('Export Audio:')
+        export_audio_label.setToolTip('Audio format for the selected export mode')
+        self.layout.addWidget(export_audio_label, 7, 0, 1, 1)
+        self.widgets.codec_selector = QComboBox()
+        for name, codec in AUDIO_CODECS.items():
+            self.widgets.codec_selector.addItem(name, codec)
+        self.layout.addWidget(self.widgets.codec_selector, 7, 1, 1, 2)
+        self.widgets.frame_rate_selector = QComboBox()
+        for frame_rate in PROFILE_FRAME_RATES:
+            self.widgets.frame_rate_selector.addItem(f'{frame_rate} Hz' if frame_rate else 'Source Rate',
+                                                     frame_rate or 0)
+        self.layout.addWidget(self.widgets.frame_rate_selector, 7, 3, 1, 2)
+        self.widgets.channels_selector = QComboBox()
+        for channels in PROFILE_CHANNELS:
+            self.widgets.channels_selector.addItem({None: 'Source Channels', 1: 'Mono', 2: 'Stereo'}[channels],
+                                                   channels or 0)
+        self.layout.addWidget(self.widgets.channels_selector, 7, 5, 1, 2)
+        self.widgets.bit_depth_selector = QComboBox()
+        for bit_depth in PROFILE_BIT_DEPTHS:
+            self.widgets.bit_depth_selector.addItem(f'{bit_depth}-bit' if bit_depth else 'Source Depth',
+                                                    bit_depth or 0)
+        self.layout.addWidget(self.widgets.bit_depth_selector, 7, 7, 1, 1)
+        self.set_audio_profile_fields(self.audio_profiles[self.profile_mode])
+
+        compact_manifest_label = QLabel('Compact Manifest:')
+        self.layout.addWidget(compact_manifest_label, 8, 0, 1, 1)
+        self.widgets.compact_manifest_check = QCheckBox()
+        self.widgets.compact_manifest_check.setToolTip('Write LMF manifests without indentation (smaller files)')
+        self.widgets.compact_manifest_check.setChecked(self.converter.settings.compact_manifest)
+        self.layout.addWidget(self.widgets.compact_manifest_check, 8, 1, 1, 7)
+
+        shards_label = QLabel('Tar Shards:')
+        shards_label.setToolTip('Shard size and compression of tar shard exports')
+        self.layout.addWidget(shards_label, 9, 0, 1, 1)
+        self.widgets.shard_size_selector = QSpinBox()
+        self.widgets.shard_size_selector.setRange(1, 65536)
+        self.widgets.shard_size_selector.setSuffix(' MB')
+        self.widgets.shard_size_selector.setValue(self.converter.settings.shard_size)
+        self.layout.addWidget(self.widgets.shard_size_selector, 9, 1, 1, 3)
+        self.widgets.shard_compression_selector = QComboBox()
+        for name, compression in TAR_COMPRESSION.items():
+            self.widgets.shard_compression_selector.addItem(name, compression)
+        self.widgets.shard_compression_selector.setCurrentText(
+            TAR_COMPRESSION_REV[self.converter.settings.shard_compression])
+        self.layout.addWidget(self.widgets.shard_compression_selector, 9, 4, 1, 4)
+
+        archive_label = QLabel('Export to Zip:')
+        self.layout.addWidget(archive_label, 10, 0, 1, 1)
+        self.widgets.export_archive_check = QCheckBox()
+        self.widgets.export_archive_check.setToolTip('Write the export into a single .zip in the export folder')
+        self.widgets.export_archive_check.setChecked(self.converter.settings.export_archive)
+        self.layout.addWidget(self.widgets.export_archive_check, 10, 1, 1, 3)
+        self.widgets.archive_compression_selector = QComboBox()
+        self.widgets.archive_compression_selector.setToolTip('Compression of audio and images in the .zip')
+        for name, compression in ARCHIVE_COMPRESSION.items():
+            self.widgets.archive_compression_selector.addItem(name, compression)
+        self.widgets.archive_compression_selector.setCurrentText(
+            ARCHIVE_COMPRESSION_REV[self.converter.settings.archive_compression])
+        self.layout.addWidget(self.widgets.archive_compression_selector, 10, 4, 1, 4)
+
         ffmpeg_instructions = QLabel('Hermes is only equipped to deal with WAV audio files by default.\n'
                                      'If you need to work with other formats, install the FFMPEG plugin.')
-        self.layout.addWidget(ffmpeg_instructions, 4, 0, 1, 8)
+        self.layout.addWidget(ffmpeg_instructions, 11, 0, 1, 8)
         ffmpeg_label = QLabel('FFMPEG Plugin:')
-        self.layout.addWidget(ffmpeg_label, 5, 0, 1, 1)
+        self.layout.addWidget(ffmpeg_label, 12, 0, 1, 1)
         ffmpeg_button = QPushButton('Download && Install')
         ffmpeg_button.clicked.connect(self.on_click_ffmpeg)
-        self.layout.addWidget(ffmpeg_button, 5, 1, 1, 7)
+        self.layout.addWidget(ffmpeg_button, 12, 1, 1, 7)
 
         save_button = QPushButton('Save')
         save_button.clicked.connect(self.on_click_save)
         save_button.setDefault(True)
-        self.layout.addWidget(save_button, 6, 7, 1, 1)
+        self.layout.addWidget(save_button, 13, 7, 1, 1)
         cancel_button = QPushButton('Cancel')
         cancel_button.clicked.connect(self.on_click_cancel)
-        self.layout.addWidget(cancel_button, 6, 6, 1, 1)
+        self.layout.addWidget(cancel_button, 13, 6, 1, 1)
         self.setLayout(self.layout)
 
     def on_click_save(self) -> None:
-        self.converter.settings = AppSettings(output_format=self.widgets.export_mode_selector.currentText(),
+        archive_compression = self.widgets.archive_compression_selector.currentData()
+        self.converter.settings = AppSettings(output_format=self.widgets.export_mode_selector.currentData(),
                                               microphone=self.widgets.audio_device_selector.currentText(),
                                               audio_quality=self.widgets.sound_quality_selector.currentText(),
-                                              project_root_dir=self.widgets.project_root_selector.text())
+                                              ffmpeg_location=self.converter.settings.ffmpeg_location,
+                                              project_root_dir=self.widgets.project_root_selector.text(),
+                                              export_processing=self.get_export_processing(),
+                                              audio_profiles=self.get_audio_profiles(),
+                                              compact_manifest=self.widgets.compact_manifest_check.isChecked(),
+                                              shard_size=self.widgets.shard_size_selector.value(),
+                                              shard_compression=self.widgets.shard_compression_selector.currentData(),
+                                              export_archive=self.widgets.export_archive_check.isChecked(),
+                                              archive_compression=archive_compression)
         save_system_settings(self.converter.settings)
         self.close()
 
+    def get_export_processing(self) -> ProcessingOptions:
+        return ProcessingOptions(
+            trim_silence=self.widgets.trim_silence_check.isChecked(),
+            normalisation=NORMALISATION_MODES[self.widgets.normalisation_selector.currentText()],
+            target_peak=self.widgets.target_peak_selector.value(),
+            target_loudness=self.widgets.target_loudness_selector.value(),
+            fade_length=self.widgets.fade_length_selector.value()
+        )
+
+    def set_audio_profile_fields(self, profile: AudioProfile) -> None:
+        """Shows a profile in the export audio fields, unset (source) values are stored as 0 in the selectors."""
+        self.widgets.codec_selector.setCurrentIndex(self.widgets.codec_selector.findData(profile.codec))
+        self.widgets.frame_rate_selector.setCurrentIndex(
+            max(self.widgets.frame_rate_selector.findData(profile.frame_rate or 0), 0))
+        self.widgets.channels_selector.setCurrentIndex(
+            max(self.widgets.channels_selector.findData(profile.channels or 0), 0))
+        self.widgets.bit_depth_selector.setCurrentIndex(
+            max(self.widgets.bit_depth_selector.findData(profile.bit_depth or 0), 0))
+
+    def get_audio_profile_fields(self, profile: AudioProfile) -> None:
+        profile.codec = self.widgets.codec_selector.currentData()
+        profile.frame_rate = self.widgets.frame_rate_selector.currentData() or None
+        profile.channels = self.widgets.channels_selector.currentData() or None
+        profile.bit_depth = self.widgets.bit_depth_selector.currentData() or None
+
+    def get_audio_profiles(self) -> dict:
+        self.get_audio_profile_fields(self.audio_profiles[self.profile_mode])
+        return self.audio_profiles
+
+    def on_change_export_mode(self, index: int) -> None:
+        """Stores the audio format of the previously selected export mode and shows that of the new one."""
+        self.get_audio_profile_fields(self.audio_profiles[self.profile_mode])
+        self.profile_mode = self.widgets.export_mode_selector.itemData(index)
+        self.set_audio_profile_fields(self.audio_profiles[self.profile_mode])
+
     def on_click_cancel(self) -> None:
         self.close()
 
     def on_click_ffmpeg(self) -> None:
+        import imageio
         app_settings = self.converter.settings
         ffmpeg_location = open_folder_dialogue()
         if ffmpeg_location: